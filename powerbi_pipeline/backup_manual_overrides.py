@@ -1,151 +1,251 @@
 #!/usr/bin/env python3
 """
 Backup Manual Tag Overrides
-Creates a backup of the ManualTagOverrides table before database rebuilds
+Snapshots the editable tables (manual overrides, question-tag mappings, tag hierarchy)
+into small SQLite files with the online backup API, keeping a bounded history
 """
 
 import sqlite3
+import hashlib
 import pandas as pd
 import os
 from datetime import datetime
-from config import OUTPUT_DIR
+from config import OUTPUT_DIR, BACKUP_DIR, BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY
+from db_schema import TABLE_DDL, table_columns
+
+# Tables that are edited after the build, with the rows worth keeping
+MUTABLE_TABLES = {
+    'ManualTagOverrides': "SELECT * FROM {schema}.ManualTagOverrides ORDER BY OverrideID",
+    'QuestionTagMappings': "SELECT * FROM {schema}.QuestionTagMappings ORDER BY MappingID",
+    'DimTags': "SELECT * FROM {schema}.DimTags WHERE ParentTagID IS NOT NULL OR TagLevel = 1 ORDER BY TagID",
+    'OverrideJournalState': "SELECT * FROM {schema}.OverrideJournalState",
+}
+
+SNAPSHOT_PREFIX = 'snapshot_'
+SNAPSHOT_TIME_FORMAT = '%Y%m%d_%H%M%S_%f'
+
+def list_snapshots(backup_dir=BACKUP_DIR):
+    """Snapshot files in the backup directory, oldest first, as (timestamp, path) pairs"""
+    if not os.path.isdir(backup_dir):
+        return []
+
+    snapshots = []
+    for filename in os.listdir(backup_dir):
+        if filename.startswith(SNAPSHOT_PREFIX) and filename.endswith('.db'):
+            try:
+                created = datetime.strptime(filename[len(SNAPSHOT_PREFIX):-3], SNAPSHOT_TIME_FORMAT)
+            except ValueError:
+                continue
+            snapshots.append((created, os.path.join(backup_dir, filename)))
+    return sorted(snapshots)
+
+def existing_tables(conn, schema='main'):
+    """Names of the tables present in a (possibly attached) database"""
+    return {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+
+def mutable_fingerprint(conn, schema='main'):
+    """Hash of the mutable table contents, used to skip snapshots when nothing changed"""
+    digest = hashlib.sha256()
+    tables = existing_tables(conn, schema)
+    for table_name, query in MUTABLE_TABLES.items():
+        digest.update(table_name.encode())
+        if table_name in tables:
+            for row in conn.execute(query.format(schema=schema)):
+                digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+def read_snapshot_fingerprint(snapshot_path):
+    """Fingerprint recorded in a snapshot, or None if it cannot be read"""
+    try:
+        conn = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+        try:
+            return conn.execute("SELECT Fingerprint FROM SnapshotInfo").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+
+def apply_retention(backup_dir=BACKUP_DIR, keep_last=BACKUP_KEEP_LAST, keep_daily=BACKUP_KEEP_DAILY):
+    """Evict snapshots outside the retention policy; returns the paths removed
+
+    Keeps the newest `keep_last` snapshots plus the newest snapshot of each of the
+    `keep_daily` most recent days that have one.
+    """
+    snapshots = list_snapshots(backup_dir)
+    keep = {path for _, path in snapshots[-keep_last:]} if keep_last > 0 else set()
+
+    newest_per_day = {}
+    for created, path in snapshots:
+        newest_per_day[created.date()] = path
+    for day in sorted(newest_per_day, reverse=True)[:keep_daily]:
+        keep.add(newest_per_day[day])
+
+    evicted = [path for _, path in snapshots if path not in keep]
+    for path in evicted:
+        os.remove(path)
+    if evicted:
+        print(f"🧹 Evicted {len(evicted)} old snapshots ({len(keep)} kept)")
+    return evicted
+
+def backup_manual_overrides(db_path=None, backup_dir=BACKUP_DIR):
+    """Snapshot the mutable tables to a new SQLite file; returns its path, or None if nothing was saved"""
+
+    if db_path is None:
+        db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
 
-def backup_manual_overrides():
-    """Export ManualTagOverrides and QuestionTagMappings tables to CSV for backup"""
-    
-    db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
-    
     if not os.path.exists(db_path):
         print("❌ Database not found, no backup needed")
-        return False
-    
-    conn = sqlite3.connect(db_path)
-    
-    # Check if ManualTagOverrides table exists
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='ManualTagOverrides'")
-    table_exists = cursor.fetchone() is not None
-    
-    if not table_exists:
-        print("❌ ManualTagOverrides table not found, no backup needed")
-        conn.close()
-        return False
-    
-    # Export tables to CSV
+        return None
+
+    # Stage the mutable tables in memory, then copy the pages out with the backup API
+    staging = sqlite3.connect(':memory:')
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_success = False
-        
-        # Backup ManualTagOverrides
-        df_manual = pd.read_sql_query("SELECT * FROM ManualTagOverrides", conn)
-        if len(df_manual) > 0:
-            backup_filename = f"ManualTagOverrides_backup_{timestamp}.csv"
-            backup_path = os.path.join(OUTPUT_DIR, backup_filename)
-            df_manual.to_csv(backup_path, index=False)
-            
-            latest_backup_path = os.path.join(OUTPUT_DIR, "ManualTagOverrides_latest.csv")
-            df_manual.to_csv(latest_backup_path, index=False)
-            
-            print(f"✅ Backed up {len(df_manual)} manual tag overrides")
-            backup_success = True
-        
-        # Backup QuestionTagMappings (if exists)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='QuestionTagMappings'")
-        if cursor.fetchone():
-            df_question = pd.read_sql_query("SELECT * FROM QuestionTagMappings", conn)
-            if len(df_question) > 0:
-                backup_filename = f"QuestionTagMappings_backup_{timestamp}.csv"
-                backup_path = os.path.join(OUTPUT_DIR, backup_filename)
-                df_question.to_csv(backup_path, index=False)
-                
-                latest_backup_path = os.path.join(OUTPUT_DIR, "QuestionTagMappings_latest.csv")
-                df_question.to_csv(latest_backup_path, index=False)
-                
-                print(f"✅ Backed up {len(df_question)} question-tag mappings")
-                backup_success = True
-        
-        # Backup hierarchical DimTags structure
-        df_tags = pd.read_sql_query("SELECT * FROM DimTags WHERE ParentTagID IS NOT NULL OR TagLevel = 1", conn)
-        if len(df_tags) > 0:
-            backup_filename = f"DimTags_hierarchical_backup_{timestamp}.csv"
-            backup_path = os.path.join(OUTPUT_DIR, backup_filename)
-            df_tags.to_csv(backup_path, index=False)
-            
-            latest_backup_path = os.path.join(OUTPUT_DIR, "DimTags_hierarchical_latest.csv")
-            df_tags.to_csv(latest_backup_path, index=False)
-            
-            print(f"✅ Backed up {len(df_tags)} hierarchical tags")
-            backup_success = True
-        
-        if not backup_success:
-            print("📝 No custom data to backup")
-        
-        conn.close()
-        return backup_success
-        
+        staging.execute("ATTACH DATABASE ? AS live", (db_path,))
+        live_tables = existing_tables(staging, 'live')
+        if 'ManualTagOverrides' not in live_tables:
+            print("❌ ManualTagOverrides table not found, no backup needed")
+            return None
+
+        fingerprint = mutable_fingerprint(staging, 'live')
+        snapshots = list_snapshots(backup_dir)
+        if snapshots and read_snapshot_fingerprint(snapshots[-1][1]) == fingerprint:
+            print("📝 Editable tables unchanged since the last snapshot, no backup needed")
+            return snapshots[-1][1]
+
+        row_counts = {}
+        with staging:
+            for table_name, query in MUTABLE_TABLES.items():
+                if table_name not in live_tables:
+                    continue
+                staging.execute(TABLE_DDL[table_name])
+                live_columns = {row[1] for row in staging.execute(f"PRAGMA live.table_info({table_name})")}
+                column_list = ', '.join(col for col in table_columns(staging, table_name) if col in live_columns)
+                cursor = staging.execute(f"""
+                INSERT INTO main.{table_name} ({column_list})
+                SELECT {column_list} FROM ({query.format(schema='live')})
+                """)
+                row_counts[table_name] = cursor.rowcount
+
+            generation = staging.execute("PRAGMA live.user_version").fetchone()[0]
+            staging.execute("CREATE TABLE SnapshotInfo (CreatedAt TEXT, SourceGeneration INTEGER, Fingerprint TEXT)")
+            staging.execute("INSERT INTO SnapshotInfo VALUES (?, ?, ?)",
+                            (datetime.now().isoformat(), generation, fingerprint))
+        staging.execute("DETACH DATABASE live")
+
+        os.makedirs(backup_dir, exist_ok=True)
+        snapshot_name = f"{SNAPSHOT_PREFIX}{datetime.now().strftime(SNAPSHOT_TIME_FORMAT)}.db"
+        snapshot_path = os.path.join(backup_dir, snapshot_name)
+        partial_path = f"{snapshot_path}.partial"
+
+        target = sqlite3.connect(partial_path)
+        try:
+            staging.backup(target)
+        finally:
+            target.close()
+        os.replace(partial_path, snapshot_path)
+
+        for table_name, count in row_counts.items():
+            print(f"✅ Backed up {count} rows from {table_name}")
+        print(f"💾 Snapshot saved: {snapshot_path}")
+
+        apply_retention(backup_dir)
+        return snapshot_path
+
     except Exception as e:
         print(f"❌ Error backing up ManualTagOverrides: {e}")
+        return None
+    finally:
+        staging.close()
+
+def restore_snapshot(snapshot_path, db_path):
+    """Restore the mutable tables from a snapshot in one transaction, keeping the original IDs"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
+        snapshot_tables = existing_tables(conn, 'snapshot')
+        restored = {}
+
+        with conn:
+            for table_name in MUTABLE_TABLES:
+                conn.execute(TABLE_DDL[table_name].replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+                if table_name not in snapshot_tables:
+                    continue
+
+                snapshot_columns = {row[1] for row in conn.execute(f"PRAGMA snapshot.table_info({table_name})")}
+                column_list = ', '.join(col for col in table_columns(conn, table_name) if col in snapshot_columns)
+                if table_name == 'DimTags':
+                    # Tags from the fresh build win; only the missing hierarchy rows come back
+                    cursor = conn.execute(f"""
+                    INSERT OR IGNORE INTO DimTags ({column_list})
+                    SELECT {column_list} FROM snapshot.DimTags
+                    """)
+                else:
+                    conn.execute(f"DELETE FROM {table_name}")
+                    cursor = conn.execute(f"""
+                    INSERT INTO {table_name} ({column_list})
+                    SELECT {column_list} FROM snapshot.{table_name}
+                    """)
+                restored[table_name] = cursor.rowcount
+
+        conn.execute("DETACH DATABASE snapshot")
+        for table_name, count in restored.items():
+            print(f"✅ Restored {count} rows into {table_name}")
+        return True
+    finally:
         conn.close()
-        return False
 
-def restore_manual_overrides(backup_file=None):
-    """Restore ManualTagOverrides from backup CSV"""
-    
-    db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
-    
+def restore_csv_backup(backup_file, db_path):
+    """Restore ManualTagOverrides from a legacy CSV backup"""
+    df = pd.read_csv(backup_file)
+    print(f"📂 Found {len(df)} records in backup file")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(TABLE_DDL['ManualTagOverrides'].replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+            conn.execute("DELETE FROM ManualTagOverrides")
+            df.to_sql('ManualTagOverrides', conn, if_exists='append', index=False)
+        print(f"✅ Restored {len(df)} manual tag overrides from backup")
+        return True
+    finally:
+        conn.close()
+
+def restore_manual_overrides(backup_file=None, db_path=None):
+    """Restore the editable tables from a snapshot (default: the newest) or a legacy CSV"""
+
+    if db_path is None:
+        db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
+
     if backup_file is None:
-        backup_file = os.path.join(OUTPUT_DIR, "ManualTagOverrides_latest.csv")
-    
+        snapshots = list_snapshots()
+        if snapshots:
+            backup_file = snapshots[-1][1]
+        else:
+            backup_file = os.path.join(OUTPUT_DIR, "ManualTagOverrides_latest.csv")
+
     if not os.path.exists(backup_file):
         print(f"❌ Backup file not found: {backup_file}")
         return False
-    
-    conn = sqlite3.connect(db_path)
-    
+
     try:
-        # Read backup CSV
-        df = pd.read_csv(backup_file)
-        print(f"📂 Found {len(df)} records in backup file")
-        
-        # Create table if it doesn't exist
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS ManualTagOverrides (
-            OverrideID INTEGER PRIMARY KEY AUTOINCREMENT,
-            SurveyResponseNumber INTEGER NOT NULL,
-            QuestionID INTEGER NOT NULL,
-            TagID INTEGER NOT NULL,
-            Action TEXT CHECK(Action IN ('ADD', 'REMOVE')) NOT NULL,
-            AppliedBy TEXT NOT NULL,
-            AppliedDate TEXT NOT NULL,
-            Notes TEXT,
-            IsActive INTEGER DEFAULT 1,
-            FOREIGN KEY (TagID) REFERENCES DimTags(TagID)
-        )
-        """
-        conn.execute(create_table_sql)
-        
-        # Clear existing data
-        conn.execute("DELETE FROM ManualTagOverrides")
-        
-        # Import backup data
-        df.to_sql('ManualTagOverrides', conn, if_exists='append', index=False)
-        conn.commit()
-        
-        print(f"✅ Restored {len(df)} manual tag overrides from backup")
-        conn.close()
-        return True
-        
+        if backup_file.endswith('.csv'):
+            return restore_csv_backup(backup_file, db_path)
+        print(f"📂 Restoring from snapshot {os.path.basename(backup_file)}")
+        return restore_snapshot(backup_file, db_path)
     except Exception as e:
         print(f"❌ Error restoring ManualTagOverrides: {e}")
-        conn.close()
         return False
 
 if __name__ == "__main__":
     import sys
-    
+
     if len(sys.argv) > 1 and sys.argv[1] == "restore":
         backup_file = sys.argv[2] if len(sys.argv) > 2 else None
         restore_manual_overrides(backup_file)
+    elif len(sys.argv) > 1 and sys.argv[1] == "list":
+        for created, path in list_snapshots():
+            print(f"{created:%Y-%m-%d %H:%M:%S}  {os.path.basename(path)}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "prune":
+        apply_retention()
     else:
-        backup_manual_overrides()
\ No newline at end of file
+        backup_manual_overrides()
@@ -8,6 +8,7 @@ import os
 # File paths
 DATA_FILE = '../data/Need_Assessment_Survey_FINAL_CLEAN.csv'
 OUTPUT_DIR = '../powerbi_data_model_v2'
+EXCEL_TEMPLATES_DIR = '../excel_templates'
 PIPELINE_DIR = 'powerbi_pipeline'
 
 # Ensure output directory exists
@@ -48,4 +49,22 @@ EXCLUDE_PATTERNS = ['time', 'email', 'consent', 'organization', 'county', 'role'
                    'Start time', 'Completion time', 'Multi_County_Flag', 'Role_Category', 
                    'Role_Level', 'Role_Type', 'Time_Range_Category', 'Service_Area']
 
+# Structured (non-question) columns in the survey export
+STRUCTURED_COLUMNS = ['Start time', 'Completion time', 'Organization', 'Organization County',
+                      'Primary_County', 'Service_Area', 'Multi_County_Flag', 'Role/Position',
+                      'Length of time in current position', 'Role_Standardized', 'Role_Category',
+                      'Role_Level', 'Role_Type', 'Time_Range_Category', 'Contact Email']
+
+# Survey profiling settings
+PROFILE_CACHE_DIR = os.path.join(OUTPUT_DIR, 'profile_cache')
+OPEN_ENDED_MIN_MEDIAN_LENGTH = 30     # Median characters per answer
+OPEN_ENDED_MIN_MEDIAN_TOKENS = 5      # Median words per answer
+OPEN_ENDED_MIN_DISTINCT_RATIO = 0.5   # Share of answers that are unique
+CATEGORICAL_MAX_DISTINCT_RATIO = 0.2  # At or below this, answers come from a fixed set
+
+# Snapshot backups of the editable tables (overrides, mappings, tag hierarchy)
+BACKUP_DIR = os.path.join(OUTPUT_DIR, 'backups')
+BACKUP_KEEP_LAST = 10   # Always keep the most recent snapshots
+BACKUP_KEEP_DAILY = 14  # Plus the newest snapshot from each of this many days
+
 print("📋 Configuration loaded successfully!")
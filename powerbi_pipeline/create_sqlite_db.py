@@ -1,94 +1,306 @@
 """
 Create SQLite Database from Power BI Data Model
 Enables fast SQL querying for analysis and iteration
+Loads the pipeline's in-memory tables directly, or the exported CSVs when run standalone
 """
 
 import sqlite3
 import pandas as pd
 import os
 import sys
+import time
 
 # Add pipeline directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
 from config import OUTPUT_DIR
+from db_schema import INDEXES, create_schema, table_columns
+from effective_tags import materialize_effective_tags
+from tag_cube import build_tag_cube
 from backup_manual_overrides import backup_manual_overrides, restore_manual_overrides
 from import_hierarchical_tags import import_tag_hierarchy, import_question_tag_mappings
+from override_journal import journal_path, replay_journal, set_high_water_mark
 
-def create_survey_database():
-    """Create SQLite database from CSV files"""
+# Tables produced by the pipeline, in load order
+SURVEY_TABLES = [
+    'DimGeography',
+    'DimOrganization',
+    'DimRole',
+    'DimQuestion',
+    'DimTags',
+    'DimUrgency',
+    'DimHealthcareCategory',
+    'FactSurveyResponses',
+    'BridgeResponseTags',
+    'BridgeResponseCategories',
+    'BridgeResponseRoles'
+]
+
+def read_csv_tables():
+    """Read the exported CSV files for every pipeline table"""
+    tables = {}
+    for table_name in SURVEY_TABLES:
+        csv_path = os.path.join(OUTPUT_DIR, f"{table_name}.csv")
+        if os.path.exists(csv_path):
+            tables[table_name] = pd.read_csv(csv_path)
+        else:
+            print(f"⚠️ {table_name}.csv not found, skipping...")
+    return tables
+
+def apply_build_pragmas(conn):
+    """Trade durability for speed while the database is being built from scratch"""
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")  # 64 MB
+
+def restore_default_pragmas(conn):
+    """Return to normal journaling once the build has finished"""
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+
+def dataframe_rows(df, columns):
+    """Yield rows as plain Python values (NaN -> NULL) for executemany"""
+    values = df[columns].astype(object)
+    values = values.where(values.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+def bulk_load_table(conn, table_name, df):
+    """Insert a DataFrame into a pre-created table with a single executemany"""
+    schema_columns = table_columns(conn, table_name)
+    columns = [col for col in schema_columns if col in df.columns]
+    dropped = [col for col in df.columns if col not in schema_columns]
+    if dropped:
+        print(f"⚠️ {table_name}: columns not in the schema, not loaded: {', '.join(map(str, dropped))}")
+    placeholders = ', '.join(['?'] * len(columns))
+    column_list = ', '.join(columns)
+    conn.executemany(
+        f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})",
+        dataframe_rows(df, columns)
+    )
+    return len(df)
+
+def load_tables(conn, tables):
+    """Load in-memory DataFrames into the schema tables inside one transaction"""
+    with conn:
+        for table_name in SURVEY_TABLES:
+            df = tables.get(table_name)
+            if df is None or len(df.columns) == 0:
+                print(f"⚠️ {table_name}: no data, skipping...")
+                continue
+            row_count = bulk_load_table(conn, table_name, df)
+            print(f"✅ {table_name}: {row_count} records loaded")
+
+def carry_over_overrides(build_path, live_path):
+    """Copy manual overrides, with their IDs and journal high-water mark, from the live database
+    
+    Returns the number of overrides copied, or None if the live database has none to copy.
+    """
+    if not os.path.exists(live_path):
+        return None
+    
+    conn = sqlite3.connect(build_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS live", (live_path,))
+        live_tables = {row[0] for row in conn.execute("SELECT name FROM live.sqlite_master WHERE type = 'table'")}
+        if 'ManualTagOverrides' not in live_tables:
+            return None
+        
+        live_columns = {row[1] for row in conn.execute("PRAGMA live.table_info(ManualTagOverrides)")}
+        columns = ', '.join(col for col in table_columns(conn, 'ManualTagOverrides') if col in live_columns)
+        with conn:
+            cursor = conn.execute(f"""
+            INSERT INTO ManualTagOverrides ({columns})
+            SELECT {columns} FROM live.ManualTagOverrides
+            """)
+            if 'OverrideJournalState' in live_tables:
+                row = conn.execute("SELECT HighWaterMark FROM live.OverrideJournalState WHERE ID = 1").fetchone()
+                set_high_water_mark(conn, row[0] if row else 0)
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def read_generation(db_path):
+    """Return the generation number stamped on a database (0 if none)"""
+    if not os.path.exists(db_path):
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError:
+        return 0
+    finally:
+        conn.close()
+
+def generation_path(db_path, generation):
+    """File that holds one generation of the database, e.g. survey_analysis.gen3.db"""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.gen{generation}{ext}"
+
+def publish_generation(build_path, db_path, generation):
+    """Move a finished build to its generation file and atomically repoint db_path at it
+
+    db_path becomes a symlink, so every generation keeps its own -wal/-shm files and
+    connections still open on the previous generation never share them with the new one.
+    """
+    published_path = generation_path(db_path, generation)
+    os.replace(build_path, published_path)
+    
+    link_path = f"{db_path}.link-{os.getpid()}"
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    os.symlink(os.path.basename(published_path), link_path)
+    os.replace(link_path, db_path)
+    return published_path
+
+def remove_old_generations(db_path, keep=2):
+    """Delete generation files other than the newest `keep` (the live one and its predecessor)"""
+    root, ext = os.path.splitext(db_path)
+    prefix = f"{os.path.basename(root)}.gen"
+    directory = os.path.dirname(db_path) or '.'
+    
+    generations = []
+    for filename in os.listdir(directory):
+        if filename.startswith(prefix) and filename.endswith(ext):
+            number = filename[len(prefix):-len(ext)]
+            if number.isdigit():
+                generations.append(int(number))
+    
+    for generation in sorted(generations)[:-keep]:
+        old_path = generation_path(db_path, generation)
+        for path in [old_path, f"{old_path}-wal", f"{old_path}-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+def verify_database(db_path, tables):
+    """Check a freshly built database before it is allowed to replace the live one"""
+    conn = sqlite3.connect(db_path)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if result != 'ok':
+            raise Exception(f"Integrity check failed: {result}")
+        
+        for table_name in SURVEY_TABLES + ['ManualTagOverrides', 'QuestionTagMappings', 'EffectiveResponseTags', 'TagCube']:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+            ).fetchone()
+            if not exists:
+                raise Exception(f"Missing table: {table_name}")
+        
+        for table_name, df in tables.items():
+            if df is None or len(df.columns) == 0:
+                continue
+            loaded = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            if table_name != 'DimTags' and loaded != len(df):
+                raise Exception(f"{table_name} has {loaded} rows, expected {len(df)}")
+    finally:
+        conn.close()
+
+def create_survey_database(tables=None):
+    """Create SQLite database from pipeline tables
+    
+    The database is built and verified in a temporary file next to the live one and
+    then atomically renamed over it, so readers never see a partially built database.
+    
+    Args:
+        tables: dict of table name -> DataFrame from the pipeline. When omitted,
+            the tables are read back from the exported CSV files.
+    """
     
     db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
+    build_path = f"{db_path}.building-{os.getpid()}"
     
-    # Backup manual overrides before removing database
+    # Backup manual overrides from the live database (it stays in place until the swap)
     print("💾 Backing up manual tag overrides...")
-    backup_manual_overrides()
+    backup_manual_overrides(db_path)
     
-    # Remove existing database
-    if os.path.exists(db_path):
-        os.remove(db_path)
-        print(f"🗑️ Removed existing database")
+    # Clear any leftover from an interrupted build
+    if os.path.exists(build_path):
+        os.remove(build_path)
     
-    # Connect to SQLite database
-    conn = sqlite3.connect(db_path)
-    print(f"📊 Created SQLite database: {db_path}")
+    conn = sqlite3.connect(build_path)
+    print(f"📊 Building SQLite database: {build_path}")
     
     try:
-        # Load each CSV file into a table
-        csv_files = {
-            'DimGeography': 'DimGeography.csv',
-            'DimOrganization': 'DimOrganization.csv', 
-            'DimRole': 'DimRole.csv',
-            'DimQuestion': 'DimQuestion.csv',
-            'DimTags': 'DimTags.csv',
-            'DimUrgency': 'DimUrgency.csv',
-            'DimHealthcareCategory': 'DimHealthcareCategory.csv',
-            'FactSurveyResponses': 'FactSurveyResponses.csv',
-            'BridgeResponseTags': 'BridgeResponseTags.csv',
-            'BridgeResponseCategories': 'BridgeResponseCategories.csv',
-            'BridgeResponseRoles': 'BridgeResponseRoles.csv'
-        }
+        build_start = time.time()
+        apply_build_pragmas(conn)
         
-        for table_name, csv_file in csv_files.items():
-            csv_path = os.path.join(OUTPUT_DIR, csv_file)
-            if os.path.exists(csv_path):
-                df = pd.read_csv(csv_path)
-                df.to_sql(table_name, conn, if_exists='replace', index=False)
-                print(f"✅ {table_name}: {len(df)} records loaded")
-            else:
-                print(f"⚠️ {csv_file} not found, skipping...")
+        # Tables come from explicit DDL so keys and column types are declared up front
+        create_schema(conn)
         
-        # Create helpful views for common queries
-        create_analysis_views(conn)
+        if tables is None:
+            tables = read_csv_tables()
+        load_tables(conn, tables)
         
-        # Create some indexes for better performance
+        # Indexes are built after the load so inserts don't maintain them row by row
         create_indexes(conn)
         
-        # Create ManualTagOverrides table
-        create_manual_overrides_table(conn)
+        # Create helpful views for common queries
+        create_analysis_views(conn)
         
+        restore_default_pragmas(conn)
         conn.commit()
-        print(f"🎉 Database created successfully!")
-        print(f"📍 Location: {db_path}")
-        
-        # Restore manual overrides from backup
         conn.close()
-        print("🔄 Restoring manual tag overrides from backup...")
-        restore_manual_overrides()
+        
+        # Carry overrides over from the live database, falling back to the latest snapshot
+        print("🔄 Carrying over manual tag overrides...")
+        carried = carry_over_overrides(build_path, db_path)
+        if carried is None:
+            print("🔄 Restoring manual tag overrides from backup...")
+            restore_manual_overrides(db_path=build_path)
+        else:
+            print(f"✅ Carried over {carried} manual tag overrides")
         
         # Import hierarchical tags and question mappings
         print("🌳 Importing hierarchical tags...")
-        import_tag_hierarchy()
+        import_tag_hierarchy(build_path)
         print("📊 Importing question-tag mappings...")
-        import_question_tag_mappings()
+        import_question_tag_mappings(build_path)
+        
+        # Materialize effective tags; triggers keep them current from here on
+        conn = sqlite3.connect(build_path)
+        effective_count = materialize_effective_tags(conn)
+        cube_rows = build_tag_cube(conn)
+        conn.close()
+        print(f"🏷️ Materialized {effective_count:,} effective response tags")
+        print(f"🧊 Built tag cube with {cube_rows:,} rows")
+        
+        # Give the query planner statistics and stamp the next generation number
+        generation = read_generation(db_path) + 1
+        conn = sqlite3.connect(build_path)
+        conn.execute("ANALYZE")
+        conn.execute(f"PRAGMA user_version = {generation}")
+        conn.commit()
+        conn.close()
+        
+        # Apply overrides journaled since the live database's high-water mark, then
+        # switch to WAL so readers and the server's writer don't block each other
+        conn = sqlite3.connect(build_path)
+        replayed = replay_journal(conn, journal_path(OUTPUT_DIR))
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.close()
+        print(f"📜 Replayed {replayed} journaled overrides")
+        
+        verify_database(build_path, tables)
+        
+        # Atomic swap: open connections keep reading the old generation, new ones get this one
+        published_path = publish_generation(build_path, db_path, generation)
+        remove_old_generations(db_path)
+        
+        print(f"🎉 Database generation {generation} created in {time.time() - build_start:.1f} seconds!")
+        print(f"📍 Location: {db_path} -> {os.path.basename(published_path)}")
         
         return db_path
         
     except Exception as e:
         print(f"❌ Error creating database: {str(e)}")
+        print(f"   Live database left unchanged: {db_path}")
         return None
     finally:
         conn.close()
+        for path in [build_path, f"{build_path}-wal", f"{build_path}-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
 
 def create_analysis_views(conn):
     """Create helpful views for common analysis patterns"""
@@ -187,17 +399,7 @@ def create_analysis_views(conn):
 def create_indexes(conn):
     """Create indexes for better query performance"""
     
-    indexes = [
-        "CREATE INDEX idx_fact_response_id ON FactSurveyResponses(ResponseID)",
-        "CREATE INDEX idx_fact_survey_number ON FactSurveyResponses(SurveyResponseNumber)", 
-        "CREATE INDEX idx_bridge_tags_response ON BridgeResponseTags(ResponseID)",
-        "CREATE INDEX idx_bridge_tags_tag ON BridgeResponseTags(TagID)",
-        "CREATE INDEX idx_tags_category ON DimTags(TagCategory)",
-        "CREATE INDEX idx_role_category ON DimRole(RoleCategory)",
-        "CREATE INDEX idx_question_type ON DimQuestion(QuestionType)"
-    ]
-    
-    for index_sql in indexes:
+    for index_sql in INDEXES:
         try:
             conn.execute(index_sql)
         except Exception as e:
@@ -205,32 +407,6 @@ def create_indexes(conn):
     
     print("🔍 Created performance indexes")
 
-def create_manual_overrides_table(conn):
-    """Create ManualTagOverrides table for manual tag modifications"""
-    
-    create_table_sql = """
-    CREATE TABLE ManualTagOverrides (
-        OverrideID INTEGER PRIMARY KEY AUTOINCREMENT,
-        SurveyResponseNumber INTEGER NOT NULL,
-        QuestionID INTEGER NOT NULL,
-        TagID INTEGER NOT NULL,
-        Action TEXT CHECK(Action IN ('ADD', 'REMOVE')) NOT NULL,
-        AppliedBy TEXT NOT NULL,
-        AppliedDate TEXT NOT NULL,
-        Notes TEXT,
-        IsActive INTEGER DEFAULT 1,
-        FOREIGN KEY (TagID) REFERENCES DimTags(TagID)
-    )
-    """
-    
-    try:
-        conn.execute(create_table_sql)
-        conn.execute("CREATE INDEX idx_manual_overrides_response ON ManualTagOverrides(SurveyResponseNumber, QuestionID)")
-        conn.execute("CREATE INDEX idx_manual_overrides_tag ON ManualTagOverrides(TagID)")
-        print("🏷️ Created ManualTagOverrides table")
-    except Exception as e:
-        print(f"⚠️ Error creating ManualTagOverrides table: {str(e)}")
-
 def run_sample_queries(db_path):
     """Run some sample queries to demonstrate functionality"""
     
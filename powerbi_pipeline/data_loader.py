@@ -37,37 +37,17 @@ def get_column_by_pattern(df, patterns):
                 return col
     return None
 
-def identify_open_ended_columns(df):
-    """Identify columns that contain open-ended text responses"""
-    from config import EXCLUDE_PATTERNS
+def identify_open_ended_columns(df, profile=None):
+    """Identify columns that contain open-ended text responses using the survey profile"""
+    if profile is None:
+        from survey_profile import get_survey_profile
+        profile = get_survey_profile(df)
     
-    open_ended_cols = []
-    for col in df.columns:
-        # Check if it's an object (text) column
-        if df[col].dtype == 'object':
-            # Check if it's not an excluded pattern
-            col_lower = col.lower()
-            is_excluded = any(pattern.lower() in col_lower for pattern in EXCLUDE_PATTERNS)
-            
-            # Also exclude exact matches to structured columns
-            exact_excludes = ['Organization', 'Organization County', 'Primary_County', 
-                            'Service_Area', 'Role/Position', 'Role_Standardized', 
-                            'Role_Category', 'Role_Level', 'Role_Type', 
-                            'Length of time in current position', 'Time_Range_Category',
-                            'Contact Email', 'Multi_County_Flag']
-            is_exact_excluded = col in exact_excludes
-            
-            if not is_excluded and not is_exact_excluded:
-                # Check if it has meaningful responses (not just single words)
-                sample_responses = df[col].dropna().head(10)
-                if len(sample_responses) > 0:
-                    avg_length = sample_responses.astype(str).str.len().mean()
-                    if avg_length > 30:  # Increased threshold for meaningful text responses
-                        open_ended_cols.append(col)
-    
-    return open_ended_cols
+    # Profile rows follow the column order of the survey
+    is_text_column = profile['IsOpenEnded'] & ~profile['IsTextExcluded']
+    return [col for col in profile.index[is_text_column] if col in df.columns]
 
-def validate_data(df):
+def validate_data(df, profile=None):
     """Perform basic data validation"""
     validation_results = {
         'total_responses': len(df),
@@ -76,8 +56,13 @@ def validate_data(df):
         'response_rate_by_column': {}
     }
     
+    if profile is not None:
+        non_null_counts = profile['NonNullCount']
+    else:
+        non_null_counts = df.notna().sum()
+    
     for col in df.columns:
-        response_rate = (df[col].notna().sum() / len(df)) * 100
+        response_rate = (non_null_counts[col] / len(df)) * 100
         validation_results['response_rate_by_column'][col] = round(response_rate, 1)
     
     return validation_results
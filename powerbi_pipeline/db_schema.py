@@ -0,0 +1,253 @@
+"""
+SQLite Schema for the Survey Analysis Database
+Explicit table DDL with keys and the indexes built after bulk loading
+"""
+
+# Table definitions in load order (dimensions before facts and bridges)
+TABLE_DDL = {
+    'DimGeography': """
+    CREATE TABLE DimGeography (
+        GeographyID INTEGER PRIMARY KEY,
+        PrimaryCounty TEXT,
+        OrganizationCounty TEXT,
+        ServiceArea TEXT,
+        Region TEXT,
+        State TEXT,
+        IsNWA INTEGER,
+        IsMultiCounty INTEGER,
+        CountyType TEXT
+    )
+    """,
+
+    'DimOrganization': """
+    CREATE TABLE DimOrganization (
+        OrganizationID INTEGER PRIMARY KEY,
+        OrganizationName TEXT,
+        OrganizationType TEXT,
+        OrganizationSize TEXT,
+        IsHealthSystem INTEGER,
+        IsAcademic INTEGER,
+        IsGovernment INTEGER
+    )
+    """,
+
+    'DimRole': """
+    CREATE TABLE DimRole (
+        RoleID INTEGER PRIMARY KEY,
+        RolePosition TEXT,
+        RoleStandardized TEXT,
+        RoleCategory TEXT,
+        RoleLevel TEXT,
+        RoleType TEXT,
+        TimeRangeCategory TEXT,
+        RoleSeniority TEXT,
+        IsClinical INTEGER,
+        IsLeadership INTEGER,
+        IsTrainee INTEGER
+    )
+    """,
+
+    'DimQuestion': """
+    CREATE TABLE DimQuestion (
+        QuestionID INTEGER PRIMARY KEY,
+        QuestionText TEXT,
+        QuestionShort TEXT,
+        QuestionType TEXT,
+        ResponseCount INTEGER,
+        ResponseRate REAL,
+        IsRequired INTEGER,
+        IsOpenEnded INTEGER
+    )
+    """,
+
+    'DimTags': """
+    CREATE TABLE DimTags (
+        TagID INTEGER PRIMARY KEY,
+        TagKey TEXT,
+        TagName TEXT NOT NULL,
+        TagCategory TEXT,
+        TagPriority TEXT,
+        TagDescription TEXT,
+        IsActive INTEGER DEFAULT 1,
+        TagLevel INTEGER DEFAULT 1,
+        ParentTagID INTEGER REFERENCES DimTags(TagID)
+    )
+    """,
+
+    'DimUrgency': """
+    CREATE TABLE DimUrgency (
+        UrgencyID INTEGER PRIMARY KEY,
+        UrgencyKey TEXT,
+        UrgencyLevel TEXT,
+        UrgencyDescription TEXT,
+        UrgencyScore REAL
+    )
+    """,
+
+    'DimHealthcareCategory': """
+    CREATE TABLE DimHealthcareCategory (
+        CategoryID INTEGER PRIMARY KEY,
+        CategoryKey TEXT,
+        CategoryName TEXT,
+        CategoryDescription TEXT,
+        Domain TEXT,
+        PriorityWeight REAL,
+        KeywordCount INTEGER
+    )
+    """,
+
+    'FactSurveyResponses': """
+    CREATE TABLE FactSurveyResponses (
+        ResponseID INTEGER PRIMARY KEY,
+        SurveyResponseNumber INTEGER NOT NULL,
+        OrganizationID INTEGER REFERENCES DimOrganization(OrganizationID),
+        GeographyID INTEGER REFERENCES DimGeography(GeographyID),
+        RoleID INTEGER REFERENCES DimRole(RoleID),
+        QuestionID INTEGER REFERENCES DimQuestion(QuestionID),
+        UrgencyID INTEGER REFERENCES DimUrgency(UrgencyID),
+        ResponseText TEXT,
+        ResponseLength INTEGER,
+        WordCount INTEGER,
+        HasResponse INTEGER,
+        IsTextResponse INTEGER,
+        IsLongResponse INTEGER
+    )
+    """,
+
+    'BridgeResponseTags': """
+    CREATE TABLE BridgeResponseTags (
+        ResponseID INTEGER NOT NULL REFERENCES FactSurveyResponses(ResponseID),
+        TagID INTEGER NOT NULL REFERENCES DimTags(TagID),
+        TagKey TEXT,
+        TagName TEXT,
+        TagCategory TEXT,
+        ResponseText TEXT,
+        PRIMARY KEY (ResponseID, TagID)
+    )
+    """,
+
+    'BridgeResponseCategories': """
+    CREATE TABLE BridgeResponseCategories (
+        ResponseID INTEGER NOT NULL,
+        CategoryID INTEGER NOT NULL REFERENCES DimHealthcareCategory(CategoryID)
+    )
+    """,
+
+    'BridgeResponseRoles': """
+    CREATE TABLE BridgeResponseRoles (
+        ResponseID INTEGER NOT NULL,
+        RoleType TEXT,
+        RoleCategory TEXT
+    )
+    """,
+
+    'QuestionTagMappings': """
+    CREATE TABLE QuestionTagMappings (
+        MappingID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ResponseID INTEGER REFERENCES FactSurveyResponses(ResponseID),
+        QuestionID INTEGER REFERENCES DimQuestion(QuestionID),
+        TagID INTEGER NOT NULL REFERENCES DimTags(TagID),
+        TagType TEXT,
+        AssignmentType TEXT,
+        AppliedBy TEXT,
+        AppliedDate TEXT,
+        Notes TEXT,
+        IsActive INTEGER DEFAULT 1
+    )
+    """,
+
+    'ManualTagOverrides': """
+    CREATE TABLE ManualTagOverrides (
+        OverrideID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ResponseID INTEGER REFERENCES FactSurveyResponses(ResponseID),
+        SurveyResponseNumber INTEGER NOT NULL,
+        QuestionID INTEGER NOT NULL,
+        TagID INTEGER NOT NULL,
+        Action TEXT CHECK(Action IN ('ADD', 'REMOVE')) NOT NULL,
+        AppliedBy TEXT NOT NULL,
+        AppliedDate TEXT NOT NULL,
+        Notes TEXT,
+        IsActive INTEGER DEFAULT 1,
+        JournalSeq INTEGER,
+        BatchID TEXT,
+        FOREIGN KEY (TagID) REFERENCES DimTags(TagID)
+    )
+    """,
+
+    'OverrideJournalState': """
+    CREATE TABLE OverrideJournalState (
+        ID INTEGER PRIMARY KEY CHECK (ID = 1),
+        HighWaterMark INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+
+    # Materialized effective tags (algorithmic + question mappings + manual overrides)
+    'EffectiveResponseTags': """
+    CREATE TABLE EffectiveResponseTags (
+        ResponseID INTEGER NOT NULL,
+        TagID INTEGER NOT NULL,
+        Source TEXT CHECK(Source IN ('algorithmic', 'question-mapping', 'manual')) NOT NULL,
+        PRIMARY KEY (ResponseID, TagID)
+    ) WITHOUT ROWID
+    """,
+
+    # One row per effective tag re-resolution, so clients can sync changes since a version
+    'TagChangeLog': """
+    CREATE TABLE TagChangeLog (
+        ChangeSeq INTEGER PRIMARY KEY AUTOINCREMENT,
+        ResponseID INTEGER NOT NULL,
+        TagID INTEGER NOT NULL
+    )
+    """,
+
+    # Pre-rolled effective tag counts by role, geography, organization and question (see tag_cube.py)
+    'TagCube': """
+    CREATE TABLE TagCube (
+        TagID INTEGER NOT NULL,
+        RoleCategory TEXT,
+        RoleType TEXT,
+        PrimaryCounty TEXT,
+        Region TEXT,
+        OrganizationType TEXT,
+        QuestionID INTEGER,
+        ResponseCount INTEGER NOT NULL,
+        RespondentCount INTEGER NOT NULL
+    )
+    """,
+
+    # Last TagChangeLog entry the cube includes
+    'TagCubeState': """
+    CREATE TABLE TagCubeState (
+        ID INTEGER PRIMARY KEY CHECK (ID = 1),
+        ChangeSeq INTEGER NOT NULL
+    )
+    """
+}
+
+# Secondary indexes, created once the bulk load has finished
+INDEXES = [
+    "CREATE INDEX idx_fact_survey_number ON FactSurveyResponses(SurveyResponseNumber)",
+    "CREATE INDEX idx_fact_question_respondent ON FactSurveyResponses(QuestionID, SurveyResponseNumber)",
+    "CREATE INDEX idx_bridge_tags_tag ON BridgeResponseTags(TagID)",
+    "CREATE INDEX idx_tags_category ON DimTags(TagCategory)",
+    "CREATE INDEX idx_tags_parent ON DimTags(ParentTagID)",
+    "CREATE INDEX idx_role_category ON DimRole(RoleCategory)",
+    "CREATE INDEX idx_question_type ON DimQuestion(QuestionType)",
+    "CREATE INDEX idx_manual_overrides_response ON ManualTagOverrides(SurveyResponseNumber, QuestionID)",
+    "CREATE INDEX idx_manual_overrides_tag ON ManualTagOverrides(TagID)",
+    "CREATE UNIQUE INDEX idx_manual_overrides_journal ON ManualTagOverrides(JournalSeq)",
+    "CREATE INDEX idx_manual_overrides_pair ON ManualTagOverrides(ResponseID, TagID, AppliedDate)",
+    "CREATE INDEX idx_manual_overrides_batch ON ManualTagOverrides(BatchID) WHERE BatchID IS NOT NULL",
+    "CREATE INDEX idx_question_mappings_pair ON QuestionTagMappings(ResponseID, TagID)",
+    "CREATE INDEX idx_effective_tags_tag ON EffectiveResponseTags(TagID, ResponseID)",
+    "CREATE INDEX idx_tag_cube_slice ON TagCube(TagID, RoleCategory, RoleType, PrimaryCounty, Region, OrganizationType, QuestionID)"
+]
+
+def table_columns(conn, table_name):
+    """Return the column names of an existing table"""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+def create_schema(conn):
+    """Create every table from the explicit DDL"""
+    for table_name, ddl in TABLE_DDL.items():
+        conn.execute(ddl)
@@ -0,0 +1,210 @@
+"""
+Effective Tag Resolution
+The one definition of a response's effective tags, shared by the database build and
+every server endpoint:
+
+    1. The latest active manual override for a (ResponseID, TagID) pair wins
+       (AppliedDate, then OverrideID); a REMOVE hides the tag, an ADD makes it 'manual'
+    2. Otherwise an active question-tag mapping makes it 'question-mapping'
+    3. Otherwise an algorithmic tag from BridgeResponseTags makes it 'algorithmic'
+
+`ResolvedResponseTags` is the view form of these rules. `EffectiveResponseTags` is its
+materialized copy, kept current by triggers, and is what queries read. Every pair the
+triggers re-resolve is also logged to `TagChangeLog` for delta sync.
+"""
+
+import json
+
+RESOLVED_TAGS_VIEW = """
+CREATE VIEW ResolvedResponseTags AS
+WITH LatestOverrides AS (
+    SELECT ResponseID, TagID, Action,
+           ROW_NUMBER() OVER (PARTITION BY ResponseID, TagID
+                              ORDER BY AppliedDate DESC, OverrideID DESC) AS rn
+    FROM ManualTagOverrides
+    WHERE IsActive = 1 AND ResponseID IS NOT NULL
+),
+Candidates AS (
+    SELECT ResponseID, TagID FROM BridgeResponseTags
+    UNION
+    SELECT ResponseID, TagID FROM QuestionTagMappings WHERE IsActive = 1 AND ResponseID IS NOT NULL
+    UNION
+    SELECT ResponseID, TagID FROM LatestOverrides WHERE rn = 1 AND Action = 'ADD'
+)
+SELECT c.ResponseID, c.TagID,
+       CASE WHEN lo.Action = 'ADD' THEN 'manual'
+            WHEN EXISTS (SELECT 1 FROM QuestionTagMappings qtm
+                         WHERE qtm.ResponseID = c.ResponseID AND qtm.TagID = c.TagID
+                           AND qtm.IsActive = 1) THEN 'question-mapping'
+            ELSE 'algorithmic'
+       END AS Source
+FROM Candidates c
+LEFT JOIN LatestOverrides lo ON lo.ResponseID = c.ResponseID AND lo.TagID = c.TagID AND lo.rn = 1
+WHERE lo.Action IS NULL OR lo.Action = 'ADD'
+"""
+
+def resolve_pair_sql(response_id, tag_id):
+    """Trigger statements that re-resolve and log one (ResponseID, TagID) pair, e.g. NEW.ResponseID, NEW.TagID"""
+    return f"""
+        DELETE FROM EffectiveResponseTags WHERE ResponseID = {response_id} AND TagID = {tag_id};
+        INSERT INTO EffectiveResponseTags (ResponseID, TagID, Source)
+        SELECT {response_id}, {tag_id}, Source FROM (
+            SELECT CASE
+                WHEN lo.Action = 'ADD' THEN 'manual'
+                WHEN lo.Action = 'REMOVE' THEN NULL
+                WHEN EXISTS (SELECT 1 FROM QuestionTagMappings
+                             WHERE ResponseID = {response_id} AND TagID = {tag_id} AND IsActive = 1) THEN 'question-mapping'
+                WHEN EXISTS (SELECT 1 FROM BridgeResponseTags
+                             WHERE ResponseID = {response_id} AND TagID = {tag_id}) THEN 'algorithmic'
+            END AS Source
+            FROM (SELECT 1)
+            LEFT JOIN (SELECT Action FROM ManualTagOverrides
+                       WHERE ResponseID = {response_id} AND TagID = {tag_id} AND IsActive = 1
+                       ORDER BY AppliedDate DESC, OverrideID DESC LIMIT 1) lo
+        )
+        WHERE Source IS NOT NULL AND {response_id} IS NOT NULL;
+        INSERT INTO TagChangeLog (ResponseID, TagID)
+        SELECT {response_id}, {tag_id} WHERE {response_id} IS NOT NULL;"""
+
+# Keep EffectiveResponseTags current as overrides and mappings change
+EFFECTIVE_TAG_TRIGGERS = [
+    # Overrides saved without a ResponseID (legacy backups) are resolved from the survey keys
+    """
+    CREATE TRIGGER trg_overrides_fill_response AFTER INSERT ON ManualTagOverrides
+    WHEN NEW.ResponseID IS NULL
+    BEGIN
+        UPDATE ManualTagOverrides SET ResponseID = (
+            SELECT f.ResponseID FROM FactSurveyResponses f
+            WHERE f.SurveyResponseNumber = NEW.SurveyResponseNumber AND f.QuestionID = NEW.QuestionID
+        ) WHERE OverrideID = NEW.OverrideID;
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_overrides_insert AFTER INSERT ON ManualTagOverrides
+    WHEN NEW.ResponseID IS NOT NULL
+    BEGIN{resolve_pair_sql('NEW.ResponseID', 'NEW.TagID')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_overrides_update
+    AFTER UPDATE OF ResponseID, TagID, Action, AppliedDate, IsActive ON ManualTagOverrides
+    BEGIN{resolve_pair_sql('OLD.ResponseID', 'OLD.TagID')}{resolve_pair_sql('NEW.ResponseID', 'NEW.TagID')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_overrides_delete AFTER DELETE ON ManualTagOverrides
+    BEGIN{resolve_pair_sql('OLD.ResponseID', 'OLD.TagID')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_mappings_insert AFTER INSERT ON QuestionTagMappings
+    BEGIN{resolve_pair_sql('NEW.ResponseID', 'NEW.TagID')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_mappings_update
+    AFTER UPDATE OF ResponseID, TagID, IsActive ON QuestionTagMappings
+    BEGIN{resolve_pair_sql('OLD.ResponseID', 'OLD.TagID')}{resolve_pair_sql('NEW.ResponseID', 'NEW.TagID')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_mappings_delete AFTER DELETE ON QuestionTagMappings
+    BEGIN{resolve_pair_sql('OLD.ResponseID', 'OLD.TagID')}
+    END
+    """
+]
+
+# Tag details for a batch of responses, passed as one JSON array parameter
+EFFECTIVE_TAG_DETAILS_QUERY = """
+SELECT ert.ResponseID,
+       t.TagID,
+       t.TagName,
+       t.TagCategory,
+       t.TagDescription,
+       t.TagLevel,
+       t.ParentTagID,
+       CASE WHEN t.TagLevel = 1 THEN t.TagName ELSE p.TagName END AS PrimaryTagName,
+       ert.Source,
+       CASE WHEN ert.Source = 'manual' THEN 1 ELSE 0 END AS IsManuallyAdded
+FROM EffectiveResponseTags ert
+JOIN DimTags t ON ert.TagID = t.TagID
+LEFT JOIN DimTags p ON t.ParentTagID = p.TagID
+WHERE ert.ResponseID IN (SELECT value FROM json_each(?)) AND t.IsActive = 1
+ORDER BY ert.ResponseID, t.TagLevel, t.TagName
+"""
+
+def materialize_effective_tags(conn):
+    """Rebuild EffectiveResponseTags from the view and install the triggers that maintain it"""
+    for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP VIEW IF EXISTS ResolvedResponseTags")
+    conn.execute(RESOLVED_TAGS_VIEW)
+    with conn:
+        # Backfill ResponseID on overrides restored from older backups
+        conn.execute("""
+        UPDATE ManualTagOverrides SET ResponseID = (
+            SELECT f.ResponseID FROM FactSurveyResponses f
+            WHERE f.SurveyResponseNumber = ManualTagOverrides.SurveyResponseNumber
+              AND f.QuestionID = ManualTagOverrides.QuestionID
+        ) WHERE ResponseID IS NULL
+        """)
+        conn.execute("DELETE FROM EffectiveResponseTags")
+        conn.execute("""
+        INSERT INTO EffectiveResponseTags (ResponseID, TagID, Source)
+        SELECT ResponseID, TagID, Source FROM ResolvedResponseTags
+        """)
+    for trigger in EFFECTIVE_TAG_TRIGGERS:
+        conn.execute(trigger)
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM EffectiveResponseTags").fetchone()[0]
+
+def get_effective_tags_for_responses(conn, response_ids):
+    """Effective tags for many responses in one query, as {ResponseID: [tag dicts]}
+
+    Tags are ordered by level then name; responses without tags map to an empty list.
+    """
+    response_ids = list(response_ids)
+    tags_by_response = {response_id: [] for response_id in response_ids}
+    if not response_ids:
+        return tags_by_response
+
+    cursor = conn.execute(EFFECTIVE_TAG_DETAILS_QUERY, (json.dumps(response_ids),))
+    columns = [description[0] for description in cursor.description]
+    for row in cursor:
+        tag = dict(zip(columns, row))
+        tags_by_response[tag.pop('ResponseID')].append(tag)
+    return tags_by_response
+
+def get_tag_posting_list(conn, tag_id):
+    """ResponseIDs that effectively carry a tag, read from the (TagID, ResponseID) index"""
+    return [row[0] for row in conn.execute(
+        "SELECT ResponseID FROM EffectiveResponseTags WHERE TagID = ? ORDER BY ResponseID", (tag_id,)
+    )]
+
+def get_tag_changes(conn, since):
+    """Responses and tags re-resolved after change `since`, as (version, response_ids, tag_ids)
+
+    `version` is the latest change number; pass it back as `since` next time.
+    """
+    version = conn.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0]
+    response_ids, tag_ids = set(), set()
+    for response_id, tag_id in conn.execute(
+        "SELECT ResponseID, TagID FROM TagChangeLog WHERE ChangeSeq > ? AND ChangeSeq <= ?", (since, version)
+    ):
+        response_ids.add(response_id)
+        tag_ids.add(tag_id)
+    return version, sorted(response_ids), sorted(tag_ids)
+
+if __name__ == "__main__":
+    # Check the materialized tags against the view
+    import sqlite3
+    import os
+    from config import OUTPUT_DIR
+
+    conn = sqlite3.connect(os.path.join(OUTPUT_DIR, 'survey_analysis.db'))
+    drift = conn.execute("""
+    SELECT (SELECT COUNT(*) FROM (SELECT * FROM ResolvedResponseTags EXCEPT SELECT * FROM EffectiveResponseTags))
+         + (SELECT COUNT(*) FROM (SELECT * FROM EffectiveResponseTags EXCEPT SELECT * FROM ResolvedResponseTags))
+    """).fetchone()[0]
+    print("✅ Effective tags match the view" if drift == 0 else f"❌ {drift} effective tag rows differ from the view")
+    conn.close()
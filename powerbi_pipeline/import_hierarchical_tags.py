@@ -9,24 +9,25 @@ import pandas as pd
 import sqlite3
 import os
 from datetime import datetime
-from config import OUTPUT_DIR
+from config import OUTPUT_DIR, EXCEL_TEMPLATES_DIR
 
-def get_db_connection():
+def get_db_connection(db_path=None):
     """Get database connection"""
-    db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
+    if db_path is None:
+        db_path = os.path.join(OUTPUT_DIR, 'survey_analysis.db')
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     return conn
 
-def import_tag_hierarchy():
+def import_tag_hierarchy(db_path=None):
     """Import Primary -> Sub tag relationships"""
     print("📋 Importing tag hierarchy...")
     
     # Read tag structure
-    structure_path = "/Users/strattoncarroll/Documents/survey-model/excel_templates/tag_structure.xlsx"
+    structure_path = os.path.join(EXCEL_TEMPLATES_DIR, 'tag_structure.xlsx')
     df_structure = pd.read_excel(structure_path)
     
-    conn = get_db_connection()
+    conn = get_db_connection(db_path)
     
     # Get current max TagID
     max_tag_query = "SELECT MAX(TagID) as max_id FROM DimTags"
@@ -84,15 +85,15 @@ def import_tag_hierarchy():
     conn.close()
     print(f"🎉 Tag hierarchy imported successfully!")
 
-def import_question_tag_mappings():
+def import_question_tag_mappings(db_path=None):
     """Import Response -> Tag mappings from tags_normalized.xlsx"""
     print("📊 Importing question-tag mappings...")
     
     # Read normalized tags
-    normalized_path = "/Users/strattoncarroll/Documents/survey-model/excel_templates/tags_normalized.xlsx"
+    normalized_path = os.path.join(EXCEL_TEMPLATES_DIR, 'tags_normalized.xlsx')
     df_normalized = pd.read_excel(normalized_path)
     
-    conn = get_db_connection()
+    conn = get_db_connection(db_path)
     
     current_time = datetime.now().isoformat()
     inserted_count = 0
@@ -0,0 +1,233 @@
+"""
+Manual Tag Override Journal
+Append-only log of override actions (and imported question-tag mappings) kept in its own
+SQLite file, so edits made while the database is being rebuilt are replayed into the new
+generation
+"""
+
+import sqlite3
+import os
+from datetime import datetime
+
+from tag_cube import refresh_tag_cube
+
+JOURNAL_FILENAME = 'override_journal.db'
+
+JOURNAL_DDL = """
+CREATE TABLE IF NOT EXISTS OverrideJournal (
+    Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ResponseID INTEGER,
+    SurveyResponseNumber INTEGER NOT NULL,
+    QuestionID INTEGER NOT NULL,
+    TagID INTEGER NOT NULL,
+    Action TEXT CHECK(Action IN ('ADD', 'REMOVE')) NOT NULL,
+    AppliedBy TEXT NOT NULL,
+    AppliedDate TEXT NOT NULL,
+    Notes TEXT,
+    BatchID TEXT
+)
+"""
+
+# Batches that have been undone; replays deactivate their overrides
+UNDONE_BATCHES_DDL = """
+CREATE TABLE IF NOT EXISTS UndoneBatches (
+    BatchID TEXT PRIMARY KEY,
+    UndoneBy TEXT,
+    UndoneDate TEXT
+)
+"""
+
+# Question-tag mappings from the Excel import, applied as upserts on (QuestionID, TagID)
+MAPPING_JOURNAL_DDL = """
+CREATE TABLE IF NOT EXISTS MappingJournal (
+    Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    QuestionID INTEGER NOT NULL,
+    TagID INTEGER NOT NULL,
+    AssignmentType TEXT,
+    AppliedBy TEXT NOT NULL,
+    AppliedDate TEXT NOT NULL,
+    Notes TEXT
+)
+"""
+
+# Lives in the survey database: the last journal entry applied to it
+REPLAY_STATE_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    ID INTEGER PRIMARY KEY CHECK (ID = 1),
+    HighWaterMark INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+OVERRIDE_STATE_TABLE = 'OverrideJournalState'
+MAPPING_STATE_TABLE = 'MappingJournalState'
+
+JOURNAL_COLUMNS = ['ResponseID', 'SurveyResponseNumber', 'QuestionID', 'TagID',
+                   'Action', 'AppliedBy', 'AppliedDate', 'Notes', 'BatchID']
+
+MAPPING_JOURNAL_COLUMNS = ['QuestionID', 'TagID', 'AssignmentType', 'AppliedBy', 'AppliedDate', 'Notes']
+
+def journal_path(data_dir):
+    """Location of the journal next to the survey database"""
+    return os.path.join(data_dir, JOURNAL_FILENAME)
+
+def open_journal(path):
+    """Open (creating if needed) the override journal"""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(JOURNAL_DDL)
+    conn.execute(UNDONE_BATCHES_DDL)
+    conn.execute(MAPPING_JOURNAL_DDL)
+    if 'BatchID' not in {row[1] for row in conn.execute("PRAGMA table_info(OverrideJournal)")}:
+        conn.execute("ALTER TABLE OverrideJournal ADD COLUMN BatchID TEXT")
+    conn.commit()
+    return conn
+
+def append_overrides(path, entries, table='OverrideJournal', columns=JOURNAL_COLUMNS):
+    """Append override entries (dicts keyed by JOURNAL_COLUMNS) in one transaction and return their sequence numbers"""
+    conn = open_journal(path)
+    try:
+        insert_sql = f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['?'] * len(columns))})
+        """
+        rows = [[entry.get(col) for col in columns] for entry in entries]
+        if not rows:
+            return []
+        with conn:
+            conn.executemany(insert_sql, rows)
+            # AUTOINCREMENT hands out consecutive sequence numbers within the transaction
+            last_seq = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_seq - len(rows) + 1, last_seq + 1))
+    finally:
+        conn.close()
+
+def append_mappings(path, entries):
+    """Append question-tag mapping entries (dicts keyed by MAPPING_JOURNAL_COLUMNS); returns their sequence numbers"""
+    return append_overrides(path, entries, 'MappingJournal', MAPPING_JOURNAL_COLUMNS)
+
+def append_overrides_from_query(conn, path, select_sql, params=()):
+    """Append the rows of a SELECT run against `conn` (one value per JOURNAL_COLUMNS entry)
+    with a single INSERT ... SELECT; returns the number of entries appended"""
+    open_journal(path).close()
+    conn.execute("ATTACH DATABASE ? AS journal", (path,))
+    try:
+        with conn:
+            cursor = conn.execute(f"""
+            INSERT INTO journal.OverrideJournal ({', '.join(JOURNAL_COLUMNS)})
+            {select_sql}
+            """, params)
+        return cursor.rowcount
+    finally:
+        conn.execute("DETACH DATABASE journal")
+
+def undo_batch(path, batch_id, undone_by):
+    """Journal the undo of an override batch; returns False if it was already undone"""
+    conn = open_journal(path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO UndoneBatches (BatchID, UndoneBy, UndoneDate) VALUES (?, ?, ?)",
+                (batch_id, undone_by, datetime.now().isoformat())
+            )
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+def get_high_water_mark(conn, state_table=OVERRIDE_STATE_TABLE):
+    """Last journal sequence number applied to a survey database"""
+    conn.execute(REPLAY_STATE_DDL.format(table=state_table))
+    row = conn.execute(f"SELECT HighWaterMark FROM {state_table} WHERE ID = 1").fetchone()
+    return row[0] if row else 0
+
+def set_high_water_mark(conn, seq, state_table=OVERRIDE_STATE_TABLE):
+    """Record the last journal sequence number applied to a survey database"""
+    conn.execute(REPLAY_STATE_DDL.format(table=state_table))
+    conn.execute(f"""
+    INSERT INTO {state_table} (ID, HighWaterMark) VALUES (1, ?)
+    ON CONFLICT(ID) DO UPDATE SET HighWaterMark = excluded.HighWaterMark
+    """, (seq,))
+
+def apply_mapping_entries(conn, since):
+    """Upsert the journaled mappings after `since` into QuestionTagMappings, in journal order
+
+    Returns (latest sequence number applied or None, mappings changed).
+    """
+    entries = conn.execute(f"""
+    SELECT Seq, {', '.join(MAPPING_JOURNAL_COLUMNS)} FROM journal.MappingJournal
+    WHERE Seq > ? ORDER BY Seq
+    """, (since,)).fetchall()
+    changed = 0
+    for seq, question_id, tag_id, assignment_type, applied_by, applied_date, notes in entries:
+        cursor = conn.execute("""
+        UPDATE QuestionTagMappings
+        SET AssignmentType = ?, AppliedBy = ?, AppliedDate = ?, Notes = ?, IsActive = 1
+        WHERE QuestionID = ? AND TagID = ?
+        """, (assignment_type, applied_by, applied_date, notes, question_id, tag_id))
+        if cursor.rowcount == 0:
+            cursor = conn.execute("""
+            INSERT INTO QuestionTagMappings (QuestionID, TagID, AssignmentType, AppliedBy, AppliedDate, Notes, IsActive)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+            """, (question_id, tag_id, assignment_type, applied_by, applied_date, notes))
+        changed += cursor.rowcount
+    return (entries[-1][0] if entries else None), changed
+
+def replay_journal(conn, path):
+    """Apply journal entries past the database's high-water mark, then deactivate the
+    overrides of undone batches; returns the number of overrides and mappings changed
+
+    Journaled mappings have their own high-water mark. Rebuilt databases start it at zero,
+    so every imported mapping is re-applied to the new generation.
+
+    Runs as one IMMEDIATE transaction so concurrent replays cannot apply an entry twice.
+    The tag cube is refreshed in that transaction too, so no reader sees effective tag
+    changes without the matching cube counts.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    open_journal(path).close()
+    # Databases built before a journal column existed take the columns they have
+    target_columns = {row[1] for row in conn.execute("PRAGMA table_info(ManualTagOverrides)")}
+    columns = [col for col in JOURNAL_COLUMNS if col in target_columns]
+    conn.execute("ATTACH DATABASE ? AS journal", (path,))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            high_water_mark = get_high_water_mark(conn)
+            latest = conn.execute(
+                "SELECT MAX(Seq) FROM journal.OverrideJournal WHERE Seq > ?", (high_water_mark,)
+            ).fetchone()[0]
+
+            changed = 0
+            if latest is not None:
+                column_list = ', '.join(columns)
+                cursor = conn.execute(f"""
+                INSERT OR IGNORE INTO ManualTagOverrides ({column_list}, JournalSeq)
+                SELECT {column_list}, Seq
+                FROM journal.OverrideJournal
+                WHERE Seq > ? AND Seq <= ?
+                ORDER BY Seq
+                """, (high_water_mark, latest))
+                changed += cursor.rowcount
+                set_high_water_mark(conn, latest)
+
+            if 'BatchID' in target_columns:
+                cursor = conn.execute("""
+                UPDATE ManualTagOverrides SET IsActive = 0
+                WHERE IsActive = 1 AND BatchID IN (SELECT BatchID FROM journal.UndoneBatches)
+                """)
+                changed += cursor.rowcount
+
+            latest_mapping, mappings_changed = apply_mapping_entries(conn, get_high_water_mark(conn, MAPPING_STATE_TABLE))
+            if latest_mapping is not None:
+                set_high_water_mark(conn, latest_mapping, MAPPING_STATE_TABLE)
+                changed += mappings_changed
+
+            refresh_tag_cube(conn)
+            conn.commit()
+            return changed
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE journal")
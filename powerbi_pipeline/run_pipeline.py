@@ -3,15 +3,22 @@ Main pipeline orchestrator
 Runs all dimension and fact table creation in proper order
 """
 
+import argparse
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add pipeline directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
-def run_pipeline():
-    """Execute the complete Power BI data model pipeline"""
+def run_pipeline(build_database=False, export_csv=True):
+    """Execute the complete Power BI data model pipeline
+    
+    Args:
+        build_database: Load the in-memory tables straight into the SQLite database
+        export_csv: Write the Power BI CSV files (in parallel with the database load)
+    """
     print("🚀 Starting Power BI Data Model Pipeline")
     print("=" * 60)
     
@@ -25,15 +32,19 @@ def run_pipeline():
         if df is None:
             raise Exception("Failed to load survey data")
         
-        validation = validate_data(df)
-        open_ended_cols = identify_open_ended_columns(df)
+        # Profile every column once; question typing and open-ended detection read it
+        from survey_profile import get_survey_profile
+        profile = get_survey_profile(df)
+        
+        validation = validate_data(df, profile)
+        open_ended_cols = identify_open_ended_columns(df, profile)
         print(f"   ✅ Data loaded: {validation['total_responses']} responses")
         print(f"   ✅ Open-ended questions: {len(open_ended_cols)}")
         
         # Step 2: Process text responses
         print("\n🔧 Step 2: Processing text responses...")
         from text_processing import batch_process_responses
-        processed_responses = batch_process_responses(df, open_ended_cols[:8])  # Process more open-ended questions
+        processed_responses = batch_process_responses(df, open_ended_cols)
         print(f"   ✅ Processed {len(processed_responses)} response records")
         
         # Step 3: Create dimension tables
@@ -61,7 +72,7 @@ def run_pipeline():
         
         # Question Dimension
         from dim_question import create_question_dimension
-        dim_question = create_question_dimension(df)
+        dim_question = create_question_dimension(df, profile)
         print(f"   ✅ DimQuestion: {len(dim_question)} records")
         
         # Role Dimension
@@ -92,10 +103,7 @@ def run_pipeline():
         bridge_tags = create_individual_response_tag_bridge(fact_table, dim_tags)
         print(f"   ✅ BridgeResponseTags: {len(bridge_tags)} records")
         
-        # Step 6: Export to CSV
-        print("\n📁 Step 6: Exporting to CSV files...")
-        from export_csvs import export_all_tables
-        
+        # Step 6: Export to CSV and/or load SQLite
         tables = {
             'DimHealthcareCategory': dim_healthcare_category,
             'DimGeography': dim_geography,
@@ -110,16 +118,33 @@ def run_pipeline():
             'BridgeResponseTags': bridge_tags
         }
         
-        exported_files = export_all_tables(tables)
-        print(f"   ✅ Exported {len(exported_files)} CSV files")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            csv_export = None
+            if export_csv:
+                print("\n📁 Step 6: Exporting to CSV files...")
+                from export_csvs import export_all_tables
+                csv_export = executor.submit(export_all_tables, tables)
+            
+            if build_database:
+                print("\n🗄️ Step 6: Loading tables into SQLite...")
+                from create_sqlite_db import create_survey_database
+                db_path = create_survey_database(tables)
+                if db_path is None:
+                    raise Exception("Failed to build SQLite database")
+                print(f"   ✅ Database built: {db_path}")
+            
+            if csv_export is not None:
+                exported_files = csv_export.result()
+                print(f"   ✅ Exported {len(exported_files)} CSV files")
         
         # Pipeline completion
         elapsed_time = time.time() - start_time
         print("\n" + "=" * 60)
         print("🎉 PIPELINE COMPLETED SUCCESSFULLY!")
         print(f"⏱️ Total execution time: {elapsed_time:.1f} seconds")
-        print(f"📂 Files exported to: powerbi_data_model/")
-        print("\n💡 Next step: Import CSV files into Power BI Desktop")
+        if export_csv:
+            print(f"📂 Files exported to: powerbi_data_model/")
+            print("\n💡 Next step: Import CSV files into Power BI Desktop")
         
         return True
         
@@ -128,5 +153,12 @@ def run_pipeline():
         return False
 
 if __name__ == "__main__":
-    success = run_pipeline()
+    parser = argparse.ArgumentParser(description="Build the Power BI data model")
+    parser.add_argument('--sqlite', action='store_true',
+                        help="load the tables straight into survey_analysis.db")
+    parser.add_argument('--no-csv', action='store_true',
+                        help="skip the CSV export")
+    args = parser.parse_args()
+    
+    success = run_pipeline(build_database=args.sqlite, export_csv=not args.no_csv)
     sys.exit(0 if success else 1)
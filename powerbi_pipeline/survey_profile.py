@@ -0,0 +1,136 @@
+"""
+Survey Column Profiler
+Computes fill, length, distinctness and token statistics for every column in one
+vectorized pass and caches the result by a hash of the survey's contents
+"""
+
+import hashlib
+import pandas as pd
+import sys
+import os
+
+# Add pipeline directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+
+from config import (PROFILE_CACHE_DIR, STRUCTURED_COLUMNS, EXCLUDE_PATTERNS,
+                   OPEN_ENDED_MIN_MEDIAN_LENGTH, OPEN_ENDED_MIN_MEDIAN_TOKENS,
+                   OPEN_ENDED_MIN_DISTINCT_RATIO, CATEGORICAL_MAX_DISTINCT_RATIO)
+
+# Bump when the profile columns or their definitions change to invalidate old caches
+PROFILE_VERSION = 2
+
+# Question types that can only be recognised from the question wording
+QUESTION_TYPE_KEYWORDS = [
+    ('Consent', ['consent']),
+    ('Multiple Choice', ['select your top', 'choices', '(select']),
+    ('Scale/Frequency', ['travel', 'often', 'far']),
+]
+
+def hash_dataframe(df):
+    """Return the SHA-256 hex digest of a DataFrame's column names, index and values"""
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+def compute_survey_profile(df):
+    """Profile every column of the survey in a single vectorized pass"""
+    columns = list(df.columns)
+    row_count = len(df)
+
+    # Long format: one row per non-null cell, so every column is profiled by one groupby
+    long_df = (df.astype('string')
+                 .melt(var_name='Column', value_name='Value')
+                 .dropna(subset=['Value']))
+    long_df['Value'] = long_df['Value'].str.strip()
+    long_df = long_df[long_df['Value'] != '']
+    long_df['Length'] = long_df['Value'].str.len()
+    long_df['Tokens'] = long_df['Value'].str.count(r'\S+')
+
+    grouped = long_df.groupby('Column', sort=False)
+    lengths = grouped['Length'].quantile([0.1, 0.5, 0.9]).unstack()
+
+    profile = pd.DataFrame({
+        'NonNullCount': df.notna().sum(),
+        'FillCount': grouped.size(),
+        'DistinctCount': grouped['Value'].nunique(),
+        'LengthMean': grouped['Length'].mean(),
+        'LengthP10': lengths[0.1] if len(lengths) else None,
+        'LengthP50': lengths[0.5] if len(lengths) else None,
+        'LengthP90': lengths[0.9] if len(lengths) else None,
+        'LengthMax': grouped['Length'].max(),
+        'TokenMean': grouped['Tokens'].mean(),
+        'TokenP50': grouped['Tokens'].median(),
+    }, index=columns)
+
+    count_columns = ['NonNullCount', 'FillCount', 'DistinctCount', 'LengthMax']
+    profile[count_columns] = profile[count_columns].fillna(0).astype(int)
+    profile = profile.fillna(0.0)
+    profile['FillRate'] = (profile['FillCount'] / row_count * 100).round(1) if row_count else 0.0
+    profile['DistinctRatio'] = (profile['DistinctCount'] / profile['FillCount'].where(profile['FillCount'] > 0)).fillna(0.0).round(3)
+    profile['IsStructured'] = profile.index.isin(STRUCTURED_COLUMNS)
+    # Questions about the respondent's organization, role or time answer from a fixed set
+    # of groups or levels, so they stay out of text analysis even when answered in prose
+    exclude_patterns = [pattern.lower() for pattern in EXCLUDE_PATTERNS]
+    profile['IsTextExcluded'] = [any(pattern in col.lower() for pattern in exclude_patterns) for col in columns]
+    profile['IsOpenEnded'] = (
+        ~profile['IsStructured']
+        & (profile['LengthP50'] > OPEN_ENDED_MIN_MEDIAN_LENGTH)
+        & (profile['TokenP50'] >= OPEN_ENDED_MIN_MEDIAN_TOKENS)
+        & (profile['DistinctRatio'] >= OPEN_ENDED_MIN_DISTINCT_RATIO)
+    )
+    profile.index.name = 'Column'
+
+    return profile
+
+def get_survey_profile(df, use_cache=True):
+    """Return the survey profile, reusing the cached copy when the same data was profiled before
+
+    The cache is keyed by the DataFrame's own contents, so filtered or transformed frames
+    get their own profile.
+    """
+    if not use_cache:
+        return compute_survey_profile(df)
+
+    data_hash = hash_dataframe(df)
+    cache_path = os.path.join(PROFILE_CACHE_DIR, f"survey_profile_v{PROFILE_VERSION}_{data_hash[:16]}.pkl")
+
+    if os.path.exists(cache_path):
+        try:
+            profile = pd.read_pickle(cache_path)
+            if list(profile.index) == list(df.columns):
+                print(f"📦 Loaded cached survey profile ({data_hash[:8]})")
+                return profile
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable profile cache: {str(e)}")
+
+    profile = compute_survey_profile(df)
+    os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+    profile.to_pickle(cache_path)
+    print(f"🔬 Profiled {len(profile)} columns ({data_hash[:8]})")
+
+    return profile
+
+def classify_question_type(column, column_profile):
+    """Classify a question from its wording first, then from its profiled answers"""
+    column_lower = column.lower()
+    for question_type, phrases in QUESTION_TYPE_KEYWORDS:
+        if any(phrase in column_lower for phrase in phrases):
+            return question_type
+
+    if column_profile['FillCount'] == 0:
+        # No answers to profile, so fall back to the question length
+        return 'Open-Ended' if len(column) > 80 else 'Short Answer'
+    if column_profile['IsOpenEnded']:
+        return 'Open-Ended'
+    if column_profile['DistinctRatio'] <= CATEGORICAL_MAX_DISTINCT_RATIO:
+        return 'Multiple Choice'
+    return 'Short Answer'
+
+if __name__ == "__main__":
+    # Test the profiler
+    from data_loader import load_survey_data
+    df = load_survey_data()
+    if df is not None:
+        profile = get_survey_profile(df)
+        print(profile[['FillRate', 'LengthP50', 'TokenP50', 'DistinctRatio', 'IsOpenEnded']].to_string())
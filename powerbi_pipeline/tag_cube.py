@@ -0,0 +1,132 @@
+"""
+Tag Cube
+Pre-rolled effective tag counts, so dashboards and analytics endpoints read a small
+aggregate instead of joining the fact, dimension and tag tables. `TagCube` has one row per
+combination of tag, RoleCategory, RoleType, PrimaryCounty, Region, OrganizationType and
+question that has at least one tagged response:
+
+    QuestionID = n      ResponseCount / RespondentCount for that question
+    QuestionID NULL     the same slice across all questions, each respondent counted once
+
+A respondent's role, geography and organization are the same for every question, so both
+counts add up over those columns; RespondentCount does not add up over questions, which is
+what the QuestionID NULL rows are for.
+
+The cube is built with the database and then refreshed incrementally from `TagChangeLog`:
+only the slices (tag plus role/geography/organization) of re-resolved pairs are recounted.
+"""
+
+# Each response with the cube's dimensions
+CUBE_DIMENSIONS_VIEW = """
+CREATE VIEW TagCubeDimensions AS
+SELECT f.ResponseID,
+       f.SurveyResponseNumber,
+       f.QuestionID,
+       r.RoleCategory,
+       r.RoleType,
+       g.PrimaryCounty,
+       g.Region,
+       o.OrganizationType
+FROM FactSurveyResponses f
+LEFT JOIN DimRole r ON f.RoleID = r.RoleID
+LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
+LEFT JOIN DimOrganization o ON f.OrganizationID = o.OrganizationID
+"""
+
+SLICE_COLUMNS = ['RoleCategory', 'RoleType', 'PrimaryCounty', 'Region', 'OrganizationType']
+
+def cube_insert_sql(where=''):
+    """INSERT ... SELECT of the question-level and all-question rows for the tagged responses matching `where`"""
+    slice_columns = ', '.join(f"d.{column}" for column in SLICE_COLUMNS)
+    return f"""
+    INSERT INTO TagCube (TagID, {', '.join(SLICE_COLUMNS)}, QuestionID, ResponseCount, RespondentCount)
+    SELECT ert.TagID, {slice_columns}, d.QuestionID, COUNT(*), COUNT(DISTINCT d.SurveyResponseNumber)
+    FROM EffectiveResponseTags ert
+    JOIN TagCubeDimensions d ON d.ResponseID = ert.ResponseID
+    {where}
+    GROUP BY ert.TagID, {slice_columns}, d.QuestionID
+    UNION ALL
+    SELECT ert.TagID, {slice_columns}, NULL, COUNT(*), COUNT(DISTINCT d.SurveyResponseNumber)
+    FROM EffectiveResponseTags ert
+    JOIN TagCubeDimensions d ON d.ResponseID = ert.ResponseID
+    {where}
+    GROUP BY ert.TagID, {slice_columns}
+    """
+
+# Rows whose tag and slice match a dirty slice (IS, since slice columns can be NULL)
+DIRTY_SLICE_MATCH = ' AND '.join(f"x.{column} IS {{alias}}.{column}" for column in SLICE_COLUMNS)
+
+def has_tag_cube(conn):
+    """Whether the database was built with a tag cube"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'TagCubeState'"
+    ).fetchone() is not None
+
+def build_tag_cube(conn):
+    """Count every slice from scratch and mark the cube current with the change log"""
+    conn.execute("DROP VIEW IF EXISTS TagCubeDimensions")
+    conn.execute(CUBE_DIMENSIONS_VIEW)
+    with conn:
+        conn.execute("DELETE FROM TagCube")
+        conn.execute(cube_insert_sql())
+        conn.execute(
+            "INSERT OR REPLACE INTO TagCubeState (ID, ChangeSeq) SELECT 1, COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog"
+        )
+    return conn.execute("SELECT COUNT(*) FROM TagCube").fetchone()[0]
+
+def refresh_tag_cube(conn):
+    """Recount the slices touched by effective tag changes since the last refresh
+
+    Runs inside the caller's transaction. Returns the number of slices recounted, or None
+    for databases built without a cube.
+    """
+    if not has_tag_cube(conn):
+        return None
+
+    since = conn.execute("SELECT ChangeSeq FROM TagCubeState WHERE ID = 1").fetchone()[0]
+    version = conn.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0]
+    if version <= since:
+        return 0
+
+    conn.execute("DROP TABLE IF EXISTS temp.TagCubeDirty")
+    conn.execute(f"""
+    CREATE TEMP TABLE TagCubeDirty AS
+    SELECT DISTINCT l.TagID, {', '.join(f"d.{column}" for column in SLICE_COLUMNS)}
+    FROM TagChangeLog l
+    JOIN TagCubeDimensions d ON d.ResponseID = l.ResponseID
+    WHERE l.ChangeSeq > ? AND l.ChangeSeq <= ?
+    """, (since, version))
+    conn.execute(f"CREATE INDEX temp.idx_tag_cube_dirty ON TagCubeDirty(TagID, {', '.join(SLICE_COLUMNS)})")
+
+    # CROSS JOIN keeps the few dirty slices as the outer loop; the temp table has no statistics
+    conn.execute(f"""
+    DELETE FROM TagCube WHERE rowid IN (
+        SELECT c.rowid FROM temp.TagCubeDirty x
+        CROSS JOIN TagCube c ON c.TagID = x.TagID AND {DIRTY_SLICE_MATCH.format(alias='c')}
+    )
+    """)
+    conn.execute(cube_insert_sql(f"""
+    WHERE ert.TagID IN (SELECT TagID FROM temp.TagCubeDirty)
+      AND EXISTS (SELECT 1 FROM temp.TagCubeDirty x WHERE x.TagID = ert.TagID AND {DIRTY_SLICE_MATCH.format(alias='d')})
+    """))
+    conn.execute("UPDATE TagCubeState SET ChangeSeq = ? WHERE ID = 1", (version,))
+
+    recounted = conn.execute("SELECT COUNT(*) FROM temp.TagCubeDirty").fetchone()[0]
+    conn.execute("DROP TABLE temp.TagCubeDirty")
+    return recounted
+
+if __name__ == "__main__":
+    # Check the refreshed cube against a full recount
+    import sqlite3
+    import os
+    from config import OUTPUT_DIR
+
+    conn = sqlite3.connect(os.path.join(OUTPUT_DIR, 'survey_analysis.db'))
+    conn.execute("CREATE TEMP TABLE TagCube AS SELECT * FROM main.TagCube WHERE 0")
+    conn.execute(cube_insert_sql().replace("INSERT INTO TagCube", "INSERT INTO temp.TagCube"))
+    drift = conn.execute("""
+    SELECT (SELECT COUNT(*) FROM (SELECT * FROM main.TagCube EXCEPT SELECT * FROM temp.TagCube))
+         + (SELECT COUNT(*) FROM (SELECT * FROM temp.TagCube EXCEPT SELECT * FROM main.TagCube))
+    """).fetchone()[0]
+    print("✅ Tag cube matches a full recount" if drift == 0 else f"❌ {drift} tag cube rows differ from a full recount")
+    conn.close()
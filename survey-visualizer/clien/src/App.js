@@ -43,6 +43,8 @@ function App() {
   const [overrideStats, setOverrideStats] = useState(null);
   const [previousView, setPreviousView] = useState('tags');
   const [showingSubTagsFor, setShowingSubTagsFor] = useState(null);
+  const [changeSync, setChangeSync] = useState(null); // { generation, version } of the loaded data
+  const [remoteChanges, setRemoteChanges] = useState(0); // bumped by server-sent events
 
   useEffect(() => {
     if (currentView === 'tags') {
@@ -52,7 +54,13 @@ function App() {
         .catch(error => console.error('Error fetching tags:', error));
     } else if (currentView === 'responses') {
       setLoading(true);
-      fetch('http://10.71.0.5:5000/api/responses')
+      // Take the change version first, so later syncs cover anything changed during the load
+      fetch('http://10.71.0.5:5000/api/changes')
+        .then(response => response.json())
+        .then(sync => {
+          setChangeSync(sync);
+          return fetch('http://10.71.0.5:5000/api/responses');
+        })
         .then(response => response.json())
         .then(data => setQuestionsWithResponses(data))
         .catch(error => console.error('Error fetching responses:', error))
@@ -73,6 +81,31 @@ function App() {
     }
   }, [currentView]);
 
+  useEffect(() => {
+    // Live updates as other reviewers' overrides are committed
+    const events = new EventSource('http://10.71.0.5:5000/api/events');
+    events.addEventListener('tags', () => setRemoteChanges(count => count + 1));
+    events.addEventListener('reset', () => setRemoteChanges(count => count + 1));
+    // A refused stream (503 when the server is at its stream limit) is not retried, so poll instead
+    let poll = null;
+    events.onerror = () => {
+      if (events.readyState === EventSource.CLOSED && poll === null) {
+        poll = setInterval(() => setRemoteChanges(count => count + 1), 30000);
+      }
+    };
+    return () => {
+      events.close();
+      if (poll !== null) clearInterval(poll);
+    };
+  }, []);
+
+  useEffect(() => {
+    if (remoteChanges > 0 && currentView === 'responses') {
+      syncChanges();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [remoteChanges]);
+
   const handleTagClick = async (tag) => {
     setSelectedTag(tag);
     setCurrentView('tag-detail');
@@ -139,6 +172,35 @@ function App() {
     setLoading(false);
   };
 
+  const loadResponses = async () => {
+    const syncResponse = await fetch('http://10.71.0.5:5000/api/changes');
+    setChangeSync(await syncResponse.json());
+    const responsesResponse = await fetch('http://10.71.0.5:5000/api/responses');
+    setQuestionsWithResponses(await responsesResponse.json());
+  };
+
+  // Patch loaded responses and tag counts with the tag changes made since the last sync
+  const syncChanges = async () => {
+    if (!changeSync) return;
+    const response = await fetch(`http://10.71.0.5:5000/api/changes?since=${changeSync.version}&generation=${changeSync.generation}`);
+    const changes = await response.json();
+    if (changes.reset) {
+      // The database was rebuilt or too much changed; reload, or drop the stale version if nothing is loaded
+      if (questionsWithResponses.length > 0) {
+        await loadResponses();
+      } else {
+        setChangeSync(null);
+      }
+      return;
+    }
+    setChangeSync({ generation: changes.generation, version: changes.version });
+    setQuestionsWithResponses(prev => prev.map(question => ({
+      ...question,
+      responses: question.responses.map(r => changes.responses[r.ResponseID] ? { ...r, Tags: changes.responses[r.ResponseID] } : r)
+    })));
+    setTags(prev => prev.map(tag => tag.TagID in changes.tag_counts ? { ...tag, ResponseCount: changes.tag_counts[tag.TagID] } : tag));
+  };
+
   const handleAddTag = async (tagId) => {
     try {
       const response = await fetch(`http://10.71.0.5:5000/api/response/${selectedResponseForEditing.ResponseID}/tags`, {
@@ -159,6 +221,7 @@ function App() {
         const effectiveResponse = await fetch(`http://10.71.0.5:5000/api/responses/${selectedResponseForEditing.ResponseID}/effective-tags`);
         const effectiveData = await effectiveResponse.json();
         setEffectiveTags(effectiveData);
+        await syncChanges();
       }
     } catch (error) {
       console.error('Error adding tag:', error);
@@ -185,6 +248,7 @@ function App() {
         const effectiveResponse = await fetch(`http://10.71.0.5:5000/api/responses/${selectedResponseForEditing.ResponseID}/effective-tags`);
         const effectiveData = await effectiveResponse.json();
         setEffectiveTags(effectiveData);
+        await syncChanges();
       }
     } catch (error) {
       console.error('Error removing tag:', error);
@@ -213,10 +277,8 @@ function App() {
       if (response.ok) {
         // Refresh the responses to show updated tags
         if (currentView === 'responses') {
-          // Refresh responses view
-          const responsesResponse = await fetch('http://10.71.0.5:5000/api/responses');
-          const data = await responsesResponse.json();
-          setQuestionsWithResponses(data);
+          // Patch only the responses whose tags changed
+          await syncChanges();
         } else if (currentView === 'tag-detail' && selectedTag) {
           // Refresh tag detail view
           const tagResponse = await fetch(`http://10.71.0.5:5000/api/tags/${selectedTag.TagID}/responses`);
@@ -1,76 +1,477 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, jsonify, request
 from flask_cors import CORS
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import wraps
+import hashlib
 import sqlite3
+import json
 import os
+import queue
+import sys
+import threading
+import time
+import uuid
 
 app = Flask(__name__)
 CORS(app)
 
-# Use absolute path to the database
+# Use absolute path to the database (SURVEY_API_DATABASE points the server at another one, e.g. a load-test fixture)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATABASE_PATH = os.path.join(BASE_DIR, 'powerbi_data_model_v2', 'survey_analysis.db')
+DATABASE_PATH = os.environ.get('SURVEY_API_DATABASE', os.path.join(BASE_DIR, 'powerbi_data_model_v2', 'survey_analysis.db'))
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
+# Overrides are journaled first so a rebuild running concurrently can replay them
+sys.path.append(os.path.join(BASE_DIR, 'powerbi_pipeline'))
+from override_journal import journal_path, append_overrides, append_overrides_from_query, replay_journal, undo_batch
+from effective_tags import get_effective_tags_for_responses, get_tag_posting_list, get_tag_changes
+from tag_cube import has_tag_cube
+JOURNAL_PATH = journal_path(os.path.dirname(DATABASE_PATH))
+
+from metrics import RequestMetrics
+from query_log import SlowQueryLog
+request_metrics = RequestMetrics()
+
+# Statements at least this slow are logged with their query plan (set to a large value to turn off)
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SURVEY_API_SLOW_QUERY_MS', 100))
+SLOW_QUERY_LOG_PATH = os.environ.get('SURVEY_API_SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'logs', 'slow_queries.log'))
+slow_query_log = SlowQueryLog(SLOW_QUERY_LOG_PATH, SLOW_QUERY_THRESHOLD_MS)
+
+# Rebuilds publish a new generation file and repoint DATABASE_PATH at it, so the
+# resolved file (and its inode) identifies the generation being served
+_db_inode = None
+_db_file = None
+_db_generation = None
+_generation_lock = threading.Lock()
+
+class DatabaseUnavailable(Exception):
+    """No database generation has been opened and the database file cannot be found"""
+
+def check_db_generation():
+    """Detect a rebuilt database and report which generation is being served"""
+    global _db_inode, _db_file, _db_generation
+    try:
+        db_file = os.path.realpath(DATABASE_PATH)
+        inode = os.stat(db_file).st_ino
+    except OSError:
+        # Missing or mid-swap: keep serving the generation already open, if there is one
+        if _db_inode is not None:
+            return _db_inode
+        if has_request_context():
+            g.database_unavailable = True
+        raise DatabaseUnavailable(f"Database not available: {DATABASE_PATH}")
+    if inode != _db_inode:
+        with _generation_lock:
+            if inode != _db_inode:
+                conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_SECONDS)
+                generation = conn.execute("PRAGMA user_version").fetchone()[0]
+                conn.close()
+                switching = _db_inode is not None
+                _db_file, _db_inode, _db_generation = db_file, inode, generation
+                if switching:
+                    print(f"🔄 Database rebuilt, switching to generation {generation}")
+                    bump_data_version()
+                # Catch up on overrides journaled after the rebuild took its snapshot
+                db_writer.submit(replay_pending_overrides)
+    return _db_inode
+
+# Read endpoints are cached per data version; overrides and rebuilds bump the version
+RESPONSE_CACHE_SIZE = 64
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_data_version = 0
+
+# Wakes event streams when this process commits a change
+_change_condition = threading.Condition()
+
+def bump_data_version():
+    """Invalidate every cached response after the data changes"""
+    global _data_version
+    with _cache_lock:
+        _data_version += 1
+        _response_cache.clear()
+    with _change_condition:
+        _change_condition.notify_all()
+
+def cached_response(view):
+    """Serve a JSON endpoint from an LRU cache keyed by (path, query args, data and change version)
+
+    Responses carry a content-hash ETag, so a matching If-None-Match gets a 304.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        check_db_generation()
+        # The change version also picks up overrides committed by other server processes
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), _db_inode, _data_version,
+               current_change_version())
+        
+        with _cache_lock:
+            entry = _response_cache.get(key)
+            if entry is not None:
+                _response_cache.move_to_end(key)
+        
+        if entry is None:
+            result = view(*args, **kwargs)
+            response = app.make_response(result)
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            entry = (body, hashlib.sha1(body).hexdigest())
+            with _cache_lock:
+                _response_cache[key] = entry
+                _response_cache.move_to_end(key)
+                while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
+        
+        body, etag = entry
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    return wrapper
+
+# Pooled read connections, shared by every thread of the process
+CONNECTION_PRAGMAS = [
+    "PRAGMA mmap_size = 268435456",   # 256 MB memory-mapped reads
+    "PRAGMA cache_size = -65536",     # 64 MB page cache
+    "PRAGMA temp_store = MEMORY",
+]
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT_SECONDS = 5
+QUERY_TIMEOUT_SECONDS = 20
+PROGRESS_CHECK_INSTRUCTIONS = 10000
+# At most this many read connections per process (one per gunicorn thread by default)
+READ_POOL_SIZE = int(os.environ.get('SURVEY_API_READERS', os.environ.get('SURVEY_API_THREADS', 8)))
+
+# Per-thread request state: query deadline, statement/row counts and the statement being timed
+_thread_state = threading.local()
+
+class QueryTimeout(Exception):
+    """A read ran past QUERY_TIMEOUT_SECONDS and was interrupted"""
+
+def query_deadline_passed():
+    """Progress handler: abort the running statement once this thread's deadline has passed"""
+    deadline = getattr(_thread_state, 'deadline', None)
+    return deadline is not None and time.monotonic() > deadline
+
+def count_statement(sql):
+    """Trace callback: count statements run for the current request"""
+    _thread_state.sql_statements = getattr(_thread_state, 'sql_statements', 0) + 1
+
+def counting_row_factory(cursor, row):
+    """sqlite3.Row factory that also counts rows returned for the current request"""
+    _thread_state.sql_rows = getattr(_thread_state, 'sql_rows', 0) + 1
+    _thread_state.last_row_at = time.perf_counter()
+    return sqlite3.Row(cursor, row)
+
+class TimedConnection(sqlite3.Connection):
+    """Connection that times its statements for the slow-query log
+
+    A statement runs from execute() until its last row is fetched; it is checked when the
+    next statement starts or when the connection is handed back.
+    """
+    
+    def execute(self, sql, parameters=()):
+        finish_statement()
+        start = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        _thread_state.statement = (self, sql, parameters, start, time.perf_counter())
+        return cursor
+
+def finish_statement():
+    """Log this thread's last statement if it was slow"""
+    statement = getattr(_thread_state, 'statement', None)
+    if statement is None:
+        return
+    _thread_state.statement = None
+    conn, sql, parameters, start, executed_at = statement
+    duration = max(executed_at, getattr(_thread_state, 'last_row_at', 0)) - start
+    if slow_query_log.is_slow(duration):
+        context = f"{request.method} {request.path}" if has_request_context() else threading.current_thread().name
+        sql_statements = getattr(_thread_state, 'sql_statements', 0)
+        slow_query_log.log(conn, sql, parameters, duration, context)
+        # The EXPLAIN is not part of the request's own work
+        _thread_state.sql_statements = sql_statements
+
+def open_db_connection(readonly=True):
+    """Open a tuned connection to the current database generation"""
+    # Pooled readers move between threads, one thread at a time
+    conn = sqlite3.connect(_db_file, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=CACHED_STATEMENTS,
+                           factory=TimedConnection, check_same_thread=not readonly)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    # Statements and rows are attributed to the request or writer job being run, for /metrics
+    conn.row_factory = counting_row_factory
+    conn.set_trace_callback(count_statement)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+        conn.set_progress_handler(query_deadline_passed, PROGRESS_CHECK_INSTRUCTIONS)
+    else:
+        # Databases built before WAL was introduced are converted on first write
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
     return conn
 
+class ReadConnectionPool:
+    """A bounded set of read connections, checked out for one block and handed back
+
+    Connections are opened on demand up to `size`, then reused by whichever thread asks
+    next; a thread waits for one to be handed back when all are checked out. Each is keyed
+    by the generation (inode) it opened, and connections to an older generation are
+    closed instead of reused.
+    """
+    
+    def __init__(self, size):
+        self.size = size
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+    
+    def checkout(self, inode, timeout):
+        """Return (inode, conn) for the given generation, or None if none was free within timeout"""
+        if not self._slots.acquire(timeout=timeout):
+            return None
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if pooled[0] == inode:
+                    return pooled
+                pooled[1].close()
+            conn = open_db_connection()
+            with self._lock:
+                self.opened += 1
+            return inode, conn
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def checkin(self, pooled):
+        """Hand a connection back, closing it if the database has been rebuilt since"""
+        if pooled[0] == _db_inode:
+            self._idle.put(pooled)
+        else:
+            pooled[1].close()
+        self._slots.release()
+    
+    def idle_count(self):
+        return self._idle.qsize()
+
+read_pool = ReadConnectionPool(READ_POOL_SIZE)
+
+@contextmanager
+def db_connection():
+    """Lend a pooled read connection to the current database generation
+
+    Nested blocks on one thread share the outer block's connection. Queries in the block
+    are interrupted after QUERY_TIMEOUT_SECONDS (raising QueryTimeout, answered with a
+    504), which is also how long a request waits for a free connection. Any transaction
+    still open when the block exits (including on errors) is rolled back before the
+    connection goes back to the pool. Writes go through db_writer instead.
+    """
+    held = getattr(_thread_state, 'reader', None)
+    if held is not None:
+        yield held[1]
+        return
+    
+    pooled = read_pool.checkout(check_db_generation(), QUERY_TIMEOUT_SECONDS)
+    if pooled is None:
+        if has_request_context():
+            g.query_timed_out = True
+        raise QueryTimeout(f"No database connection free within {QUERY_TIMEOUT_SECONDS} seconds")
+    
+    conn = pooled[1]
+    _thread_state.reader = pooled
+    _thread_state.deadline = time.monotonic() + QUERY_TIMEOUT_SECONDS
+    try:
+        yield conn
+    except sqlite3.OperationalError as e:
+        if not query_deadline_passed():
+            raise
+        if has_request_context():
+            g.query_timed_out = True
+        raise QueryTimeout(f"Query took longer than {QUERY_TIMEOUT_SECONDS} seconds") from e
+    finally:
+        _thread_state.deadline = None
+        _thread_state.reader = None
+        try:
+            finish_statement()
+            if conn.in_transaction:
+                conn.rollback()
+        finally:
+            read_pool.checkin(pooled)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    _thread_state.sql_statements = 0
+    _thread_state.sql_rows = 0
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency, SQL statements, rows and bytes per endpoint"""
+    if 'request_start' in g and request.url_rule is not None and request.endpoint not in METRICS_ENDPOINTS:
+        request_metrics.record(
+            request.url_rule.rule, request.method,
+            time.perf_counter() - g.request_start, response.status_code,
+            sql_statements=getattr(_thread_state, 'sql_statements', 0),
+            sql_rows=getattr(_thread_state, 'sql_rows', 0),
+            # Event streams are still open here; their bytes are not counted
+            response_bytes=0 if response.is_streamed else response.calculate_content_length() or 0
+        )
+    return response
+
+@app.after_request
+def report_query_timeouts(response):
+    """Handlers turn errors into 500s; a query that ran out of time is a 504 and a missing
+    database a 503 (runs before the metrics hook)"""
+    if g.get('query_timed_out'):
+        response.status_code = 504
+    elif g.get('database_unavailable'):
+        response.status_code = 503
+    return response
+
+@app.errorhandler(DatabaseUnavailable)
+def database_unavailable(e):
+    """Raised outside a handler's own error handling, e.g. by the response cache"""
+    return jsonify({"error": str(e)}), 503
+
+def current_change_version():
+    """Latest TagChangeLog version, shared by every process serving this database"""
+    try:
+        with db_connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0]
+    except sqlite3.OperationalError:
+        # Databases built before the change log existed
+        return 0
+
+# Expensive read endpoints share a few slots so they cannot occupy every server thread
+HEAVY_QUERY_SLOTS = 2
+HEAVY_QUERY_WAIT_SECONDS = 10
+_heavy_query_slots = threading.BoundedSemaphore(HEAVY_QUERY_SLOTS)
+
+def heavy_query(view):
+    """Run an expensive endpoint in one of HEAVY_QUERY_SLOTS, answering 503 if none frees up in time"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _heavy_query_slots.acquire(timeout=HEAVY_QUERY_WAIT_SECONDS):
+            response = jsonify({"error": "Server busy, try again shortly"})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(HEAVY_QUERY_WAIT_SECONDS)
+            return response
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _heavy_query_slots.release()
+    return wrapper
+
+class DatabaseWriter:
+    """Runs every write on one thread with one connection, in submission order
+
+    With WAL, readers never wait for this writer, and writers never contend with
+    each other for the database lock.
+    """
+    
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, job):
+        """Queue job(conn) and return a Future for its result; the job's transaction is committed after it returns"""
+        future = Future()
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+        self._jobs.put((job, future))
+        return future
+    
+    def run(self, job, timeout=30):
+        """Queue job(conn) and wait for its result"""
+        return self.submit(job).result(timeout)
+    
+    def _run(self):
+        conn = None
+        conn_inode = None
+        while True:
+            job, future = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            _thread_state.sql_statements = 0
+            _thread_state.sql_rows = 0
+            start = time.perf_counter()
+            result, error = None, None
+            try:
+                inode = check_db_generation()
+                if conn is None or conn_inode != inode:
+                    if conn is not None:
+                        conn.close()
+                    conn = open_db_connection(readonly=False)
+                    conn_inode = inode
+                result = job(conn)
+                conn.commit()
+                finish_statement()
+            except BaseException as e:
+                error = e
+                if conn is not None and conn.in_transaction:
+                    conn.rollback()
+                _thread_state.statement = None
+            # Writes appear in /metrics as their own endpoint, one per kind of job, recorded
+            # before the caller is released
+            request_metrics.record(
+                f"db-writer:{getattr(job, '__name__', 'job')}", 'WRITE', time.perf_counter() - start,
+                500 if error is not None else 200,
+                sql_statements=_thread_state.sql_statements, sql_rows=_thread_state.sql_rows
+            )
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+db_writer = DatabaseWriter()
+
+def replay_pending_overrides(conn):
+    """Writer job: apply journaled overrides the current generation has not seen yet"""
+    replayed = replay_journal(conn, JOURNAL_PATH)
+    if replayed:
+        print(f"📜 Replayed {replayed} journaled overrides")
+        bump_data_version()
+    return replayed
+
 @app.route('/api/tags', methods=['GET'])
+@cached_response
 def get_tags():
     try:
-        print(f"Attempting to connect to database at: {DATABASE_PATH}")
-        print(f"Database file exists: {os.path.exists(DATABASE_PATH)}")
-        conn = get_db_connection()
-        
-        # Get tags with effective response counts (3-layer system: Algorithmic -> Question -> Manual)
-        query = """
-        WITH AllResponseTags AS (
-            -- All unique Response-Tag combinations from all layers
-            SELECT DISTINCT ResponseID, TagID FROM (
-                -- Layer 1: Original algorithmic tags
-                SELECT bt.ResponseID, bt.TagID FROM BridgeResponseTags bt
-                UNION ALL
-                -- Layer 2: Question-based mappings  
-                SELECT qtm.ResponseID, qtm.TagID FROM QuestionTagMappings qtm WHERE qtm.IsActive = 1
-                UNION ALL
-                -- Layer 3: Manual additions
-                SELECT mto.ResponseID, mto.TagID FROM ManualTagOverrides mto WHERE mto.Action = 'ADD' AND mto.IsActive = 1
-            )
-        ),
-        ManualRemovals AS (
-            -- Get manual removals to subtract
-            SELECT mto.ResponseID, mto.TagID 
-            FROM ManualTagOverrides mto 
-            WHERE mto.Action = 'REMOVE' AND mto.IsActive = 1
-        ),
-        EffectiveResponseTags AS (
-            -- Final effective tags (all additions minus removals)
-            SELECT art.ResponseID, art.TagID 
-            FROM AllResponseTags art
-            LEFT JOIN ManualRemovals mr ON art.ResponseID = mr.ResponseID AND art.TagID = mr.TagID
-            WHERE mr.TagID IS NULL
-        )
-        SELECT t.TagID, t.TagKey, t.TagName, t.TagCategory, t.TagPriority, 
-               t.TagDescription, t.IsActive, t.TagLevel, t.ParentTagID,
-               COUNT(DISTINCT ert.ResponseID) as ResponseCount,
-               CASE WHEN t.TagLevel = 1 THEN t.TagName 
-                    ELSE (SELECT p.TagName FROM DimTags p WHERE p.TagID = t.ParentTagID) 
-               END as PrimaryTagName
-        FROM DimTags t 
-        LEFT JOIN EffectiveResponseTags ert ON t.TagID = ert.TagID 
-        WHERE t.IsActive = 1
-        GROUP BY t.TagID, t.TagKey, t.TagName, t.TagCategory, t.TagPriority, t.TagDescription, t.IsActive, t.TagLevel, t.ParentTagID
-        ORDER BY ResponseCount DESC, t.TagLevel, t.TagName
-        """
-        
-        tags = conn.execute(query).fetchall()
-        conn.close()
-        return jsonify([dict(tag) for tag in tags])
+        with db_connection() as conn:
+            
+            # Get tags with effective response counts from the materialized effective tags
+            query = """
+            SELECT t.TagID, t.TagKey, t.TagName, t.TagCategory, t.TagPriority, 
+                   t.TagDescription, t.IsActive, t.TagLevel, t.ParentTagID,
+                   COUNT(DISTINCT ert.ResponseID) as ResponseCount,
+                   CASE WHEN t.TagLevel = 1 THEN t.TagName 
+                        ELSE (SELECT p.TagName FROM DimTags p WHERE p.TagID = t.ParentTagID) 
+                   END as PrimaryTagName
+            FROM DimTags t 
+            LEFT JOIN EffectiveResponseTags ert ON t.TagID = ert.TagID 
+            WHERE t.IsActive = 1
+            GROUP BY t.TagID, t.TagKey, t.TagName, t.TagCategory, t.TagPriority, t.TagDescription, t.IsActive, t.TagLevel, t.ParentTagID
+            ORDER BY ResponseCount DESC, t.TagLevel, t.TagName
+            """
+            
+            tags = conn.execute(query).fetchall()
+            return jsonify([dict(tag) for tag in tags])
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/analytics/sankey', methods=['GET'])
+@cached_response
+@heavy_query
 def get_sankey_data():
     """Generate Sankey diagram data from effective tags.
 
@@ -80,72 +481,44 @@ def get_sankey_data():
       primary has at least one outgoing link. This ensures ranks #1..#10 always show.
     """
     try:
-        conn = get_db_connection()
-
-        # Build effective tags set (original + question mappings + manual adds - removals)
-        effective_cte = """
-        WITH AllResponseTags AS (
-            SELECT DISTINCT ResponseID, TagID FROM (
-                SELECT bt.ResponseID, bt.TagID FROM BridgeResponseTags bt
-                UNION ALL
-                SELECT qtm.ResponseID, qtm.TagID FROM QuestionTagMappings qtm WHERE qtm.IsActive = 1
-                UNION ALL
-                SELECT mto.ResponseID, mto.TagID FROM ManualTagOverrides mto WHERE mto.Action = 'ADD' AND mto.IsActive = 1
-            )
-        ),
-        ManualRemovals AS (
-            SELECT mto.ResponseID, mto.TagID 
-            FROM ManualTagOverrides mto 
-            WHERE mto.Action = 'REMOVE' AND mto.IsActive = 1
-        ),
-        EffectiveResponseTags AS (
-            SELECT art.ResponseID, art.TagID 
-            FROM AllResponseTags art
-            LEFT JOIN ManualRemovals mr ON art.ResponseID = mr.ResponseID AND art.TagID = mr.TagID
-            WHERE mr.TagID IS NULL
-        )
-        """
-
-        # Top 5 primary tags by effective response count (clean focus)
-        primary_query = f"""
-        {effective_cte}
-        SELECT dt.TagID, dt.TagName, dt.TagCategory,
-               COUNT(DISTINCT ert.ResponseID) AS ResponseCount
-        FROM DimTags dt
-        LEFT JOIN EffectiveResponseTags ert ON dt.TagID = ert.TagID
-        WHERE dt.IsActive = 1 AND dt.TagLevel = 1
-        GROUP BY dt.TagID, dt.TagName, dt.TagCategory
-        ORDER BY ResponseCount DESC
-        LIMIT 5
-        """
-        prim_rows = conn.execute(primary_query).fetchall()
-        primaries = [dict(r) for r in prim_rows]
-
-        if not primaries:
-            conn.close()
-            return jsonify({
-                'nodes': {'labels': [], 'colors': [], 'hovers': []},
-                'links': {'source': [], 'target': [], 'value': [], 'colors': [], 'hovers': []}
-            })
-
-        primary_ids = [p['TagID'] for p in primaries]
-
-        # Sub-tag counts for those primaries
-        placeholders = ','.join(['?'] * len(primary_ids))
-        sub_query = f"""
-        {effective_cte}
-        SELECT dt.ParentTagID AS PrimaryTagID,
-               dt.TagID,
-               dt.TagName,
-               COUNT(DISTINCT ert.ResponseID) AS ResponseCount
-        FROM DimTags dt
-        LEFT JOIN EffectiveResponseTags ert ON dt.TagID = ert.TagID
-        WHERE dt.IsActive = 1 AND dt.TagLevel = 2 AND dt.ParentTagID IN ({placeholders})
-        GROUP BY dt.ParentTagID, dt.TagID, dt.TagName
-        ORDER BY dt.ParentTagID, ResponseCount DESC
-        """
-        sub_rows = conn.execute(sub_query, primary_ids).fetchall()
-        conn.close()
+        with db_connection() as conn:
+
+            # Top 5 primary tags by effective response count (clean focus)
+            primary_query = """
+            SELECT dt.TagID, dt.TagName, dt.TagCategory,
+                   COUNT(DISTINCT ert.ResponseID) AS ResponseCount
+            FROM DimTags dt
+            LEFT JOIN EffectiveResponseTags ert ON dt.TagID = ert.TagID
+            WHERE dt.IsActive = 1 AND dt.TagLevel = 1
+            GROUP BY dt.TagID, dt.TagName, dt.TagCategory
+            ORDER BY ResponseCount DESC
+            LIMIT 5
+            """
+            prim_rows = conn.execute(primary_query).fetchall()
+            primaries = [dict(r) for r in prim_rows]
+
+            if not primaries:
+                return jsonify({
+                    'nodes': {'labels': [], 'colors': [], 'hovers': []},
+                    'links': {'source': [], 'target': [], 'value': [], 'colors': [], 'hovers': []}
+                })
+
+            primary_ids = [p['TagID'] for p in primaries]
+
+            # Sub-tag counts for those primaries
+            placeholders = ','.join(['?'] * len(primary_ids))
+            sub_query = f"""
+            SELECT dt.ParentTagID AS PrimaryTagID,
+                   dt.TagID,
+                   dt.TagName,
+                   COUNT(DISTINCT ert.ResponseID) AS ResponseCount
+            FROM DimTags dt
+            LEFT JOIN EffectiveResponseTags ert ON dt.TagID = ert.TagID
+            WHERE dt.IsActive = 1 AND dt.TagLevel = 2 AND dt.ParentTagID IN ({placeholders})
+            GROUP BY dt.ParentTagID, dt.TagID, dt.TagName
+            ORDER BY dt.ParentTagID, ResponseCount DESC
+            """
+            sub_rows = conn.execute(sub_query, primary_ids).fetchall()
 
         # Organize sub-tags by parent
         subs_by_parent = {}
@@ -261,59 +634,24 @@ def get_sankey_data():
 @app.route('/api/questions/<int:question_id>/tag-distribution', methods=['GET'])
 def get_question_tag_distribution(question_id):
     try:
-        conn = get_db_connection()
-        query = """
-        WITH AllQuestionResponseTags AS (
-            -- All Response-Tag combinations for this question from all layers
-            SELECT DISTINCT f.ResponseID, TagID FROM (
-                -- Layer 1: Original algorithmic tags
-                SELECT bt.ResponseID, bt.TagID FROM BridgeResponseTags bt
-                JOIN FactSurveyResponses f ON bt.ResponseID = f.ResponseID
-                WHERE f.QuestionID = ?
-                UNION ALL
-                -- Layer 2: Question-based mappings
-                SELECT qtm.ResponseID, qtm.TagID FROM QuestionTagMappings qtm
-                JOIN FactSurveyResponses f ON qtm.ResponseID = f.ResponseID  
-                WHERE f.QuestionID = ? AND qtm.IsActive = 1
-                UNION ALL
-                -- Layer 3: Manual additions
-                SELECT mto.ResponseID, mto.TagID FROM ManualTagOverrides mto
-                JOIN FactSurveyResponses f ON mto.ResponseID = f.ResponseID
-                WHERE f.QuestionID = ? AND mto.Action = 'ADD' AND mto.IsActive = 1
-            ) all_tags
-            JOIN FactSurveyResponses f ON all_tags.ResponseID = f.ResponseID
-            WHERE f.QuestionID = ?
-        ),
-        ManualRemovals AS (
-            -- Manual removals for this question
-            SELECT mto.ResponseID, mto.TagID 
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.ResponseID = f.ResponseID
-            WHERE f.QuestionID = ? AND mto.Action = 'REMOVE' AND mto.IsActive = 1
-        ),
-        EffectiveResponseTags AS (
-            -- Final effective tags (additions minus removals)
-            SELECT aqrt.ResponseID, aqrt.TagID 
-            FROM AllQuestionResponseTags aqrt
-            LEFT JOIN ManualRemovals mr ON aqrt.ResponseID = mr.ResponseID AND aqrt.TagID = mr.TagID
-            WHERE mr.TagID IS NULL
-        )
-        SELECT 
-            dt.TagID,
-            dt.TagName,
-            dt.TagCategory,
-            dt.TagLevel,
-            dt.ParentTagID,
-            COUNT(DISTINCT ert.ResponseID) as TagCount
-        FROM EffectiveResponseTags ert
-        JOIN DimTags dt ON ert.TagID = dt.TagID
-        WHERE dt.IsActive = 1
-        GROUP BY dt.TagID, dt.TagName, dt.TagCategory, dt.TagLevel, dt.ParentTagID
-        ORDER BY TagCount DESC, dt.TagLevel, dt.TagName
-        """
-        tag_distribution = conn.execute(query, (question_id, question_id, question_id, question_id, question_id)).fetchall()
-        conn.close()
-        return jsonify([dict(item) for item in tag_distribution])
+        with db_connection() as conn:
+            query = """
+            SELECT 
+                dt.TagID,
+                dt.TagName,
+                dt.TagCategory,
+                dt.TagLevel,
+                dt.ParentTagID,
+                COUNT(DISTINCT ert.ResponseID) as TagCount
+            FROM FactSurveyResponses f
+            JOIN EffectiveResponseTags ert ON ert.ResponseID = f.ResponseID
+            JOIN DimTags dt ON ert.TagID = dt.TagID
+            WHERE f.QuestionID = ? AND dt.IsActive = 1
+            GROUP BY dt.TagID, dt.TagName, dt.TagCategory, dt.TagLevel, dt.ParentTagID
+            ORDER BY TagCount DESC, dt.TagLevel, dt.TagName
+            """
+            tag_distribution = conn.execute(query, (question_id,)).fetchall()
+            return jsonify([dict(item) for item in tag_distribution])
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -321,476 +659,307 @@ def get_question_tag_distribution(question_id):
 @app.route('/api/tags/<int:tag_id>/responses', methods=['GET'])
 def get_tag_responses(tag_id):
     try:
-        conn = get_db_connection()
-        
-        query = """
-        SELECT DISTINCT f.ResponseID, f.ResponseText, f.SurveyResponseNumber, q.QuestionText, q.QuestionShort,
-               o.OrganizationName, o.OrganizationType, g.PrimaryCounty, g.State, 
-               g.Region, r.RoleStandardized as RoleName
-        FROM BridgeResponseTags bt
-        JOIN FactSurveyResponses f ON bt.ResponseID = f.ResponseID
-        JOIN DimQuestion q ON f.QuestionID = q.QuestionID
-        LEFT JOIN DimOrganization o ON f.OrganizationID = o.OrganizationID
-        LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
-        LEFT JOIN DimRole r ON f.RoleID = r.RoleID
-        WHERE bt.TagID = ?
-        ORDER BY f.SurveyResponseNumber
-        """
-        
-        responses = conn.execute(query, (tag_id,)).fetchall()
-        
-        # For each response, get all effective tags (original + overrides)
-        response_list = []
-        for response in responses:
-            # Get effective tags using the same logic as the dedicated endpoint
-            effective_tags_query = """
-            WITH EffectiveTags AS (
-                -- Original tags
-                SELECT bt.TagID
-                FROM BridgeResponseTags bt
-                WHERE bt.ResponseID = ?
-                
-                UNION
-                
-                -- Manual additions
-                SELECT mto.TagID
-                FROM ManualTagOverrides mto
-                JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                    AND mto.QuestionID = f.QuestionID
-                WHERE f.ResponseID = ? AND mto.Action = 'ADD'
-                
-                EXCEPT
-                
-                -- Manual removals
-                SELECT mto.TagID
-                FROM ManualTagOverrides mto
-                JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                    AND mto.QuestionID = f.QuestionID
-                WHERE f.ResponseID = ? AND mto.Action = 'REMOVE'
-            )
-            SELECT DISTINCT et.TagID, t.TagName, t.TagCategory
-            FROM EffectiveTags et
-            JOIN DimTags t ON et.TagID = t.TagID
-            WHERE t.IsActive = 1
-            ORDER BY t.TagName
+        with db_connection() as conn:
+            
+            # Responses that effectively carry the tag (algorithmic, question mapping or manual)
+            response_ids = get_tag_posting_list(conn, tag_id)
+            
+            query = """
+            SELECT f.ResponseID, f.ResponseText, f.SurveyResponseNumber, q.QuestionText, q.QuestionShort,
+                   o.OrganizationName, o.OrganizationType, g.PrimaryCounty, g.State, 
+                   g.Region, r.RoleStandardized as RoleName
+            FROM FactSurveyResponses f
+            JOIN DimQuestion q ON f.QuestionID = q.QuestionID
+            LEFT JOIN DimOrganization o ON f.OrganizationID = o.OrganizationID
+            LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
+            LEFT JOIN DimRole r ON f.RoleID = r.RoleID
+            WHERE f.ResponseID IN (SELECT value FROM json_each(?))
+            ORDER BY f.SurveyResponseNumber, f.ResponseID
             """
-            tags = conn.execute(effective_tags_query, (response['ResponseID'], response['ResponseID'], response['ResponseID'])).fetchall()
             
-            response_dict = dict(response)
-            response_dict['Tags'] = [dict(tag) for tag in tags]
-            response_list.append(response_dict)
-        
-        conn.close()
-        return jsonify(response_list)
+            responses = conn.execute(query, (json.dumps(response_ids),)).fetchall()
+            
+            # All tag sets for the matched responses in one batched query
+            tags_by_response = get_effective_tags_for_responses(conn, response_ids)
+            
+            response_list = []
+            for response in responses:
+                response_dict = dict(response)
+                response_dict['Tags'] = tags_by_response[response['ResponseID']]
+                response_list.append(response_dict)
+            
+            return jsonify(response_list)
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+# Per-response fields that /api/responses can project with ?fields= (ResponseID is always included)
+RESPONSE_FIELDS = ['SurveyResponseNumber', 'ResponseText', 'OrganizationName', 'OrganizationType',
+                   'PrimaryCounty', 'State', 'RoleName', 'Tags']
+MAX_RESPONSES_PAGE_SIZE = 1000
+
 @app.route('/api/responses', methods=['GET'])
+@cached_response
 def get_responses_with_tags():
+    """Responses grouped by question, with their effective tags
+
+    Optional query parameters:
+      question_id  only responses to this question
+      fields       comma-separated subset of RESPONSE_FIELDS to return per response
+      limit        page size (at most MAX_RESPONSES_PAGE_SIZE); pages are keyed on (QuestionID, SurveyResponseNumber)
+      cursor       next_cursor from the previous page
+
+    Without limit/cursor the full list is returned; with them the result is
+    {"questions": [...], "next_cursor": "<QuestionID>:<SurveyResponseNumber>" or null}.
+    """
     try:
-        conn = get_db_connection()
+        fields = RESPONSE_FIELDS
+        if request.args.get('fields'):
+            fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in RESPONSE_FIELDS]
+            if unknown:
+                return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
         
-        # Get all responses with their effective tags (including manual overrides)
-        query = """
-        SELECT 
-            f.ResponseID,
-            f.SurveyResponseNumber,
-            f.ResponseText,
-            q.QuestionID,
-            q.QuestionText,
-            q.QuestionShort,
-            o.OrganizationName,
-            o.OrganizationType,
-            g.PrimaryCounty,
-            g.State,
-            r.RoleStandardized as RoleName
-        FROM FactSurveyResponses f
-        JOIN DimQuestion q ON f.QuestionID = q.QuestionID
-        LEFT JOIN DimOrganization o ON f.OrganizationID = o.OrganizationID
-        LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
-        LEFT JOIN DimRole r ON f.RoleID = r.RoleID
-        WHERE f.HasResponse = 1 AND f.ResponseText IS NOT NULL AND f.ResponseText != ''
-        ORDER BY q.QuestionID, f.SurveyResponseNumber
-        """
+        paginate = 'limit' in request.args or 'cursor' in request.args
+        try:
+            question_id = int(request.args['question_id']) if 'question_id' in request.args else None
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            return jsonify({"error": "question_id and limit must be integers"}), 400
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        # Larger pages are served at the maximum size; next_cursor continues from there
+        limit = min(limit, MAX_RESPONSES_PAGE_SIZE)
         
-        responses = conn.execute(query).fetchall()
+        conditions = ["f.HasResponse = 1", "f.ResponseText IS NOT NULL", "f.ResponseText != ''"]
+        params = []
+        if question_id is not None:
+            conditions.append("f.QuestionID = ?")
+            params.append(question_id)
+        if request.args.get('cursor'):
+            try:
+                after_question, after_respondent = (int(part) for part in request.args['cursor'].split(':'))
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            conditions.append("(f.QuestionID, f.SurveyResponseNumber) > (?, ?)")
+            params.extend([after_question, after_respondent])
         
-        # Process the results to create a nested structure with effective tags
-        result = {}
-        for response in responses:
-            question_id = response['QuestionID']
-            if question_id not in result:
-                result[question_id] = {
-                    'QuestionID': question_id,
-                    'QuestionText': response['QuestionText'],
-                    'QuestionShort': response['QuestionShort'],
-                    'responses': []
-                }
+        with db_connection() as conn:
             
-            # Get effective tags using 3-layer priority system: Algorithmic -> Question Mappings -> Manual Overrides
-            effective_tags_query = """
-            WITH LatestManualOverrides AS (
-                -- Get the latest manual override action for each tag
-                SELECT 
-                    mto.TagID,
-                    mto.Action,
-                    ROW_NUMBER() OVER (PARTITION BY mto.TagID ORDER BY mto.AppliedDate DESC) as rn
-                FROM ManualTagOverrides mto
-                WHERE mto.ResponseID = ? AND mto.IsActive = 1
-            ),
-            AllTagSources AS (
-                -- Layer 1: Original algorithmic tags (not manually removed)
-                SELECT bt.TagID, 'algorithmic' as Source, 0 as Priority
-                FROM BridgeResponseTags bt
-                LEFT JOIN LatestManualOverrides lmo ON bt.TagID = lmo.TagID AND lmo.rn = 1
-                WHERE bt.ResponseID = ? AND (lmo.Action IS NULL OR lmo.Action != 'REMOVE')
-                
-                UNION ALL
-                
-                -- Layer 2: Question-based tag mappings (not manually removed)
-                SELECT qtm.TagID, 'question-mapping' as Source, 1 as Priority
-                FROM QuestionTagMappings qtm
-                LEFT JOIN LatestManualOverrides lmo ON qtm.TagID = lmo.TagID AND lmo.rn = 1
-                WHERE qtm.ResponseID = ? AND qtm.IsActive = 1 
-                      AND (lmo.Action IS NULL OR lmo.Action != 'REMOVE')
-                
-                UNION ALL
-                
-                -- Layer 3: Manual additions (highest priority)
-                SELECT lmo.TagID, 'manual' as Source, 2 as Priority
-                FROM LatestManualOverrides lmo
-                WHERE lmo.rn = 1 AND lmo.Action = 'ADD'
-            ),
-            EffectiveTags AS (
-                -- Get highest priority source for each tag
-                SELECT 
-                    TagID,
-                    Source,
-                    ROW_NUMBER() OVER (PARTITION BY TagID ORDER BY Priority DESC) as rn
-                FROM AllTagSources
-            )
-            SELECT DISTINCT 
-                et.TagID, 
-                t.TagName, 
-                t.TagCategory, 
-                t.TagLevel,
-                t.ParentTagID,
-                et.Source,
-                CASE WHEN et.Source = 'manual' THEN 1 ELSE 0 END as IsManuallyAdded,
-                CASE WHEN t.TagLevel = 1 THEN t.TagName 
-                     ELSE (SELECT p.TagName FROM DimTags p WHERE p.TagID = t.ParentTagID) 
-                END as PrimaryTagName
-            FROM EffectiveTags et
-            JOIN DimTags t ON et.TagID = t.TagID
-            WHERE t.IsActive = 1 AND et.rn = 1
-            ORDER BY t.TagLevel, t.TagName
+            # Get responses in (QuestionID, SurveyResponseNumber) order; one extra row tells us if there is a next page
+            query = f"""
+            SELECT 
+                f.ResponseID,
+                f.SurveyResponseNumber,
+                f.ResponseText,
+                q.QuestionID,
+                q.QuestionText,
+                q.QuestionShort,
+                o.OrganizationName,
+                o.OrganizationType,
+                g.PrimaryCounty,
+                g.State,
+                r.RoleStandardized as RoleName
+            FROM FactSurveyResponses f
+            JOIN DimQuestion q ON f.QuestionID = q.QuestionID
+            LEFT JOIN DimOrganization o ON f.OrganizationID = o.OrganizationID
+            LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
+            LEFT JOIN DimRole r ON f.RoleID = r.RoleID
+            WHERE {' AND '.join(conditions)}
+            ORDER BY f.QuestionID, f.SurveyResponseNumber
+            {'LIMIT ?' if paginate else ''}
             """
-            tags_result = conn.execute(effective_tags_query, (response['ResponseID'], response['ResponseID'], response['ResponseID'])).fetchall()
-            tags = [dict(tag) for tag in tags_result]
+            if paginate:
+                params.append(limit + 1)
             
-            result[question_id]['responses'].append({
-                'ResponseID': response['ResponseID'],
-                'SurveyResponseNumber': response['SurveyResponseNumber'],
-                'ResponseText': response['ResponseText'],
-                'OrganizationName': response['OrganizationName'],
-                'OrganizationType': response['OrganizationType'],
-                'PrimaryCounty': response['PrimaryCounty'],
-                'State': response['State'],
-                'RoleName': response['RoleName'],
-                'Tags': tags
-            })
-        
-        conn.close()
-        return jsonify(list(result.values()))
+            responses = conn.execute(query, params).fetchall()
+            
+            next_cursor = None
+            if paginate and len(responses) > limit:
+                responses = responses[:limit]
+                next_cursor = f"{responses[-1]['QuestionID']}:{responses[-1]['SurveyResponseNumber']}"
+            
+            # All effective tags in one batched query, grouped by response
+            tags_by_response = {}
+            if 'Tags' in fields:
+                tags_by_response = get_effective_tags_for_responses(conn, [response['ResponseID'] for response in responses])
+            
+            # Process the results to create a nested structure with effective tags
+            result = {}
+            for response in responses:
+                question_id = response['QuestionID']
+                if question_id not in result:
+                    result[question_id] = {
+                        'QuestionID': question_id,
+                        'QuestionText': response['QuestionText'],
+                        'QuestionShort': response['QuestionShort'],
+                        'responses': []
+                    }
+                
+                response_dict = {'ResponseID': response['ResponseID']}
+                for field in fields:
+                    response_dict[field] = tags_by_response[response['ResponseID']] if field == 'Tags' else response[field]
+                result[question_id]['responses'].append(response_dict)
+            
+            if paginate:
+                return jsonify({'questions': list(result.values()), 'next_cursor': next_cursor})
+            return jsonify(list(result.values()))
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+def rollup_counts(rows, group_columns, count_column):
+    """Re-aggregate grouped count rows over a subset of their columns, largest count first"""
+    totals = {}
+    for row in rows:
+        key = tuple(row[column] for column in group_columns)
+        totals[key] = totals.get(key, 0) + row[count_column]
+    return [dict(zip(group_columns, key), **{count_column: count})
+            for key, count in sorted(totals.items(), key=lambda item: -item[1])]
+
+def group_rows(rows, group_column):
+    """Nest rows under their group_column value (NULL first, then ascending), keeping their order within a group"""
+    grouped = {}
+    for row in sorted(rows, key=lambda row: (row[group_column] is not None, row[group_column])):
+        grouped.setdefault(row[group_column], []).append({k: v for k, v in row.items() if k != group_column})
+    return grouped
+
 @app.route('/api/analytics', methods=['GET'])
+@cached_response
+@heavy_query
 def get_analytics():
     try:
-        conn = get_db_connection()
-        analytics_data = {}
-        
-        # Overview metrics (dynamic counts)
-        overview_query = """
-        SELECT 
-            COUNT(CASE WHEN f.HasResponse = 1 THEN 1 END) as total_responses,
-            COUNT(DISTINCT f.SurveyResponseNumber) as unique_respondents,
-            (SELECT COUNT(*) FROM DimQuestion) as total_questions,
-            COUNT(DISTINCT CASE WHEN f.OrganizationID IS NOT NULL THEN f.OrganizationID END) as organizations,
-            AVG(CAST(q.ResponseRate AS REAL)) as avg_response_rate,
-            AVG(CASE WHEN f.HasResponse = 1 THEN f.WordCount END) as avg_word_count,
-            AVG(CASE WHEN f.HasResponse = 1 THEN f.ResponseLength END) as avg_response_length
-        FROM FactSurveyResponses f
-        LEFT JOIN DimQuestion q ON f.QuestionID = q.QuestionID
-        """
-        overview = conn.execute(overview_query).fetchone()
-        analytics_data['overview'] = dict(overview)
-        
-        # Role category analysis (existing)
-        role_category_query = """
-        SELECT r.RoleCategory, COUNT(*) as response_count
-        FROM FactSurveyResponses f
-        JOIN DimRole r ON f.RoleID = r.RoleID
-        WHERE f.HasResponse = 1
-        GROUP BY r.RoleCategory
-        ORDER BY response_count DESC
-        """
-        role_categories = conn.execute(role_category_query).fetchall()
-        analytics_data['role_category_analysis'] = [dict(row) for row in role_categories]
-
-        # Role type analysis (new)
-        role_type_query = """
-        SELECT r.RoleType, COUNT(*) as response_count
-        FROM FactSurveyResponses f
-        JOIN DimRole r ON f.RoleID = r.RoleID
-        WHERE f.HasResponse = 1
-        GROUP BY r.RoleType
-        ORDER BY response_count DESC
-        """
-        role_types = conn.execute(role_type_query).fetchall()
-        analytics_data['role_type_analysis'] = [dict(row) for row in role_types]
-        
-        # Tag category analysis
-        tag_category_query = """
-        SELECT t.TagCategory, COUNT(*) as count
-        FROM DimTags t
-        WHERE t.IsActive = 1
-        GROUP BY t.TagCategory
-        ORDER BY count DESC
-        """
-        tag_categories = conn.execute(tag_category_query).fetchall()
-        analytics_data['tag_category_analysis'] = [dict(row) for row in tag_categories]
-        
-        # Healthcare domain analysis
-        healthcare_domain_query = """
-        SELECT Domain, COUNT(*) as count
-        FROM DimHealthcareCategory
-        GROUP BY Domain
-        ORDER BY count DESC
-        """
-        healthcare_domains = conn.execute(healthcare_domain_query).fetchall()
-        analytics_data['healthcare_domain_analysis'] = [dict(row) for row in healthcare_domains]
-        
-        # Question type analysis
-        question_type_query = """
-        SELECT QuestionType, COUNT(*) as count
-        FROM DimQuestion
-        GROUP BY QuestionType
-        ORDER BY count DESC
-        """
-        question_types = conn.execute(question_type_query).fetchall()
-        analytics_data['question_type_analysis'] = [dict(row) for row in question_types]
-        
-        # Response quality insights
-        response_quality_query = """
-        SELECT 
-            COUNT(CASE WHEN ResponseRate > 80 THEN 1 END) as high_engagement_count,
-            COUNT(CASE WHEN WordCount > 50 AND HasResponse = 1 THEN 1 END) as detailed_responses_count,
-            ROUND(
-                CAST(SUM(CASE WHEN IsOpenEnded = 1 THEN 1 ELSE 0 END) AS REAL) / 
-                CAST(COUNT(*) AS REAL) * 100, 1
-            ) as text_question_ratio
-        FROM DimQuestion q
-        LEFT JOIN FactSurveyResponses f ON q.QuestionID = f.QuestionID
-        """
-        response_quality = conn.execute(response_quality_query).fetchone()
-        analytics_data['response_quality'] = dict(response_quality)
-        
-        # Priority areas (top tags by effective response count)
-        priority_areas_query = """
-        WITH EffectiveResponseTags AS (
-            -- Original tags
-            SELECT bt.TagID, bt.ResponseID
-            FROM BridgeResponseTags bt
-            
-            UNION
-            
-            -- Manual additions
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'ADD'
-            
-            EXCEPT
-            
-            -- Manual removals
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'REMOVE'
-        )
-        SELECT t.TagID, t.TagName, t.TagDescription, t.TagCategory, COUNT(ert.ResponseID) as ResponseCount
-        FROM DimTags t
-        LEFT JOIN EffectiveResponseTags ert ON t.TagID = ert.TagID
-        WHERE t.IsActive = 1 AND t.TagLevel = 1
-        GROUP BY t.TagID, t.TagName, t.TagDescription, t.TagCategory
-        ORDER BY ResponseCount DESC
-        LIMIT 10
-        """
-        priority_areas = conn.execute(priority_areas_query).fetchall()
-        analytics_data['priority_areas'] = [dict(row) for row in priority_areas]
-        
-        # Filtered tag analysis by role category using effective tags
-        filtered_tag_query = """
-        WITH EffectiveResponseTags AS (
-            -- Original tags
-            SELECT bt.TagID, bt.ResponseID
-            FROM BridgeResponseTags bt
-            
-            UNION
-            
-            -- Manual additions
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'ADD'
+        with db_connection() as conn:
+            analytics_data = {}
             
-            EXCEPT
+            # Overview metrics (dynamic counts)
+            overview_query = """
+            SELECT 
+                COUNT(CASE WHEN f.HasResponse = 1 THEN 1 END) as total_responses,
+                COUNT(DISTINCT f.SurveyResponseNumber) as unique_respondents,
+                (SELECT COUNT(*) FROM DimQuestion) as total_questions,
+                COUNT(DISTINCT CASE WHEN f.OrganizationID IS NOT NULL THEN f.OrganizationID END) as organizations,
+                AVG(CAST(q.ResponseRate AS REAL)) as avg_response_rate,
+                AVG(CASE WHEN f.HasResponse = 1 THEN f.WordCount END) as avg_word_count,
+                AVG(CASE WHEN f.HasResponse = 1 THEN f.ResponseLength END) as avg_response_length
+            FROM FactSurveyResponses f
+            LEFT JOIN DimQuestion q ON f.QuestionID = q.QuestionID
+            """
+            overview = conn.execute(overview_query).fetchone()
+            analytics_data['overview'] = dict(overview)
             
-            -- Manual removals
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'REMOVE'
-        )
-        SELECT 
-            r.RoleCategory,
-            t.TagName,
-            COUNT(ert.ResponseID) as ResponseCount
-        FROM FactSurveyResponses f
-        JOIN DimRole r ON f.RoleID = r.RoleID
-        JOIN EffectiveResponseTags ert ON f.ResponseID = ert.ResponseID
-        JOIN DimTags t ON ert.TagID = t.TagID
-        WHERE t.IsActive = 1
-        GROUP BY r.RoleCategory, t.TagName
-        ORDER BY r.RoleCategory, ResponseCount DESC
-        """
-        filtered_tags = conn.execute(filtered_tag_query).fetchall()
-        
-        # Organize filtered tags by role category
-        filtered_tag_analysis = {}
-        for row in filtered_tags:
-            role_category = row['RoleCategory']
-            if role_category not in filtered_tag_analysis:
-                filtered_tag_analysis[role_category] = []
-            filtered_tag_analysis[role_category].append({
-                'TagName': row['TagName'],
-                'ResponseCount': row['ResponseCount']
-            })
-        
-        analytics_data['filtered_tag_analysis'] = filtered_tag_analysis
-
-        # Filtered tag analysis by role type (new)
-        filtered_tag_role_type_query = """
-        WITH EffectiveResponseTags AS (
-            -- Original tags
-            SELECT bt.TagID, bt.ResponseID
-            FROM BridgeResponseTags bt
+            # Role category and role type analysis, from one pass grouped by both
+            role_query = """
+            SELECT r.RoleCategory, r.RoleType, COUNT(*) as response_count
+            FROM FactSurveyResponses f
+            JOIN DimRole r ON f.RoleID = r.RoleID
+            WHERE f.HasResponse = 1
+            GROUP BY r.RoleCategory, r.RoleType
+            """
+            role_counts = [dict(row) for row in conn.execute(role_query).fetchall()]
+            analytics_data['role_category_analysis'] = rollup_counts(role_counts, ['RoleCategory'], 'response_count')
+            analytics_data['role_type_analysis'] = rollup_counts(role_counts, ['RoleType'], 'response_count')
             
-            UNION
+            # Tag category analysis
+            tag_category_query = """
+            SELECT t.TagCategory, COUNT(*) as count
+            FROM DimTags t
+            WHERE t.IsActive = 1
+            GROUP BY t.TagCategory
+            ORDER BY count DESC
+            """
+            tag_categories = conn.execute(tag_category_query).fetchall()
+            analytics_data['tag_category_analysis'] = [dict(row) for row in tag_categories]
             
-            -- Manual additions
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'ADD'
+            # Healthcare domain analysis
+            healthcare_domain_query = """
+            SELECT Domain, COUNT(*) as count
+            FROM DimHealthcareCategory
+            GROUP BY Domain
+            ORDER BY count DESC
+            """
+            healthcare_domains = conn.execute(healthcare_domain_query).fetchall()
+            analytics_data['healthcare_domain_analysis'] = [dict(row) for row in healthcare_domains]
             
-            EXCEPT
+            # Question type analysis
+            question_type_query = """
+            SELECT QuestionType, COUNT(*) as count
+            FROM DimQuestion
+            GROUP BY QuestionType
+            ORDER BY count DESC
+            """
+            question_types = conn.execute(question_type_query).fetchall()
+            analytics_data['question_type_analysis'] = [dict(row) for row in question_types]
             
-            -- Manual removals
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'REMOVE'
-        )
-        SELECT 
-            r.RoleType,
-            t.TagName,
-            COUNT(ert.ResponseID) as ResponseCount
-        FROM FactSurveyResponses f
-        JOIN DimRole r ON f.RoleID = r.RoleID
-        JOIN EffectiveResponseTags ert ON f.ResponseID = ert.ResponseID
-        JOIN DimTags t ON ert.TagID = t.TagID
-        WHERE t.IsActive = 1
-        GROUP BY r.RoleType, t.TagName
-        ORDER BY r.RoleType, ResponseCount DESC
-        """
-        filtered_tags_rt = conn.execute(filtered_tag_role_type_query).fetchall()
-
-        filtered_tag_by_role_type = {}
-        for row in filtered_tags_rt:
-            role_type = row['RoleType']
-            if role_type not in filtered_tag_by_role_type:
-                filtered_tag_by_role_type[role_type] = []
-            filtered_tag_by_role_type[role_type].append({
-                'TagName': row['TagName'],
-                'ResponseCount': row['ResponseCount']
-            })
-        analytics_data['filtered_tag_by_role_type'] = filtered_tag_by_role_type
-        
-        # Tag-Role distribution analysis using effective tags (reverse of filtered_tag_analysis)
-        tag_role_query = """
-        WITH EffectiveResponseTags AS (
-            -- Original tags
-            SELECT bt.TagID, bt.ResponseID
-            FROM BridgeResponseTags bt
+            # Response quality insights
+            response_quality_query = """
+            SELECT 
+                COUNT(CASE WHEN ResponseRate > 80 THEN 1 END) as high_engagement_count,
+                COUNT(CASE WHEN WordCount > 50 AND HasResponse = 1 THEN 1 END) as detailed_responses_count,
+                ROUND(
+                    CAST(SUM(CASE WHEN IsOpenEnded = 1 THEN 1 ELSE 0 END) AS REAL) / 
+                    CAST(COUNT(*) AS REAL) * 100, 1
+                ) as text_question_ratio
+            FROM DimQuestion q
+            LEFT JOIN FactSurveyResponses f ON q.QuestionID = f.QuestionID
+            """
+            response_quality = conn.execute(response_quality_query).fetchone()
+            analytics_data['response_quality'] = dict(response_quality)
             
-            UNION
+            # Priority areas (top tags by effective response count)
+            priority_areas_query = """
+            SELECT t.TagID, t.TagName, t.TagDescription, t.TagCategory, COUNT(ert.ResponseID) as ResponseCount
+            FROM DimTags t
+            LEFT JOIN EffectiveResponseTags ert ON t.TagID = ert.TagID
+            WHERE t.IsActive = 1 AND t.TagLevel = 1
+            GROUP BY t.TagID, t.TagName, t.TagDescription, t.TagCategory
+            ORDER BY ResponseCount DESC
+            LIMIT 10
+            """
+            priority_areas = conn.execute(priority_areas_query).fetchall()
+            analytics_data['priority_areas'] = [dict(row) for row in priority_areas]
             
-            -- Manual additions
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'ADD'
+            # Effective tag counts per (role category, role type, tag), pre-rolled in the tag cube
+            # (the query falls back to the base tables on databases built without one); the role
+            # category, role type and tag-role breakdowns below are all rolled up from these rows
+            if has_tag_cube(conn):
+                role_tag_query = """
+                SELECT 
+                    c.RoleCategory,
+                    c.RoleType,
+                    t.TagName,
+                    SUM(c.ResponseCount) as ResponseCount
+                FROM TagCube c
+                JOIN DimTags t ON c.TagID = t.TagID
+                WHERE t.IsActive = 1 AND c.QuestionID IS NULL
+                  AND (c.RoleCategory IS NOT NULL OR c.RoleType IS NOT NULL)
+                GROUP BY c.RoleCategory, c.RoleType, t.TagName
+                """
+            else:
+                role_tag_query = """
+                SELECT 
+                    r.RoleCategory,
+                    r.RoleType,
+                    t.TagName,
+                    COUNT(*) as ResponseCount
+                FROM EffectiveResponseTags ert
+                JOIN FactSurveyResponses f ON f.ResponseID = ert.ResponseID
+                JOIN DimRole r ON f.RoleID = r.RoleID
+                JOIN DimTags t ON ert.TagID = t.TagID
+                WHERE t.IsActive = 1
+                GROUP BY r.RoleCategory, r.RoleType, t.TagName
+                """
+            role_tag_counts = [dict(row) for row in conn.execute(role_tag_query).fetchall()]
             
-            EXCEPT
+            # Tags by role category, by role type, and role categories by tag (reverse of filtered_tag_analysis)
+            analytics_data['filtered_tag_analysis'] = group_rows(
+                rollup_counts(role_tag_counts, ['RoleCategory', 'TagName'], 'ResponseCount'), 'RoleCategory')
+            analytics_data['filtered_tag_by_role_type'] = group_rows(
+                rollup_counts(role_tag_counts, ['RoleType', 'TagName'], 'ResponseCount'), 'RoleType')
+            analytics_data['tag_role_distribution'] = group_rows(
+                rollup_counts(role_tag_counts, ['TagName', 'RoleCategory'], 'ResponseCount'), 'TagName')
             
-            -- Manual removals
-            SELECT mto.TagID, f.ResponseID
-            FROM ManualTagOverrides mto
-            JOIN FactSurveyResponses f ON mto.SurveyResponseNumber = f.SurveyResponseNumber 
-                AND mto.QuestionID = f.QuestionID
-            WHERE mto.Action = 'REMOVE'
-        )
-        SELECT 
-            t.TagName,
-            r.RoleCategory,
-            COUNT(ert.ResponseID) as ResponseCount
-        FROM FactSurveyResponses f
-        JOIN DimRole r ON f.RoleID = r.RoleID
-        JOIN EffectiveResponseTags ert ON f.ResponseID = ert.ResponseID
-        JOIN DimTags t ON ert.TagID = t.TagID
-        WHERE t.IsActive = 1
-        GROUP BY t.TagName, r.RoleCategory
-        ORDER BY t.TagName, ResponseCount DESC
-        """
-        tag_roles = conn.execute(tag_role_query).fetchall()
-        
-        # Organize role distribution by tag
-        tag_role_distribution = {}
-        for row in tag_roles:
-            tag_name = row['TagName']
-            if tag_name not in tag_role_distribution:
-                tag_role_distribution[tag_name] = []
-            tag_role_distribution[tag_name].append({
-                'RoleCategory': row['RoleCategory'],
-                'ResponseCount': row['ResponseCount']
-            })
-        
-        analytics_data['tag_role_distribution'] = tag_role_distribution
-        
-        conn.close()
-        return jsonify(analytics_data)
+            return jsonify(analytics_data)
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -799,82 +968,19 @@ def get_analytics():
 def get_effective_tags(response_id):
     """Get effective tags for a response (original + manual overrides)"""
     try:
-        conn = get_db_connection()
-        
-        # Get response details for stable identifiers
-        response_query = """
-        SELECT SurveyResponseNumber, QuestionID 
-        FROM FactSurveyResponses 
-        WHERE ResponseID = ?
-        """
-        response_info = conn.execute(response_query, (response_id,)).fetchone()
-        
-        if not response_info:
-            conn.close()
-            return jsonify({"error": "Response not found"}), 404
+        with db_connection() as conn:
             
-        # Get effective tags with override logic
-        effective_tags_query = """
-        WITH OriginalTags AS (
-            -- Start with original tags from algorithm
-            SELECT bt.TagID, 'ORIGINAL' as Source
-            FROM BridgeResponseTags bt
-            WHERE bt.ResponseID = ?
-        ),
-        LatestOverrides AS (
-            -- Get the most recent action for each tag (in case of multiple overrides)
-            SELECT TagID, Action, ROW_NUMBER() OVER (PARTITION BY TagID ORDER BY AppliedDate DESC) as rn
-            FROM ManualTagOverrides mto
-            WHERE mto.SurveyResponseNumber = ? 
-            AND mto.QuestionID = ?
-        ),
-        CurrentOverrides AS (
-            -- Only keep the latest action for each tag
-            SELECT TagID, Action
-            FROM LatestOverrides
-            WHERE rn = 1
-        ),
-        FinalTags AS (
-            -- Apply override logic: 
-            -- 1. Include original tags that have no override or have ADD override
-            -- 2. Include manually added tags (tags not in original but have ADD override)
-            SELECT 
-                ot.TagID, 
-                CASE WHEN co.Action = 'ADD' THEN 'MANUAL_ADD' ELSE ot.Source END as Source
-            FROM OriginalTags ot
-            LEFT JOIN CurrentOverrides co ON ot.TagID = co.TagID
-            WHERE co.Action IS NULL OR co.Action = 'ADD'
+            exists = conn.execute("SELECT 1 FROM FactSurveyResponses WHERE ResponseID = ?", (response_id,)).fetchone()
             
-            UNION
+            if not exists:
+                return jsonify({"error": "Response not found"}), 404
+            
+            tags = get_effective_tags_for_responses(conn, [response_id])[response_id]
+            for tag in tags:
+                tag['IsManuallyRemoved'] = 0
+            
+            return jsonify(tags)
             
-            -- Include tags that are manually added but were never original
-            SELECT co.TagID, 'MANUAL_ADD' as Source
-            FROM CurrentOverrides co
-            WHERE co.Action = 'ADD' 
-            AND co.TagID NOT IN (SELECT TagID FROM OriginalTags)
-        )
-        SELECT DISTINCT 
-            ft.TagID,
-            dt.TagName,
-            dt.TagCategory,
-            dt.TagDescription,
-            ft.Source,
-            CASE WHEN ft.Source = 'MANUAL_ADD' THEN 1 ELSE 0 END as IsManuallyAdded,
-            0 as IsManuallyRemoved
-        FROM FinalTags ft
-        JOIN DimTags dt ON ft.TagID = dt.TagID
-        WHERE dt.IsActive = 1
-        ORDER BY dt.TagName
-        """
-        
-        tags = conn.execute(effective_tags_query, (
-            response_id,
-            response_info['SurveyResponseNumber'], response_info['QuestionID']
-        )).fetchall()
-        
-        conn.close()
-        return jsonify([dict(tag) for tag in tags])
-        
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -892,190 +998,510 @@ def modify_response_tags(response_id):
         if not all([tag_id, action]) or action not in ['ADD', 'REMOVE']:
             return jsonify({"error": "Invalid request. Need tag_id and action (ADD/REMOVE)"}), 400
             
-        conn = get_db_connection()
-        
-        # Get response details for stable identifiers
-        response_query = """
-        SELECT SurveyResponseNumber, QuestionID 
-        FROM FactSurveyResponses 
-        WHERE ResponseID = ?
-        """
-        response_info = conn.execute(response_query, (response_id,)).fetchone()
-        
+        with db_connection() as conn:
+            
+            # Get response details for stable identifiers
+            response_query = """
+            SELECT SurveyResponseNumber, QuestionID 
+            FROM FactSurveyResponses 
+            WHERE ResponseID = ?
+            """
+            response_info = conn.execute(response_query, (response_id,)).fetchone()
+            
         if not response_info:
-            conn.close()
             return jsonify({"error": "Response not found"}), 404
             
-        # Insert the override (will replace if same key exists due to PRIMARY KEY)
+        # Journal the override, then apply it to the live database on the writer thread
         from datetime import datetime
-        override_query = """
-        INSERT OR REPLACE INTO ManualTagOverrides 
-        (ResponseID, SurveyResponseNumber, QuestionID, TagID, Action, AppliedBy, AppliedDate, Notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        entry = {
+            'ResponseID': response_id,
+            'SurveyResponseNumber': response_info['SurveyResponseNumber'],
+            'QuestionID': response_info['QuestionID'],
+            'TagID': tag_id,
+            'Action': action,
+            'AppliedBy': applied_by,
+            'AppliedDate': datetime.now().isoformat(),
+            'Notes': notes
+        }
         
-        conn.execute(override_query, (
-            response_id,
-            response_info['SurveyResponseNumber'],
-            response_info['QuestionID'],
-            tag_id,
-            action,
-            applied_by,
-            datetime.now().isoformat(),
-            notes
-        ))
+        def save_override(conn):
+            append_overrides(JOURNAL_PATH, [entry])
+            return replay_journal(conn, JOURNAL_PATH)
         
-        conn.commit()
-        conn.close()
+        db_writer.run(save_override)
+        bump_data_version()
         
         return jsonify({"success": True, "message": f"Tag {action.lower()}ed successfully"})
-        
+            
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/responses/<int:response_id>/effective-tags', methods=['GET'])
-def get_response_effective_tags(response_id):
-    """Get effective tags for a specific response with hierarchy and source information"""
+MAX_BATCH_OVERRIDES = 5000
+
+@app.route('/api/overrides/batch', methods=['POST'])
+def batch_override_tags():
+    """Apply many tag ADD/REMOVE actions in one transaction
+
+    Body: {"overrides": [{"response_id", "tag_id", "action", "notes"}, ...], "applied_by": ...}
+    Nothing is applied unless every override is valid. Returns the new effective tags
+    of the affected responses.
+    """
     try:
-        conn = get_db_connection()
+        data = request.get_json() or {}
+        overrides = data.get('overrides')
+        applied_by = data.get('applied_by', 'System')
+
+        if not isinstance(overrides, list) or not overrides:
+            return jsonify({"error": "Invalid request. Need a non-empty overrides list"}), 400
+        if len(overrides) > MAX_BATCH_OVERRIDES:
+            return jsonify({"error": f"At most {MAX_BATCH_OVERRIDES} overrides per batch"}), 400
+
+        errors = []
+        for index, override in enumerate(overrides):
+            if not isinstance(override, dict):
+                errors.append({"index": index, "error": "Override must be an object"})
+            elif not isinstance(override.get('response_id'), int) or not isinstance(override.get('tag_id'), int):
+                errors.append({"index": index, "error": "Need integer response_id and tag_id"})
+            elif override.get('action') not in ['ADD', 'REMOVE']:
+                errors.append({"index": index, "error": "action must be ADD or REMOVE"})
+        if errors:
+            return jsonify({"error": "Invalid overrides", "details": errors}), 400
+
+        response_ids = sorted({override['response_id'] for override in overrides})
+        tag_ids = sorted({override['tag_id'] for override in overrides})
+
+        with db_connection() as conn:
+
+            # Look up every response and tag in one query each
+            responses = {row['ResponseID']: row for row in conn.execute("""
+            SELECT ResponseID, SurveyResponseNumber, QuestionID
+            FROM FactSurveyResponses
+            WHERE ResponseID IN (SELECT value FROM json_each(?))
+            """, (json.dumps(response_ids),))}
+            active_tags = {row[0] for row in conn.execute("""
+            SELECT TagID FROM DimTags
+            WHERE TagID IN (SELECT value FROM json_each(?)) AND IsActive = 1
+            """, (json.dumps(tag_ids),))}
+
+        for index, override in enumerate(overrides):
+            if override['response_id'] not in responses:
+                errors.append({"index": index, "error": f"Response {override['response_id']} not found"})
+            elif override['tag_id'] not in active_tags:
+                errors.append({"index": index, "error": f"Tag {override['tag_id']} not found"})
+        if errors:
+            return jsonify({"error": "Invalid overrides", "details": errors}), 400
+
+        from datetime import datetime
+        applied_date = datetime.now().isoformat()
+        batch_id = uuid.uuid4().hex
+        entries = [{
+            'ResponseID': override['response_id'],
+            'SurveyResponseNumber': responses[override['response_id']]['SurveyResponseNumber'],
+            'QuestionID': responses[override['response_id']]['QuestionID'],
+            'TagID': override['tag_id'],
+            'Action': override['action'],
+            'AppliedBy': applied_by,
+            'AppliedDate': applied_date,
+            'Notes': override.get('notes', ''),
+            'BatchID': batch_id
+        } for override in overrides]
+
+        def save_overrides(conn):
+            # The journal takes the batch in one executemany; the replay applies it in one transaction
+            append_overrides(JOURNAL_PATH, entries)
+            replay_journal(conn, JOURNAL_PATH)
+            return get_effective_tags_for_responses(conn, response_ids)
+
+        effective_tags = db_writer.run(save_overrides)
+        bump_data_version()
+
+        return jsonify({
+            "success": True,
+            "batch_id": batch_id,
+            "applied": len(entries),
+            "effective_tags": {str(response_id): tags for response_id, tags in effective_tags.items()}
+        })
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+BULK_OVERRIDE_FILTERS = ['text', 'question_id', 'role', 'county', 'has_tag_id']
+BULK_PREVIEW_SAMPLE_SIZE = 10
+
+def build_bulk_override_query(data):
+    """Turn a bulk override request into (tag_id, action, WHERE clause, params) or raise ValueError
+
+    Filters: text (substring of the response), question_id, role (RoleCategory),
+    county (PrimaryCounty) and has_tag_id (an existing effective tag). ADD only targets
+    responses that don't already have the tag, REMOVE only those that do.
+    """
+    tag_id = data.get('tag_id')
+    action = data.get('action')
+    filters = data.get('filters') or {}
+    if not isinstance(tag_id, int) or action not in ['ADD', 'REMOVE']:
+        raise ValueError("Need integer tag_id and action (ADD/REMOVE)")
+    if not isinstance(filters, dict) or not any(filters.get(key) not in (None, '') for key in BULK_OVERRIDE_FILTERS):
+        raise ValueError(f"Need at least one filter: {', '.join(BULK_OVERRIDE_FILTERS)}")
+    
+    conditions = []
+    params = []
+    if filters.get('text'):
+        pattern = filters['text'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("f.ResponseText LIKE ? ESCAPE '\\'")
+        params.append(f"%{pattern}%")
+    if filters.get('question_id') is not None:
+        conditions.append("f.QuestionID = ?")
+        params.append(filters['question_id'])
+    if filters.get('role'):
+        conditions.append("r.RoleCategory = ?")
+        params.append(filters['role'])
+    if filters.get('county'):
+        conditions.append("g.PrimaryCounty = ?")
+        params.append(filters['county'])
+    if filters.get('has_tag_id') is not None:
+        conditions.append("EXISTS (SELECT 1 FROM EffectiveResponseTags e WHERE e.ResponseID = f.ResponseID AND e.TagID = ?)")
+        params.append(filters['has_tag_id'])
+    
+    presence = "NOT EXISTS" if action == 'ADD' else "EXISTS"
+    conditions.append(f"{presence} (SELECT 1 FROM EffectiveResponseTags e WHERE e.ResponseID = f.ResponseID AND e.TagID = ?)")
+    params.append(tag_id)
+    
+    where = f"""
+    FROM FactSurveyResponses f
+    LEFT JOIN DimRole r ON f.RoleID = r.RoleID
+    LEFT JOIN DimGeography g ON f.GeographyID = g.GeographyID
+    WHERE {' AND '.join(conditions)}
+    """
+    return tag_id, action, where, params
+
+@app.route('/api/overrides/bulk/preview', methods=['POST'])
+def preview_bulk_override():
+    """Count (and sample) the responses a bulk override would change, without applying it"""
+    try:
+        try:
+            tag_id, action, where, params = build_bulk_override_query(request.get_json() or {})
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Same deduplication logic as main responses endpoint
-        effective_tags_query = """
-        WITH LatestManualOverrides AS (
-            -- Get the latest manual override action for each tag
-            SELECT 
-                mto.TagID,
-                mto.Action,
-                ROW_NUMBER() OVER (PARTITION BY mto.TagID ORDER BY mto.AppliedDate DESC) as rn
-            FROM ManualTagOverrides mto
-            WHERE mto.ResponseID = ? AND mto.IsActive = 1
-        ),
-        AllTagSources AS (
-            -- Layer 1: Original algorithmic tags (not manually removed)
-            SELECT bt.TagID, 'algorithmic' as Source, 0 as Priority
-            FROM BridgeResponseTags bt
-            LEFT JOIN LatestManualOverrides lmo ON bt.TagID = lmo.TagID AND lmo.rn = 1
-            WHERE bt.ResponseID = ? AND (lmo.Action IS NULL OR lmo.Action != 'REMOVE')
+        with db_connection() as conn:
+            count = conn.execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+            sample = conn.execute(f"""
+            SELECT f.ResponseID, f.QuestionID, f.ResponseText {where}
+            ORDER BY f.ResponseID LIMIT ?
+            """, params + [BULK_PREVIEW_SAMPLE_SIZE]).fetchall()
             
-            UNION ALL
+            return jsonify({"count": count, "sample": [dict(row) for row in sample]})
             
-            -- Layer 2: Question-based tag mappings (not manually removed)
-            SELECT qtm.TagID, 'question-mapping' as Source, 1 as Priority
-            FROM QuestionTagMappings qtm
-            LEFT JOIN LatestManualOverrides lmo ON qtm.TagID = lmo.TagID AND lmo.rn = 1
-            WHERE qtm.ResponseID = ? AND qtm.IsActive = 1 
-                  AND (lmo.Action IS NULL OR lmo.Action != 'REMOVE')
-            
-            UNION ALL
-            
-            -- Layer 3: Manual additions (highest priority)
-            SELECT lmo.TagID, 'manual' as Source, 2 as Priority
-            FROM LatestManualOverrides lmo
-            WHERE lmo.rn = 1 AND lmo.Action = 'ADD'
-        ),
-        EffectiveTags AS (
-            -- Get highest priority source for each tag
-            SELECT 
-                TagID,
-                Source,
-                ROW_NUMBER() OVER (PARTITION BY TagID ORDER BY Priority DESC) as rn
-            FROM AllTagSources
-        )
-        SELECT DISTINCT 
-            et.TagID, 
-            t.TagName, 
-            t.TagCategory, 
-            t.TagLevel,
-            t.ParentTagID,
-            et.Source,
-            CASE WHEN et.Source = 'manual' THEN 1 ELSE 0 END as IsManuallyAdded,
-            CASE WHEN t.TagLevel = 1 THEN t.TagName 
-                 ELSE (SELECT p.TagName FROM DimTags p WHERE p.TagID = t.ParentTagID) 
-            END as PrimaryTagName
-        FROM EffectiveTags et
-        JOIN DimTags t ON et.TagID = t.TagID
-        WHERE t.IsActive = 1 AND et.rn = 1
-        ORDER BY t.TagLevel, t.TagName
-        """
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/overrides/bulk', methods=['POST'])
+def apply_bulk_override():
+    """Add or remove a tag on every response matching a filter, as one undoable batch"""
+    try:
+        data = request.get_json() or {}
+        try:
+            tag_id, action, where, params = build_bulk_override_query(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        tags_result = conn.execute(effective_tags_query, (response_id, response_id, response_id)).fetchall()
-        tags = [dict(tag) for tag in tags_result]
+        with db_connection() as conn:
+            if not conn.execute("SELECT 1 FROM DimTags WHERE TagID = ? AND IsActive = 1", (tag_id,)).fetchone():
+                return jsonify({"error": "Tag not found"}), 404
         
-        conn.close()
-        return jsonify(tags)
+        from datetime import datetime
+        batch_id = uuid.uuid4().hex
+        notes = data.get('notes') or f"Bulk {action}: {json.dumps(data.get('filters'), sort_keys=True)}"
+        constants = [tag_id, action, data.get('applied_by', 'System'), datetime.now().isoformat(), notes, batch_id]
+        
+        def save_bulk_override(conn):
+            # One INSERT ... SELECT into the journal, one replay into ManualTagOverrides
+            appended = append_overrides_from_query(conn, JOURNAL_PATH, f"""
+            SELECT f.ResponseID, f.SurveyResponseNumber, f.QuestionID, ?, ?, ?, ?, ?, ? {where}
+            ORDER BY f.ResponseID
+            """, constants + params)
+            replay_journal(conn, JOURNAL_PATH)
+            return appended
+        
+        applied = db_writer.run(save_bulk_override)
+        bump_data_version()
+        
+        return jsonify({"success": True, "batch_id": batch_id, "applied": applied})
         
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/tags/available', methods=['GET'])
-def get_available_tags():
-    """Get all available tags for the tag editor - returns hierarchical structure"""
+@app.route('/api/overrides/batches', methods=['GET'])
+def get_override_batches():
+    """List override batches, newest first"""
     try:
-        conn = get_db_connection()
-        
-        # Get all tags with hierarchy information
-        query = """
-        SELECT 
-            TagID, 
-            TagName, 
-            TagCategory, 
-            TagDescription, 
-            TagLevel, 
-            ParentTagID,
-            0 as ResponseCount
-        FROM DimTags 
-        WHERE IsActive = 1
-        ORDER BY TagLevel, TagCategory, TagName
-        """
+        with db_connection() as conn:
+            batches = conn.execute("""
+            SELECT BatchID, TagID, Action, AppliedBy, MIN(AppliedDate) as AppliedDate, MAX(Notes) as Notes,
+                   COUNT(*) as OverrideCount, SUM(IsActive) as ActiveCount
+            FROM ManualTagOverrides
+            WHERE BatchID IS NOT NULL
+            GROUP BY BatchID
+            ORDER BY AppliedDate DESC
+            """).fetchall()
+            
+            return jsonify([dict(batch) for batch in batches])
+            
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/overrides/batches/<batch_id>/undo', methods=['POST'])
+def undo_override_batch(batch_id):
+    """Deactivate every override of a batch, restoring the tags it changed"""
+    try:
+        data = request.get_json(silent=True) or {}
         
-        tags = conn.execute(query).fetchall()
-        conn.close()
+        with db_connection() as conn:
+            if not conn.execute("SELECT 1 FROM ManualTagOverrides WHERE BatchID = ? LIMIT 1", (batch_id,)).fetchone():
+                return jsonify({"error": "Batch not found"}), 404
         
-        # Build hierarchical structure
-        primary_tags = []
-        sub_tags_map = {}
+        def save_undo(conn):
+            # Journaled so the undo also reaches a database being rebuilt
+            undo_batch(JOURNAL_PATH, batch_id, data.get('applied_by', 'System'))
+            return replay_journal(conn, JOURNAL_PATH)
         
-        for tag in tags:
-            tag_dict = dict(tag)
-            if tag['TagLevel'] == 1:  # Primary tag
-                tag_dict['SubTags'] = []
-                primary_tags.append(tag_dict)
-                sub_tags_map[tag['TagID']] = tag_dict['SubTags']
-            else:  # Sub tag
-                parent_id = tag['ParentTagID']
-                if parent_id in sub_tags_map:
-                    sub_tags_map[parent_id].append(tag_dict)
+        undone = db_writer.run(save_undo)
+        bump_data_version()
         
-        return jsonify(primary_tags)
+        return jsonify({"success": True, "batch_id": batch_id, "undone": undone})
         
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/overrides/stats', methods=['GET'])
-def get_override_stats():
-    """Get statistics about manual tag overrides"""
+MAX_SYNC_RESPONSES = 1000
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Effective tag changes since a client-held version, for patching client state in place
+
+    Query parameters:
+      since       version from the previous call (omit to just get the current version)
+      generation  generation from the previous call
+
+    Returns {"generation", "version", "reset", "responses": {ResponseID: [tags]}, "tag_counts": {TagID: count}}.
+    "reset" is true when the client must reload instead (the database was rebuilt, or too much changed).
+    """
     try:
-        conn = get_db_connection()
+        since = request.args.get('since', type=int)
+        client_generation = request.args.get('generation', type=int)
         
-        stats_query = """
-        SELECT 
-            COUNT(*) as total_overrides,
-            COUNT(CASE WHEN Action = 'ADD' THEN 1 END) as additions,
-            COUNT(CASE WHEN Action = 'REMOVE' THEN 1 END) as removals,
-            COUNT(DISTINCT SurveyResponseNumber || '-' || QuestionID) as responses_modified,
-            COUNT(DISTINCT AppliedBy) as editors,
-            COUNT(DISTINCT TagID) as unique_tags_modified
-        FROM ManualTagOverrides
-        """
+        with db_connection() as conn:
+            # One read transaction, so the version matches the tags returned with it
+            conn.execute("BEGIN")
+            version, response_ids, tag_ids = get_tag_changes(conn, since or 0)
+            result = {"generation": _db_generation, "version": version, "reset": False}
+            if since is None:
+                return jsonify(result)
+            
+            if (client_generation is not None and client_generation != _db_generation) \
+                    or since > version or len(response_ids) > MAX_SYNC_RESPONSES:
+                result["reset"] = True
+                return jsonify(result)
+            
+            effective_tags = get_effective_tags_for_responses(conn, response_ids)
+            result["responses"] = {str(response_id): tags for response_id, tags in effective_tags.items()}
+            result["tag_counts"] = count_tag_responses(conn, tag_ids)
+            return jsonify(result)
+            
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def count_tag_responses(conn, tag_ids):
+    """Effective response counts for the given tags, as {"TagID": count}"""
+    tag_counts = {tag_id: 0 for tag_id in tag_ids}
+    tag_counts.update(conn.execute("""
+    SELECT TagID, COUNT(*) FROM EffectiveResponseTags
+    WHERE TagID IN (SELECT value FROM json_each(?))
+    GROUP BY TagID
+    """, (json.dumps(tag_ids),)).fetchall())
+    return {str(tag_id): count for tag_id, count in tag_counts.items()}
+
+EVENT_POLL_SECONDS = 2       # also catches changes committed by other server processes
+EVENT_KEEPALIVE_SECONDS = 15
+EVENT_RETRY_SECONDS = 30
+
+# Each open stream holds a server thread, so at most this many per process (half the gunicorn
+# threads by default); further clients get a 503 and poll /api/changes instead
+SERVER_THREADS = int(os.environ.get('SURVEY_API_THREADS', 8))
+MAX_EVENT_STREAMS = int(os.environ.get('SURVEY_API_EVENT_STREAMS', max(SERVER_THREADS // 2, 1)))
+_event_stream_slots = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+def read_change_events(since):
+    """Changes after version `since` as (generation, version, event), where event is None if nothing changed"""
+    with db_connection() as conn:
+        conn.execute("BEGIN")
+        version = conn.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0]
+        if version <= since:
+            return _db_generation, version, None
         
-        stats = conn.execute(stats_query).fetchone()
-        conn.close()
+        changes = conn.execute("""
+        SELECT DISTINCT c.ResponseID, c.TagID, ert.Source
+        FROM TagChangeLog c
+        LEFT JOIN EffectiveResponseTags ert ON ert.ResponseID = c.ResponseID AND ert.TagID = c.TagID
+        WHERE c.ChangeSeq > ? AND c.ChangeSeq <= ?
+        ORDER BY c.ResponseID, c.TagID
+        """, (since, version)).fetchall()
+        if len({row['ResponseID'] for row in changes}) > MAX_SYNC_RESPONSES:
+            return _db_generation, version, {"reset": True}
         
-        return jsonify(dict(stats))
+        return _db_generation, version, {
+            "changes": [{
+                "response_id": row['ResponseID'],
+                "tag_id": row['TagID'],
+                "action": 'ADD' if row['Source'] else 'REMOVE',
+                "source": row['Source']
+            } for row in changes],
+            "tag_counts": count_tag_responses(conn, sorted({row['TagID'] for row in changes}))
+        }
+
+def format_event(event, data, event_id=None):
+    """One server-sent event frame"""
+    frame = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{frame}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Server-sent events with effective tag changes as they are committed
+
+    Each "tags" event carries {"generation", "version", "changes": [{"response_id", "tag_id",
+    "action", "source"}], "tag_counts"} and uses the version as its id, so a reconnecting
+    client resumes with Last-Event-ID (or ?since=N). A "reset" event means reload: the
+    database was rebuilt or too much changed at once. Try it with: curl -N <server>/api/events
+    
+    At most MAX_EVENT_STREAMS streams are open per process; past that the answer is a 503.
+    """
+    if not _event_stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "Too many live update streams, poll /api/changes instead"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(EVENT_RETRY_SECONDS)
+        return response
+    
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    
+    def generate():
+        with db_connection() as conn:
+            version = conn.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0]
+            generation = _db_generation
+        last_version = version if since is None else since
+        yield format_event('hello', {"generation": generation, "version": version}, version)
         
+        last_sent = time.monotonic()
+        while True:
+            current_generation, version, event = read_change_events(last_version)
+            if current_generation != generation or version < last_version:
+                generation = current_generation
+                yield format_event('reset', {"generation": generation, "version": version}, version)
+            elif event is not None:
+                event_name = 'reset' if event.get('reset') else 'tags'
+                yield format_event(event_name, {"generation": generation, "version": version, **event}, version)
+            else:
+                if time.monotonic() - last_sent >= EVENT_KEEPALIVE_SECONDS:
+                    yield ": keepalive\n\n"
+                    last_sent = time.monotonic()
+                with _change_condition:
+                    _change_condition.wait(EVENT_POLL_SECONDS)
+                continue
+            last_version = version
+            last_sent = time.monotonic()
+    
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Called once the stream ends or the client goes away, even if it never started
+    response.call_on_close(_event_stream_slots.release)
+    return response
+
+@app.route('/api/responses/<int:response_id>/effective-tags', methods=['GET'])
+def get_response_effective_tags(response_id):
+    """Get effective tags for a specific response with hierarchy and source information"""
+    try:
+        with db_connection() as conn:
+            tags = get_effective_tags_for_responses(conn, [response_id])[response_id]
+            
+            return jsonify(tags)
+            
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/tags/available', methods=['GET'])
+def get_available_tags():
+    """Get all available tags for the tag editor - returns hierarchical structure"""
+    try:
+        with db_connection() as conn:
+            
+            # Get all tags with hierarchy information
+            query = """
+            SELECT 
+                TagID, 
+                TagName, 
+                TagCategory, 
+                TagDescription, 
+                TagLevel, 
+                ParentTagID,
+                0 as ResponseCount
+            FROM DimTags 
+            WHERE IsActive = 1
+            ORDER BY TagLevel, TagCategory, TagName
+            """
+            
+            tags = conn.execute(query).fetchall()
+            
+            # Build hierarchical structure
+            primary_tags = []
+            sub_tags_map = {}
+            
+            for tag in tags:
+                tag_dict = dict(tag)
+                if tag['TagLevel'] == 1:  # Primary tag
+                    tag_dict['SubTags'] = []
+                    primary_tags.append(tag_dict)
+                    sub_tags_map[tag['TagID']] = tag_dict['SubTags']
+                else:  # Sub tag
+                    parent_id = tag['ParentTagID']
+                    if parent_id in sub_tags_map:
+                        sub_tags_map[parent_id].append(tag_dict)
+            
+            return jsonify(primary_tags)
+            
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/overrides/stats', methods=['GET'])
+def get_override_stats():
+    """Get statistics about manual tag overrides"""
+    try:
+        with db_connection() as conn:
+            
+            stats_query = """
+            SELECT 
+                COUNT(*) as total_overrides,
+                COUNT(CASE WHEN Action = 'ADD' THEN 1 END) as additions,
+                COUNT(CASE WHEN Action = 'REMOVE' THEN 1 END) as removals,
+                COUNT(DISTINCT SurveyResponseNumber || '-' || QuestionID) as responses_modified,
+                COUNT(DISTINCT AppliedBy) as editors,
+                COUNT(DISTINCT TagID) as unique_tags_modified
+            FROM ManualTagOverrides
+            """
+            
+            stats = conn.execute(stats_query).fetchone()
+            
+            return jsonify(dict(stats))
+            
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -1084,89 +1510,23 @@ def get_override_stats():
 def get_response_highlights(response_id):
     """Get text highlighting data for a response based on tagging keywords"""
     try:
-        conn = get_db_connection()
-        
-        # Get response text and current tags
-        response_query = """
-        SELECT f.ResponseText
-        FROM FactSurveyResponses f
-        WHERE f.ResponseID = ?
-        """
-        response_result = conn.execute(response_query, (response_id,)).fetchone()
-        
-        if not response_result:
-            conn.close()
-            return jsonify({"error": "Response not found"}), 404
-            
-        response_text = response_result['ResponseText']
-        
-        # Get current effective tags for this response using the same logic
-        response_info_query = """
-        SELECT SurveyResponseNumber, QuestionID 
-        FROM FactSurveyResponses 
-        WHERE ResponseID = ?
-        """
-        response_info = conn.execute(response_info_query, (response_id,)).fetchone()
-        
-        if not response_info:
-            conn.close()
-            return jsonify({"error": "Response info not found"}), 404
+        with db_connection() as conn:
             
-        # Get effective tags with override logic
-        effective_tags_query = """
-        WITH OriginalTags AS (
-            -- Start with original tags from algorithm
-            SELECT bt.TagID
-            FROM BridgeResponseTags bt
-            WHERE bt.ResponseID = ?
-        ),
-        LatestOverrides AS (
-            -- Get the most recent action for each tag (in case of multiple overrides)
-            SELECT TagID, Action, ROW_NUMBER() OVER (PARTITION BY TagID ORDER BY AppliedDate DESC) as rn
-            FROM ManualTagOverrides mto
-            WHERE mto.SurveyResponseNumber = ? 
-            AND mto.QuestionID = ?
-        ),
-        CurrentOverrides AS (
-            -- Only keep the latest action for each tag
-            SELECT TagID, Action
-            FROM LatestOverrides
-            WHERE rn = 1
-        ),
-        FinalTags AS (
-            -- Apply override logic: 
-            -- 1. Include original tags that have no override or have ADD override
-            -- 2. Include manually added tags (tags not in original but have ADD override)
-            SELECT ot.TagID
-            FROM OriginalTags ot
-            LEFT JOIN CurrentOverrides co ON ot.TagID = co.TagID
-            WHERE co.Action IS NULL OR co.Action = 'ADD'
+            # Get response text and current tags
+            response_query = """
+            SELECT f.ResponseText
+            FROM FactSurveyResponses f
+            WHERE f.ResponseID = ?
+            """
+            response_result = conn.execute(response_query, (response_id,)).fetchone()
             
-            UNION
+            if not response_result:
+                return jsonify({"error": "Response not found"}), 404
+                
+            response_text = response_result['ResponseText']
             
-            -- Include tags that are manually added but were never original
-            SELECT co.TagID
-            FROM CurrentOverrides co
-            WHERE co.Action = 'ADD' 
-            AND co.TagID NOT IN (SELECT TagID FROM OriginalTags)
-        )
-        SELECT DISTINCT 
-            ft.TagID,
-            dt.TagName,
-            dt.TagCategory,
-            dt.TagDescription
-        FROM FinalTags ft
-        JOIN DimTags dt ON ft.TagID = dt.TagID
-        WHERE dt.IsActive = 1
-        ORDER BY dt.TagName
-        """
-        
-        effective_tags = conn.execute(effective_tags_query, (
-            response_id,
-            response_info['SurveyResponseNumber'], response_info['QuestionID']
-        )).fetchall()
-        
-        effective_tags = [dict(tag) for tag in effective_tags]
+            # Get current effective tags for this response
+            effective_tags = get_effective_tags_for_responses(conn, [response_id])[response_id]
         
         # Define the same keyword mapping as in your Python tagging algorithm
         tag_keywords = {
@@ -1278,7 +1638,6 @@ def get_response_highlights(response_id):
         # Sort highlights by position
         highlights.sort(key=lambda x: x['start'])
         
-        conn.close()
         return jsonify({
             'response_text': response_text,
             'highlights': highlights,
@@ -1289,5 +1648,20 @@ def get_response_highlights(response_id):
         print(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+METRICS_ENDPOINTS = {'prometheus_metrics', 'get_metrics_summary'}
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Per-endpoint request metrics in the Prometheus text format (for this server process)"""
+    return Response(request_metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics_summary():
+    """Per-endpoint latency percentiles and SQL statement/row averages as JSON (for this server process)"""
+    return jsonify(request_metrics.summary())
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Development server only (serve with gunicorn.conf.py); the debugger runs arbitrary code,
+    # so it is opt-in and the server listens on localhost unless told otherwise
+    app.run(host=os.environ.get('SURVEY_API_DEV_HOST', '127.0.0.1'), port=5000,
+            debug=os.environ.get('SURVEY_API_DEBUG') == '1')
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Query Plan Regression Check
+Builds a fixture database at production-like scale, drives every API endpoint against it,
+captures each SQL statement the server runs (plus the pipeline's per-override trigger
+statements) and fails if any plan does a full SCAN of a large table
+
+    cd survey-visualizer/server
+    python check_query_plans.py            # exit code 1 on a regression
+    python check_query_plans.py --verbose  # also print every plan
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(BASE_DIR, 'powerbi_pipeline'))
+
+from effective_tags import resolve_pair_sql
+from fixture_db import build_fixture_database
+from query_log import explain_query_plan, format_query_plan, normalize_sql
+
+# Tables that grow with the survey and must only be read through an index
+LARGE_TABLES = {
+    'FactSurveyResponses', 'BridgeResponseTags', 'BridgeResponseCategories', 'BridgeResponseRoles',
+    'EffectiveResponseTags', 'ManualTagOverrides', 'QuestionTagMappings', 'TagChangeLog', 'OverrideJournal', 'TagCube',
+}
+
+# Probed URLs that aggregate or list the whole corpus, and so read these tables end to end
+FULL_CORPUS_SCANS = {
+    ('/api/analytics', 'FactSurveyResponses'): "organisation/role/county breakdowns of every response",
+    ('/api/responses', 'FactSurveyResponses'): "the unpaginated list returns every response",
+    ('/api/overrides/stats', 'ManualTagOverrides'): "totals over every override",
+    ('/api/overrides/bulk/preview', 'FactSurveyResponses'): "text filters match against every response",
+}
+
+# Writer-thread statements (by how they start) that read these tables end to end
+WRITER_FULL_SCANS = {
+    ('INSERT INTO journal.OverrideJournal (ResponseID, SurveyResponseNumber, QuestionID, TagID, Action, AppliedBy, '
+     'AppliedDate, Notes, BatchID) SELECT', 'FactSurveyResponses'): "bulk override filters match against every response",
+}
+
+# Fixture size relative to the current survey (about 21,000 responses)
+FIXTURE_SCALE = 30
+
+class PlanRecorder:
+    """Stands in for the server's slow-query log, recording every statement with its plan"""
+
+    def __init__(self):
+        self.statements = {}
+
+    def is_slow(self, duration):
+        return True
+
+    def log(self, conn, sql, parameters, duration, context=None):
+        from flask import has_request_context, request
+        endpoint = request.full_path.rstrip('?') if has_request_context() else context
+        key = (endpoint, normalize_sql(sql))
+        if key in self.statements or not re.match(r'\s*(SELECT|WITH|INSERT|UPDATE|DELETE)', sql, re.IGNORECASE):
+            return
+        try:
+            self.statements[key] = explain_query_plan(conn, sql, parameters)
+        except sqlite3.Error as e:
+            # e.g. statements on the journal after it was detached
+            self.statements[key] = [(0, 0, f"(no plan: {e})")]
+
+def table_aliases(sql):
+    """Map the names a plan can show (aliases and table names) to table names"""
+    aliases = {}
+    for table, alias in re.findall(r'\b(?:FROM|JOIN|INTO)\s+(?:\w+\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in {'WHERE', 'ON', 'LEFT', 'JOIN', 'INNER', 'GROUP', 'ORDER', 'LIMIT',
+                                           'SELECT', 'SET', 'VALUES', 'USING', 'UNION', 'EXCEPT', 'AS'}:
+            aliases[alias] = table
+    return aliases
+
+def full_scans(sql, plan_rows):
+    """Large tables that a plan reads end to end"""
+    aliases = table_aliases(sql)
+    scanned = set()
+    for _, _, detail in plan_rows:
+        match = re.match(r'SCAN (\w+)', detail)
+        if match and aliases.get(match.group(1), match.group(1)) in LARGE_TABLES:
+            scanned.add(aliases.get(match.group(1), match.group(1)))
+    return scanned
+
+def allowed_scan(endpoint, sql, table):
+    """The FULL_CORPUS_SCANS or WRITER_FULL_SCANS entry that allows this scan, if any"""
+    if (endpoint, table) in FULL_CORPUS_SCANS:
+        return (endpoint, table)
+    if endpoint == 'db-writer':
+        for prefix, allowed_table in WRITER_FULL_SCANS:
+            if allowed_table == table and sql.startswith(prefix):
+                return (prefix, table)
+    return None
+
+def exercise_api(app):
+    """Call every endpoint the client uses, including the write paths"""
+    client = app.app.test_client()
+    gets = [
+        '/api/tags', '/api/tags/available', '/api/analytics', '/api/analytics/sankey',
+        '/api/responses', '/api/responses?question_id=3&limit=50', '/api/responses?limit=100&cursor=3:100',
+        '/api/responses?question_id=3&fields=ResponseText,Tags',
+        '/api/tags/5/responses', '/api/response/10/tags', '/api/responses/10/effective-tags',
+        '/api/response/10/highlight', '/api/questions/3/tag-distribution',
+        '/api/overrides/stats', '/api/overrides/batches', '/api/changes', '/api/changes?since=0',
+    ]
+    posts = [
+        ('/api/response/10/tags', {'tag_id': 2, 'action': 'ADD'}),
+        ('/api/overrides/batch', {'overrides': [{'response_id': 11, 'tag_id': 3, 'action': 'ADD'},
+                                                {'response_id': 12, 'tag_id': 3, 'action': 'REMOVE'}]}),
+        ('/api/overrides/bulk/preview', {'tag_id': 4, 'action': 'ADD', 'filters': {'question_id': 3, 'has_tag_id': 1}}),
+        ('/api/overrides/bulk/preview', {'tag_id': 4, 'action': 'ADD', 'filters': {'text': 'loan forgiveness'}}),
+        ('/api/overrides/bulk', {'tag_id': 4, 'action': 'ADD', 'filters': {'question_id': 3}}),
+    ]
+
+    failures = []
+    for path in gets:
+        response = client.get(path)
+        if response.status_code != 200:
+            failures.append(f"GET {path} -> {response.status_code}")
+    for path, body in posts:
+        response = client.post(path, json=body)
+        if response.status_code != 200:
+            failures.append(f"POST {path} -> {response.status_code}")
+        elif path == '/api/overrides/bulk':
+            batch_id = response.get_json()['batch_id']
+            undo = client.post(f'/api/overrides/batches/{batch_id}/undo', json={})
+            if undo.status_code != 200:
+                failures.append(f"POST undo -> {undo.status_code}")
+
+    # The event stream's queries, without holding a stream open
+    with app.app.test_request_context('/api/events'):
+        app.read_change_events(0)
+    return failures
+
+def pipeline_statements(db_path):
+    """Statements the effective-tag triggers run for every override and mapping change"""
+    conn = sqlite3.connect(db_path)
+    try:
+        statements = {}
+        for sql in resolve_pair_sql('?', '?').split(';'):
+            if sql.strip():
+                parameters = [10, 2] * sql.count('?')
+                statements[('trigger: re-resolve pair', normalize_sql(sql))] = \
+                    explain_query_plan(conn, sql, parameters[:sql.count('?')])
+        return statements
+    finally:
+        conn.close()
+
+def check_query_plans(verbose=False, db_path=None):
+    """Run the check against db_path (a fixture built at FIXTURE_SCALE, or a new one); returns the problems found"""
+    if db_path is None:
+        with tempfile.TemporaryDirectory() as fixture_dir:
+            db_path = os.path.join(fixture_dir, 'survey_analysis.db')
+            print("🏗️ Building fixture database...")
+            build_fixture_database(db_path, FIXTURE_SCALE)
+            return check_query_plans(verbose, db_path)
+
+    import app
+    saved = app.DATABASE_PATH, app.JOURNAL_PATH, app.slow_query_log
+    app.DATABASE_PATH = db_path
+    app.JOURNAL_PATH = os.path.join(os.path.dirname(db_path), 'override_journal.db')
+    recorder = PlanRecorder()
+    app.slow_query_log = recorder
+    try:
+        problems = exercise_api(app)
+    finally:
+        app.DATABASE_PATH, app.JOURNAL_PATH, app.slow_query_log = saved
+    statements = dict(recorder.statements)
+    statements.update(pipeline_statements(db_path))
+
+    used_allowances = set()
+    for (endpoint, sql), plan_rows in sorted(statements.items(), key=lambda item: (str(item[0][0]), item[0][1])):
+        scanned = set()
+        for table in full_scans(sql, plan_rows):
+            allowance = allowed_scan(endpoint, sql, table)
+            if allowance is None:
+                scanned.add(table)
+            else:
+                used_allowances.add(allowance)
+        if verbose or scanned:
+            print(f"\n{'❌' if scanned else '✅'} {endpoint}\n   {sql[:200]}\n{format_query_plan(plan_rows)}")
+        for table in sorted(scanned):
+            problems.append(f"{endpoint}: full scan of {table} in: {sql[:120]}")
+
+    # Allowances nothing needs any more would hide a future regression
+    for probe, table in sorted(set(FULL_CORPUS_SCANS) | set(WRITER_FULL_SCANS)):
+        if (probe, table) not in used_allowances:
+            problems.append(f"stale allowance: {probe[:60]} no longer scans {table}")
+
+    print(f"\n🔍 Checked {len(statements)} statements")
+    return problems
+
+if __name__ == "__main__":
+    problems = check_query_plans(verbose='--verbose' in sys.argv)
+    if problems:
+        print(f"\n❌ {len(problems)} query plan problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print("✅ No full scans of large tables")
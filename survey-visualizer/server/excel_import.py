@@ -8,14 +8,30 @@ import pandas as pd
 import sqlite3
 from datetime import datetime
 import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(BASE_DIR, 'powerbi_pipeline'))
+
+from override_journal import journal_path, append_mappings, replay_journal
 
 class TagAssignmentImporter:
-    def __init__(self, database_path):
+    """Validates mapping spreadsheets and applies them through the override journal
+
+    Imported mappings are journaled first and then applied by a journal replay, so they
+    take the same path as overrides: one IMMEDIATE write transaction (with the tag cube
+    refreshed), and re-applied to every rebuilt generation. Inside the server, pass
+    `writer` (e.g. db_writer.run) so the replay runs on the server's writer thread.
+    """
+    
+    def __init__(self, database_path, writer=None):
         self.database_path = database_path
+        self.journal_path = journal_path(os.path.dirname(os.path.abspath(database_path)))
+        self.writer = writer
         
     def get_db_connection(self):
         """Create database connection"""
-        conn = sqlite3.connect(self.database_path)
+        conn = sqlite3.connect(self.database_path, timeout=30)
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -142,10 +158,11 @@ class TagAssignmentImporter:
                 results['warnings'].append("Dry run completed - no data was imported")
                 return results
             
-            # Perform import
+            # Resolve tags and count new vs existing mappings, then journal the import
             conn = self.get_db_connection()
             current_time = datetime.now().isoformat()
             
+            entries = []
             inserted_count = 0
             updated_count = 0
             
@@ -162,36 +179,26 @@ class TagAssignmentImporter:
                 
                 # Check if mapping already exists
                 exists_query = "SELECT COUNT(*) as count FROM QuestionTagMappings WHERE QuestionID = ? AND TagID = ?"
-                exists_result = conn.execute(exists_query, (row['QuestionID'], tag_id)).fetchone()
-                
+                exists_result = conn.execute(exists_query, (int(row['QuestionID']), tag_id)).fetchone()
                 if exists_result['count'] > 0:
-                    # Update existing mapping
-                    update_query = """
-                    UPDATE QuestionTagMappings 
-                    SET AssignmentType = ?, AppliedBy = ?, AppliedDate = ?, Notes = ?, IsActive = 1
-                    WHERE QuestionID = ? AND TagID = ?
-                    """
-                    conn.execute(update_query, (
-                        row['AssignmentType'], row['AppliedBy'], current_time, 
-                        row['Notes'], row['QuestionID'], tag_id
-                    ))
                     updated_count += 1
                 else:
-                    # Insert new mapping
-                    insert_query = """
-                    INSERT INTO QuestionTagMappings 
-                    (QuestionID, TagID, AssignmentType, AppliedBy, AppliedDate, Notes, IsActive)
-                    VALUES (?, ?, ?, ?, ?, ?, 1)
-                    """
-                    conn.execute(insert_query, (
-                        row['QuestionID'], tag_id, row['AssignmentType'],
-                        row['AppliedBy'], current_time, row['Notes']
-                    ))
                     inserted_count += 1
+                
+                entries.append({
+                    'QuestionID': int(row['QuestionID']),
+                    'TagID': tag_id,
+                    'AssignmentType': row['AssignmentType'],
+                    'AppliedBy': row['AppliedBy'],
+                    'AppliedDate': current_time,
+                    'Notes': row['Notes'],
+                })
             
-            conn.commit()
             conn.close()
             
+            append_mappings(self.journal_path, entries)
+            self.apply_journal()
+            
             results['records_inserted'] = inserted_count
             results['records_updated'] = updated_count  
             results['success'] = True
@@ -201,6 +208,17 @@ class TagAssignmentImporter:
             
         return results
     
+    def apply_journal(self):
+        """Replay the journal into the database, on the server's writer when there is one"""
+        if self.writer is not None:
+            return self.writer(lambda conn: replay_journal(conn, self.journal_path))
+        
+        conn = sqlite3.connect(self.database_path, timeout=30)
+        try:
+            return replay_journal(conn, self.journal_path)
+        finally:
+            conn.close()
+    
     def export_current_mappings(self, output_file_path):
         """Export current question-tag mappings to Excel for editing"""
         conn = self.get_db_connection()
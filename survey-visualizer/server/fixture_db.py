@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Synthetic Survey Database
+Builds a database with the full pipeline schema, indexes, views, effective tags and tag cube, filled
+with random responses at a multiple of the current survey's size. Used by the query plan
+check and the load test; nothing here touches the real data.
+
+    python fixture_db.py /tmp/survey_100x.db 100
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import random
+import sqlite3
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(BASE_DIR, 'powerbi_pipeline'))
+
+from db_schema import INDEXES, create_schema
+from effective_tags import materialize_effective_tags
+from tag_cube import build_tag_cube
+
+# Size of the current survey; scale 1 matches it
+SURVEY_RESPONDENTS = 65
+SURVEY_QUESTIONS = 11
+
+PRIMARY_TAGS = 20
+SUB_TAGS_PER_PRIMARY = 4
+TAGS_PER_RESPONSE = 3
+
+# Share of responses with a question-based mapping / a manual override
+MAPPING_RATE = 0.1
+OVERRIDE_RATE = 0.1
+
+WORDS = ['staffing', 'funding', 'rural', 'access', 'training', 'broadband', 'housing', 'retention',
+         'loan', 'forgiveness', 'telehealth', 'transport', 'behavioral', 'pediatric', 'pipeline']
+
+def insert_dimensions(conn):
+    """Geography, organizations, roles, questions, urgency, categories and a two-level tag tree"""
+    conn.executemany("INSERT INTO DimGeography (GeographyID, PrimaryCounty, Region, State, IsNWA) VALUES (?, ?, ?, 'AR', ?)",
+                     [(i, f"County {i}", f"Region {i % 4}", i % 2) for i in range(1, 21)])
+    conn.executemany("INSERT INTO DimOrganization (OrganizationID, OrganizationName, OrganizationType) VALUES (?, ?, ?)",
+                     [(i, f"Organization {i}", f"Type {i % 5}") for i in range(1, 51)])
+    conn.executemany("INSERT INTO DimRole (RoleID, RoleStandardized, RoleCategory, RoleType) VALUES (?, ?, ?, ?)",
+                     [(i, f"Role {i}", f"Category {i % 6}", f"Type {i % 3}") for i in range(1, 31)])
+    conn.executemany("INSERT INTO DimQuestion (QuestionID, QuestionText, QuestionShort, IsOpenEnded) VALUES (?, ?, ?, 1)",
+                     [(i, f"Question {i}?", f"Q{i}") for i in range(1, SURVEY_QUESTIONS + 1)])
+    conn.executemany("INSERT INTO DimUrgency (UrgencyID, UrgencyLevel) VALUES (?, ?)",
+                     [(1, 'Low'), (2, 'Medium'), (3, 'High')])
+    conn.executemany("INSERT INTO DimHealthcareCategory (CategoryID, CategoryName) VALUES (?, ?)",
+                     [(i, f"Category {i}") for i in range(1, 11)])
+
+    tags = []
+    for primary in range(PRIMARY_TAGS):
+        primary_id = len(tags) + 1
+        tags.append((primary_id, f"Primary {primary}", f"Category {primary % 5}", 1, None))
+        for sub in range(SUB_TAGS_PER_PRIMARY):
+            tags.append((len(tags) + 1, f"Sub {primary}.{sub}", f"Category {primary % 5}", 2, primary_id))
+    conn.executemany("""
+    INSERT INTO DimTags (TagID, TagKey, TagName, TagCategory, TagLevel, ParentTagID, IsActive)
+    VALUES (?, lower(?), ?, ?, ?, ?, 1)
+    """, [(tag_id, name, name, category, level, parent) for tag_id, name, category, level, parent in tags])
+    return [tag[0] for tag in tags]
+
+def insert_respondent(conn, rng, respondent, tag_ids):
+    """One respondent's answers to every question, with their tags, bridges, mappings and overrides"""
+    organization_id, geography_id, role_id = rng.randint(1, 50), rng.randint(1, 20), rng.randint(1, 30)
+    first_id = (respondent - 1) * SURVEY_QUESTIONS + 1
+
+    responses, tags, categories, roles, mappings, overrides = [], [], [], [], [], []
+    for question in range(1, SURVEY_QUESTIONS + 1):
+        response_id = first_id + question - 1
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 40)))
+        responses.append((response_id, respondent, organization_id, geography_id, role_id,
+                          question, rng.randint(1, 3), text, len(text), len(text.split())))
+        tags.extend((response_id, tag_id) for tag_id in rng.sample(tag_ids, TAGS_PER_RESPONSE))
+        categories.append((response_id, rng.randint(1, 10)))
+        roles.append((response_id, f"Type {role_id % 3}", f"Category {role_id % 6}"))
+        if rng.random() < MAPPING_RATE:
+            mappings.append((response_id, question, rng.choice(tag_ids)))
+        if rng.random() < OVERRIDE_RATE:
+            overrides.append((response_id, respondent, question, rng.choice(tag_ids),
+                              rng.choice(['ADD', 'REMOVE']), f"2025-01-{response_id % 28 + 1:02d}"))
+
+    conn.executemany("""
+    INSERT INTO FactSurveyResponses (ResponseID, SurveyResponseNumber, OrganizationID, GeographyID, RoleID,
+        QuestionID, UrgencyID, ResponseText, ResponseLength, WordCount, HasResponse, IsTextResponse, IsLongResponse)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, 1, 0)
+    """, responses)
+    conn.executemany("INSERT INTO BridgeResponseTags (ResponseID, TagID) VALUES (?, ?)", tags)
+    conn.executemany("INSERT INTO BridgeResponseCategories (ResponseID, CategoryID) VALUES (?, ?)", categories)
+    conn.executemany("INSERT INTO BridgeResponseRoles (ResponseID, RoleType, RoleCategory) VALUES (?, ?, ?)", roles)
+    conn.executemany("""
+    INSERT INTO QuestionTagMappings (ResponseID, QuestionID, TagID, TagType, AssignmentType, AppliedBy, AppliedDate, IsActive)
+    VALUES (?, ?, ?, 'Primary', 'AUTOMATIC', 'fixture', '2025-01-01', 1)
+    """, mappings)
+    conn.executemany("""
+    INSERT INTO ManualTagOverrides (ResponseID, SurveyResponseNumber, QuestionID, TagID, Action, AppliedBy, AppliedDate, IsActive)
+    VALUES (?, ?, ?, ?, ?, 'fixture', ?, 1)
+    """, overrides)
+
+def build_fixture_database(db_path, scale=10, seed=7):
+    """Create the full schema at `scale` times the current survey and ANALYZE it like a real build"""
+    from create_sqlite_db import create_analysis_views
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    create_schema(conn)
+
+    tag_ids = insert_dimensions(conn)
+    for respondent in range(1, round(SURVEY_RESPONDENTS * scale) + 1):
+        insert_respondent(conn, rng, respondent, tag_ids)
+    conn.commit()
+
+    for index_sql in INDEXES:
+        conn.execute(index_sql)
+    with redirect_stdout(io.StringIO()):
+        create_analysis_views(conn)
+    materialize_effective_tags(conn)
+    build_tag_cube(conn)
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA user_version = 1")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.commit()
+    conn.close()
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'survey_fixture.db'
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    build_fixture_database(path, scale)
+    print(f"✅ Built {path} at {scale:g}x the survey ({round(SURVEY_RESPONDENTS * scale) * SURVEY_QUESTIONS:,} responses)")
@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for serving the survey API to several reviewers at once
+
+    cd survey-visualizer/server
+    gunicorn -c gunicorn.conf.py app:app
+
+Each worker process has its own read connection pool and writer thread; overrides from
+any worker reach the others through the database (WAL) and the override journal.
+`python app.py` still runs the single-process development server.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('SURVEY_API_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SURVEY_API_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# Threaded workers: a slow analytics request holds one thread until it finishes, and an
+# /api/events stream holds one for as long as the client stays connected. The app caps
+# streams at SURVEY_API_EVENT_STREAMS per worker (default half of these threads) and answers
+# 503 past that, so raise both together when more reviewers keep the app open
+worker_class = 'gthread'
+threads = int(os.environ.get('SURVEY_API_THREADS', 8))
+
+# Longer than the app's 20 second query timeout
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
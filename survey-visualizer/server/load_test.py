@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Load Test for the Survey API
+Simulates concurrent reviewers against a synthetic database scaled to a multiple of the
+current survey, replaying the client's request mix (initial tags/responses/analytics loads,
+highlight lookups, tag drill-downs and override POSTs), and reports throughput, latency
+percentiles and lock errors. Needs nothing beyond the server's own requirements.
+
+    cd survey-visualizer/server
+    python load_test.py --scale 10 --reviewers 8 --duration 30
+    python load_test.py --scale 100 --reviewers 25 --workers 4     # gunicorn with 4 worker processes
+    python fixture_db.py /tmp/survey_1000x.db 1000                 # build a large fixture once...
+    python load_test.py --db /tmp/survey_1000x.db --page-size 200  # ...and reuse it
+"""
+
+from collections import defaultdict
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from fixture_db import SURVEY_QUESTIONS, build_fixture_database
+from metrics import percentile, to_ms
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What a reviewer does between initial loads, with relative weights
+ACTIONS = [
+    ('highlight', 40),
+    ('tag_responses', 15),
+    ('edit_dialog', 15),
+    ('override', 15),
+    ('question_distribution', 10),
+    ('analytics', 5),
+]
+
+REQUEST_TIMEOUT = 120
+
+class LoadStats:
+    """Latencies and failures per operation, shared by all reviewer threads"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.lock_errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, operation, latency, status, body=b''):
+        # SQLite lock contention shows up as "database is locked" / "busy" in 500 responses
+        locked = status >= 500 and (b'locked' in body or b'busy' in body.lower())
+        with self.lock:
+            self.latencies[operation].append(latency)
+            self.statuses[operation][status] += 1
+            if locked:
+                self.lock_errors += 1
+
+class Reviewer:
+    """One simulated analyst: loads the app, then browses and edits tags with think time"""
+
+    def __init__(self, base_url, stats, rng, think_time, page_size):
+        self.base_url = base_url
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.page_size = page_size
+        self.response_ids = []
+        self.tag_ids = []
+        self.sync = {}
+
+    def request(self, operation, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method='POST' if data else 'GET',
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+                payload = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            payload, status = e.read(), e.code
+        except OSError as e:
+            # Connection refused/reset or timed out; counted as status 0
+            payload, status = str(e).encode(), 0
+        self.stats.record(operation, time.perf_counter() - start, status, payload)
+        if status == 200:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+    def initial_load(self):
+        """The requests the client makes when a reviewer opens the app"""
+        tags = self.request('tags', '/api/tags') or []
+        self.tag_ids = [tag['TagID'] for tag in tags] or [1]
+        self.sync = self.request('changes', '/api/changes') or {}
+
+        path = f'/api/responses?limit={self.page_size}' if self.page_size else '/api/responses'
+        questions = self.request('responses', path) or []
+        if isinstance(questions, dict):
+            questions = questions['questions']
+        self.response_ids = [response['ResponseID'] for question in questions for response in question['responses']] or [1]
+
+        self.request('analytics', '/api/analytics')
+        self.request('override_stats', '/api/overrides/stats')
+
+    def act(self, action):
+        response_id = self.rng.choice(self.response_ids)
+        if action == 'highlight':
+            self.request('highlight', f'/api/response/{response_id}/highlight')
+        elif action == 'tag_responses':
+            self.request('tag_responses', f'/api/tags/{self.rng.choice(self.tag_ids)}/responses')
+        elif action == 'edit_dialog':
+            self.request('tags_available', '/api/tags/available')
+            self.request('effective_tags', f'/api/responses/{response_id}/effective-tags')
+        elif action == 'override':
+            self.request('override', f'/api/response/{response_id}/tags', {
+                'tag_id': self.rng.choice(self.tag_ids),
+                'action': self.rng.choice(['ADD', 'REMOVE']),
+                'applied_by': 'load-test',
+            })
+            # The client then pulls the delta instead of reloading every response
+            changes = self.request('changes_since', f"/api/changes?since={self.sync.get('version', 0)}"
+                                                    f"&generation={self.sync.get('generation')}")
+            if changes:
+                self.sync = changes
+        elif action == 'question_distribution':
+            self.request('question_distribution', f'/api/questions/{self.rng.randint(1, SURVEY_QUESTIONS)}/tag-distribution')
+        elif action == 'analytics':
+            self.request('analytics', '/api/analytics')
+
+    def run(self, deadline):
+        self.initial_load()
+        actions, weights = zip(*ACTIONS)
+        while time.time() < deadline:
+            self.act(self.rng.choices(actions, weights)[0])
+            if self.think_time:
+                time.sleep(self.rng.expovariate(1 / self.think_time))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/api/metrics', timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+def start_server(db_path, workers, work_dir):
+    """Serve the API on a free local port; returns (base_url, stop)"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+
+    if workers:
+        env = dict(os.environ,
+                   SURVEY_API_DATABASE=db_path,
+                   SURVEY_API_BIND=f'127.0.0.1:{port}',
+                   SURVEY_API_WORKERS=str(workers),
+                   SURVEY_API_SLOW_QUERY_LOG=os.path.join(work_dir, 'slow_queries.log'))
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', os.devnull,
+                                   'app:app'], cwd=SERVER_DIR, env=env)
+        wait_for_server(base_url)
+        return base_url, lambda: (server.terminate(), server.wait())
+
+    # Threaded development server in this process
+    os.environ['SURVEY_API_DATABASE'] = db_path
+    os.environ['SURVEY_API_SLOW_QUERY_LOG'] = os.path.join(work_dir, 'slow_queries.log')
+    from werkzeug.serving import make_server
+    import app
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    wait_for_server(base_url)
+    return base_url, server.shutdown
+
+def print_report(stats, elapsed, reviewers):
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f"\n📊 {total} requests from {reviewers} reviewers in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+    print(f"\n{'operation':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  errors")
+    all_latencies = []
+    for operation in sorted(stats.latencies):
+        latencies = sorted(stats.latencies[operation])
+        all_latencies.extend(latencies)
+        errors = ', '.join(f"{status or 'conn'}: {count}"
+                           for status, count in sorted(stats.statuses[operation].items()) if status != 200)
+        print(f"{operation:<24}{len(latencies):>7}"
+              f"{to_ms(percentile(latencies, 0.50)):>10}{to_ms(percentile(latencies, 0.95)):>10}"
+              f"{to_ms(percentile(latencies, 0.99)):>10}{to_ms(latencies[-1]):>10}  {errors or '-'}")
+    all_latencies.sort()
+    print(f"{'all':<24}{len(all_latencies):>7}"
+          f"{to_ms(percentile(all_latencies, 0.50)):>10}{to_ms(percentile(all_latencies, 0.95)):>10}"
+          f"{to_ms(percentile(all_latencies, 0.99)):>10}{to_ms(all_latencies[-1]):>10}")
+
+    failed = sum(count for statuses in stats.statuses.values() for status, count in statuses.items() if status != 200)
+    print(f"\n{'❌' if stats.lock_errors else '✅'} Lock errors: {stats.lock_errors}   Failed requests: {failed}")
+
+def run_load_test(args):
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.url:
+            # The running server already has its own database
+            base_url, stop = args.url.rstrip('/'), lambda: None
+        else:
+            db_path = args.db
+            if db_path is None:
+                db_path = os.path.join(work_dir, 'survey_analysis.db')
+                print(f"🏗️ Building fixture database at {args.scale:g}x the survey...")
+                start = time.time()
+                build_fixture_database(db_path, args.scale)
+                print(f"   built in {time.time() - start:.1f}s")
+            base_url, stop = start_server(db_path, args.workers, work_dir)
+
+        print(f"🚀 {args.reviewers} reviewers for {args.duration}s against {base_url}")
+        stats = LoadStats()
+        rng = random.Random(args.seed)
+        deadline = time.time() + args.duration
+        reviewers = [Reviewer(base_url, stats, random.Random(rng.random()), args.think_time, args.page_size)
+                     for _ in range(args.reviewers)]
+        threads = [threading.Thread(target=reviewer.run, args=(deadline,)) for reviewer in reviewers]
+        start = time.time()
+        try:
+            for thread in threads:
+                thread.start()
+                # Stagger arrivals a little, like people opening the app
+                time.sleep(args.ramp_up / max(args.reviewers, 1))
+            for thread in threads:
+                thread.join()
+        finally:
+            elapsed = time.time() - start
+            stop()
+
+        print_report(stats, elapsed, args.reviewers)
+        return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent reviewers against the survey API")
+    parser.add_argument('--scale', type=float, default=10, help="fixture size as a multiple of the current survey")
+    parser.add_argument('--db', help="use an existing fixture (see fixture_db.py) instead of building one")
+    parser.add_argument('--url', help="test an already running server instead of starting one")
+    parser.add_argument('--workers', type=int, default=0, help="serve with gunicorn and this many workers (0: in-process server)")
+    parser.add_argument('--reviewers', type=int, default=8, help="concurrent simulated reviewers")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run after the initial loads start")
+    parser.add_argument('--think-time', type=float, default=0.5, help="mean seconds between a reviewer's actions")
+    parser.add_argument('--ramp-up', type=float, default=2, help="seconds over which reviewers arrive")
+    parser.add_argument('--page-size', type=int, help="load responses a page at a time instead of the full list")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    if args.url and (args.db or args.workers):
+        parser.error("--db and --workers start a local server; they cannot be combined with --url")
+    stats = run_load_test(args)
+    sys.exit(1 if stats.lock_errors else 0)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Request Metrics for the Survey API
+Per-endpoint latency histograms plus SQL statement, row and byte counters, rendered in
+the Prometheus text format or as a JSON summary. Metrics are kept per server process.
+"""
+
+from collections import deque
+import math
+import threading
+
+# Histogram bucket upper bounds in seconds (Prometheus convention)
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+# Recent latencies kept per endpoint for exact percentiles in the JSON summary
+RECENT_SAMPLES = 1000
+
+class EndpointMetrics:
+    """Counters for one (endpoint, method) pair"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.recent_latencies = deque(maxlen=RECENT_SAMPLES)
+        self.sql_statements = 0
+        self.max_sql_statements = 0
+        self.sql_rows = 0
+        self.response_bytes = 0
+
+    def record(self, latency, status, sql_statements, sql_rows, response_bytes):
+        self.requests += 1
+        if status >= 500:
+            self.errors += 1
+        self.latency_sum += latency
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.bucket_counts[index] += 1
+        self.recent_latencies.append(latency)
+        self.sql_statements += sql_statements
+        self.max_sql_statements = max(self.max_sql_statements, sql_statements)
+        self.sql_rows += sql_rows
+        self.response_bytes += response_bytes
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+def to_ms(seconds):
+    """Seconds to rounded milliseconds, passing None through"""
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+def escape_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class RequestMetrics:
+    """Thread-safe registry of EndpointMetrics keyed by (endpoint, method)"""
+
+    def __init__(self, namespace='survey_api'):
+        self.namespace = namespace
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, latency, status, sql_statements=0, sql_rows=0, response_bytes=0):
+        with self._lock:
+            metrics = self._endpoints.get((endpoint, method))
+            if metrics is None:
+                metrics = self._endpoints[(endpoint, method)] = EndpointMetrics()
+            metrics.record(latency, status, sql_statements, sql_rows, response_bytes)
+
+    def summary(self):
+        """Per-endpoint JSON summary with latency percentiles (milliseconds) and per-request SQL averages"""
+        with self._lock:
+            snapshot = [(key, metrics, sorted(metrics.recent_latencies))
+                        for key, metrics in sorted(self._endpoints.items())]
+
+        endpoints = []
+        for (endpoint, method), metrics, latencies in snapshot:
+            endpoints.append({
+                'endpoint': endpoint,
+                'method': method,
+                'requests': metrics.requests,
+                'errors': metrics.errors,
+                'p50_ms': to_ms(percentile(latencies, 0.50)),
+                'p95_ms': to_ms(percentile(latencies, 0.95)),
+                'p99_ms': to_ms(percentile(latencies, 0.99)),
+                'max_ms': to_ms(latencies[-1] if latencies else None),
+                'avg_sql_statements': round(metrics.sql_statements / metrics.requests, 2),
+                'max_sql_statements': metrics.max_sql_statements,
+                'avg_sql_rows': round(metrics.sql_rows / metrics.requests, 2),
+                'avg_response_bytes': round(metrics.response_bytes / metrics.requests),
+            })
+        return endpoints
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        ns = self.namespace
+        with self._lock:
+            snapshot = sorted(self._endpoints.items())
+
+        lines = [
+            f"# HELP {ns}_request_duration_seconds Request latency by endpoint",
+            f"# TYPE {ns}_request_duration_seconds histogram",
+        ]
+        for (endpoint, method), metrics in snapshot:
+            labels = f'endpoint="{escape_label(endpoint)}",method="{method}"'
+            for bound, count in zip(LATENCY_BUCKETS, metrics.bucket_counts):
+                lines.append(f'{ns}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{ns}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.requests}')
+            lines.append(f'{ns}_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum:.6f}')
+            lines.append(f'{ns}_request_duration_seconds_count{{{labels}}} {metrics.requests}')
+
+        counters = [
+            ('request_errors_total', 'Requests answered with a 5xx status', 'errors'),
+            ('sql_statements_total', 'SQL statements executed while serving requests and writer jobs', 'sql_statements'),
+            ('sql_rows_total', 'Rows returned by SQL statements while serving requests and writer jobs', 'sql_rows'),
+            ('response_bytes_total', 'Response body bytes served', 'response_bytes'),
+        ]
+        for name, help_text, attribute in counters:
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for (endpoint, method), metrics in snapshot:
+                labels = f'endpoint="{escape_label(endpoint)}",method="{method}"'
+                lines.append(f'{ns}_{name}{{{labels}}} {getattr(metrics, attribute)}')
+        return '\n'.join(lines) + '\n'
+
+if __name__ == "__main__":
+    # Quick self-check of the exposition format
+    metrics = RequestMetrics()
+    for latency in [0.004, 0.012, 0.3]:
+        metrics.record('/api/tags', 'GET', latency, 200, sql_statements=2, sql_rows=80, response_bytes=1024)
+    print(metrics.prometheus())
+    print(metrics.summary())
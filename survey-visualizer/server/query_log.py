@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Slow Query Log for the Survey API
+Statements slower than a threshold are written to a rotating log file together with
+their parameters, duration and EXPLAIN QUERY PLAN output, to point at missing indexes
+"""
+
+from logging.handlers import RotatingFileHandler
+import logging
+import os
+import re
+import threading
+
+# Long parameter lists (e.g. JSON arrays of IDs) are cut to this many characters
+MAX_PARAMS_CHARS = 500
+
+class SlowQueryLog:
+    """Rotating log of statements that took at least `threshold_ms`"""
+
+    def __init__(self, path, threshold_ms=100, max_bytes=5 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.logger = logging.getLogger(f"survey_api.slow_queries.{path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._handler_lock = threading.Lock()
+
+    def _ensure_handler(self):
+        # The file is only created once something is slow
+        with self._handler_lock:
+            if self.logger.handlers:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.logger.addHandler(handler)
+
+    def is_slow(self, duration):
+        return self.threshold_ms is not None and duration * 1000 >= self.threshold_ms
+
+    def log(self, conn, sql, parameters, duration, context=None):
+        """Write one slow statement, with the query plan read from `conn`"""
+        try:
+            plan = format_query_plan(explain_query_plan(conn, sql, parameters))
+        except Exception as e:
+            plan = f"  (no plan: {e})"
+
+        params = repr(parameters)
+        if len(params) > MAX_PARAMS_CHARS:
+            params = f"{params[:MAX_PARAMS_CHARS]}... ({len(params)} chars)"
+
+        self._ensure_handler()
+        self.logger.info(
+            f"slow query {duration * 1000:.1f} ms{f' on {context}' if context else ''}\n"
+            f"SQL: {normalize_sql(sql)}\n"
+            f"Params: {params}\n"
+            f"Plan:\n{plan}\n"
+        )
+
+def normalize_sql(sql):
+    """Collapse whitespace so each statement fits on one line"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+def explain_query_plan(conn, sql, parameters=()):
+    """EXPLAIN QUERY PLAN rows for a statement as (id, parent, detail)"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    return [(row[0], row[1], row[3]) for row in rows]
+
+def format_query_plan(plan_rows):
+    """Indent plan steps under their parents, like the sqlite3 shell does"""
+    depth = {0: 0}
+    lines = []
+    for node_id, parent_id, detail in plan_rows:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append(f"{'  ' * depth[node_id]}{detail}")
+    return '\n'.join(lines) if lines else "  (empty plan)"
+
+if __name__ == "__main__":
+    # Print the plan of a statement against the survey database
+    import sqlite3
+    import sys
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    conn = sqlite3.connect(os.path.join(base_dir, 'powerbi_data_model_v2', 'survey_analysis.db'))
+    sql = sys.argv[1] if len(sys.argv) > 1 else "SELECT * FROM EffectiveResponseTags WHERE TagID = 1"
+    print(normalize_sql(sql))
+    print(format_query_plan(explain_query_plan(conn, sql)))
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(BASE_DIR, 'powerbi_pipeline'))
+sys.path.append(os.path.join(BASE_DIR, 'survey-visualizer', 'server'))
+
+def build_survey_db(directory, scale):
+    from fixture_db import build_fixture_database
+    db_path = str(directory / 'survey_analysis.db')
+    build_fixture_database(db_path, scale=scale)
+    return db_path
+
+@pytest.fixture
+def survey_db(tmp_path):
+    """A synthetic survey database the size of the real survey, with an empty journal beside it"""
+    return build_survey_db(tmp_path, scale=1)
+
+@pytest.fixture
+def large_survey_db(tmp_path):
+    """A synthetic survey database at the query plan check's scale, where plans match production"""
+    from check_query_plans import FIXTURE_SCALE
+    return build_survey_db(tmp_path, scale=FIXTURE_SCALE)
+
+@pytest.fixture
+def api(survey_db, monkeypatch):
+    """The server module, serving the synthetic survey database"""
+    import app
+    monkeypatch.setattr(app, 'DATABASE_PATH', survey_db)
+    monkeypatch.setattr(app, 'JOURNAL_PATH', os.path.join(os.path.dirname(survey_db), 'override_journal.db'))
+    return app
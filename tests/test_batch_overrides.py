@@ -0,0 +1,32 @@
+import sqlite3
+
+def override_state(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return (
+            conn.execute("SELECT COUNT(*) FROM ManualTagOverrides").fetchone()[0],
+            conn.execute("SELECT ResponseID, TagID, Source FROM EffectiveResponseTags WHERE ResponseID IN (11, 12)").fetchall(),
+        )
+    finally:
+        conn.close()
+
+def test_invalid_override_rejects_the_whole_batch(api):
+    client = api.app.test_client()
+    before = override_state(api.DATABASE_PATH)
+
+    response = client.post('/api/overrides/batch', json={'overrides': [
+        {'response_id': 11, 'tag_id': 3, 'action': 'ADD'},
+        {'response_id': 999999, 'tag_id': 3, 'action': 'ADD'},
+        {'response_id': 12, 'tag_id': 3, 'action': 'TOGGLE'},
+    ]})
+    assert response.status_code == 400
+    assert [detail['index'] for detail in response.get_json()['details']] == [2]
+
+    response = client.post('/api/overrides/batch', json={'overrides': [
+        {'response_id': 11, 'tag_id': 3, 'action': 'ADD'},
+        {'response_id': 999999, 'tag_id': 3, 'action': 'ADD'},
+    ]})
+    assert response.status_code == 400
+    assert [detail['index'] for detail in response.get_json()['details']] == [1]
+
+    assert override_state(api.DATABASE_PATH) == before
@@ -0,0 +1,27 @@
+import sqlite3
+
+def question_tags(db_path, question_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+        SELECT ert.ResponseID, ert.TagID, ert.Source FROM EffectiveResponseTags ert
+        JOIN FactSurveyResponses f ON f.ResponseID = ert.ResponseID
+        WHERE f.QuestionID = ? ORDER BY ert.ResponseID, ert.TagID
+        """, (question_id,)).fetchall()
+    finally:
+        conn.close()
+
+def test_undo_restores_effective_tags(api):
+    client = api.app.test_client()
+    before = question_tags(api.DATABASE_PATH, 3)
+    responses = {response_id for response_id, _, _ in before}
+
+    applied = client.post('/api/overrides/bulk', json={'tag_id': 4, 'action': 'ADD', 'filters': {'question_id': 3}})
+    assert applied.status_code == 200
+    during = question_tags(api.DATABASE_PATH, 3)
+    assert {response_id for response_id, tag_id, _ in during if tag_id == 4} == responses
+    assert during != before
+
+    undone = client.post(f"/api/overrides/batches/{applied.get_json()['batch_id']}/undo", json={})
+    assert undone.status_code == 200
+    assert question_tags(api.DATABASE_PATH, 3) == before
@@ -0,0 +1,22 @@
+def test_changes_since_returns_exactly_the_touched_responses(api):
+    client = api.app.test_client()
+    start = client.get('/api/changes').get_json()
+
+    saved = client.post('/api/overrides/batch', json={'overrides': [
+        {'response_id': 21, 'tag_id': 5, 'action': 'ADD'},
+        {'response_id': 22, 'tag_id': 5, 'action': 'REMOVE'},
+        {'response_id': 23, 'tag_id': 6, 'action': 'ADD'},
+    ]})
+    assert saved.status_code == 200
+
+    changes = client.get(f"/api/changes?since={start['version']}&generation={start['generation']}").get_json()
+    assert changes['reset'] is False
+    assert changes['version'] > start['version']
+    assert set(changes['responses']) == {'21', '22', '23'}
+    assert set(changes['tag_counts']) == {'5', '6'}
+    assert 5 in {tag['TagID'] for tag in changes['responses']['21']}
+    assert 5 not in {tag['TagID'] for tag in changes['responses']['22']}
+
+    # Nothing since the latest version
+    latest = client.get(f"/api/changes?since={changes['version']}").get_json()
+    assert latest['responses'] == {}
@@ -0,0 +1,31 @@
+import threading
+
+def get_on_new_thread(client, path, statuses):
+    """Serve one request on its own thread, as the threaded development server does"""
+    thread = threading.Thread(target=lambda: statuses.append(client.get(path).status_code))
+    thread.start()
+    return thread
+
+def test_requests_on_new_threads_reuse_one_connection(api, monkeypatch):
+    monkeypatch.setattr(api, 'read_pool', api.ReadConnectionPool(4))
+    client = api.app.test_client()
+    statuses = []
+    for response_id in range(1, 21):
+        get_on_new_thread(client, f'/api/responses/{response_id}/effective-tags', statuses).join()
+
+    assert statuses == [200] * 20
+    assert api.read_pool.opened == 1
+    assert api.read_pool.idle_count() == 1
+
+def test_concurrent_requests_stay_within_the_pool(api, monkeypatch):
+    monkeypatch.setattr(api, 'read_pool', api.ReadConnectionPool(4))
+    client = api.app.test_client()
+    statuses = []
+    threads = [get_on_new_thread(client, f'/api/response/{response_id}/highlight', statuses)
+               for response_id in range(1, 21)]
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 20
+    assert 1 <= api.read_pool.opened <= api.read_pool.size
+    assert api.read_pool.idle_count() == api.read_pool.opened
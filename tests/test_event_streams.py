@@ -0,0 +1,16 @@
+def test_streams_past_the_cap_are_refused_until_one_closes(api, monkeypatch):
+    monkeypatch.setattr(api, '_event_stream_slots', api.threading.BoundedSemaphore(2))
+    client = api.app.test_client()
+    streams = [client.get('/api/events', buffered=False) for _ in range(2)]
+    assert [stream.status_code for stream in streams] == [200, 200]
+    assert next(streams[0].response).startswith(b'id: ')
+
+    refused = client.get('/api/events')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == str(api.EVENT_RETRY_SECONDS)
+
+    streams[0].close()
+    reopened = client.get('/api/events', buffered=False)
+    assert reopened.status_code == 200
+    for stream in (streams[1], reopened):
+        stream.close()
@@ -0,0 +1,58 @@
+import sqlite3
+
+import pandas as pd
+
+from excel_import import TagAssignmentImporter
+from test_tag_cube import cube_drift
+
+def write_mappings(path, rows):
+    pd.DataFrame(rows, columns=['QuestionID', 'TagName', 'TagType', 'AssignmentType']).to_excel(path, index=False)
+
+def test_import_refreshes_tag_cube(survey_db, tmp_path):
+    conn = sqlite3.connect(survey_db)
+    question_id, tag_name, tag_level = conn.execute("""
+    SELECT m.QuestionID, t.TagName, t.TagLevel FROM QuestionTagMappings m JOIN DimTags t ON t.TagID = m.TagID
+    ORDER BY m.MappingID LIMIT 1
+    """).fetchone()
+    # Import a mapping that was switched off, so effective tags change again
+    with conn:
+        conn.execute("""
+        UPDATE QuestionTagMappings SET IsActive = 0
+        WHERE QuestionID = ? AND TagID = (SELECT TagID FROM DimTags WHERE TagName = ?)
+        """, (question_id, tag_name))
+    conn.close()
+
+    excel_path = str(tmp_path / 'mappings.xlsx')
+    write_mappings(excel_path, [(question_id, tag_name, 'Primary' if tag_level == 1 else 'Sub', 'AUTOMATIC')])
+    results = TagAssignmentImporter(survey_db).import_from_excel(excel_path)
+    assert results['success'], results['errors']
+    assert results['records_updated'] >= 1
+
+    conn = sqlite3.connect(survey_db)
+    cube_seq = conn.execute("SELECT ChangeSeq FROM TagCubeState WHERE ID = 1").fetchone()[0]
+    assert cube_seq == conn.execute("SELECT MAX(ChangeSeq) FROM TagChangeLog").fetchone()[0]
+    assert cube_drift(conn) == 0
+    conn.close()
+
+def test_imported_mappings_are_replayed_into_a_rebuild(survey_db, tmp_path):
+    from fixture_db import build_fixture_database
+    from override_journal import replay_journal
+
+    excel_path = str(tmp_path / 'mappings.xlsx')
+    write_mappings(excel_path, [(3, 'Primary 7', 'Primary', 'SUGGESTED')])
+    results = TagAssignmentImporter(survey_db).import_from_excel(excel_path)
+    assert results['success'], results['errors']
+
+    rebuild_dir = tmp_path / 'rebuild'
+    rebuild_dir.mkdir()
+    rebuilt_db = str(rebuild_dir / 'survey_analysis.db')
+    build_fixture_database(rebuilt_db, scale=1)
+    conn = sqlite3.connect(rebuilt_db)
+    replay_journal(conn, str(tmp_path / 'override_journal.db'))
+    mapping = conn.execute("""
+    SELECT m.AssignmentType, m.IsActive FROM QuestionTagMappings m JOIN DimTags t ON t.TagID = m.TagID
+    WHERE m.QuestionID = 3 AND t.TagName = 'Primary 7' AND m.AppliedBy = 'Excel Import'
+    """).fetchall()
+    assert mapping and all(row == ('SUGGESTED', 1) for row in mapping)
+    assert cube_drift(conn) == 0
+    conn.close()
@@ -0,0 +1,42 @@
+import re
+
+# One sample line: name{labels} value
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)\{((?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*)\} (\S+)$')
+
+def parse_prometheus(text):
+    """Samples as {(name, labels): value}, checking every line and every metric's TYPE"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert metric_type in {'counter', 'histogram', 'gauge'}
+            types[name] = metric_type
+        elif line.startswith('# HELP '):
+            continue
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name, labels, value = match.groups()
+            assert re.sub(r'_(bucket|sum|count)$', '', name) in types, name
+            samples[(name, labels)] = float(value)
+    return samples
+
+def test_metrics_are_valid_prometheus_text_with_writer_jobs(api, monkeypatch):
+    from metrics import RequestMetrics
+    monkeypatch.setattr(api, 'request_metrics', RequestMetrics())
+    client = api.app.test_client()
+    assert client.get('/api/tags').status_code == 200
+    assert client.post('/api/response/10/tags', json={'tag_id': 2, 'action': 'ADD'}).status_code == 200
+
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    samples = parse_prometheus(response.get_data(as_text=True))
+
+    buckets = [value for (name, labels), value in samples.items()
+               if name == 'survey_api_request_duration_seconds_bucket' and 'endpoint="/api/tags"' in labels]
+    assert buckets == sorted(buckets) and buckets[-1] >= 1
+
+    writer = [(name, value) for (name, labels), value in samples.items()
+              if 'endpoint="db-writer:save_override"' in labels and 'method="WRITE"' in labels]
+    assert ('survey_api_request_duration_seconds_count', 1.0) in writer
+    assert dict(writer)['survey_api_sql_statements_total'] > 0
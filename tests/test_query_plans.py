@@ -0,0 +1,4 @@
+from check_query_plans import check_query_plans
+
+def test_no_full_scans_of_large_tables(large_survey_db):
+    assert check_query_plans(db_path=large_survey_db) == []
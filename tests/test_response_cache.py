@@ -0,0 +1,34 @@
+def tag_counts(response):
+    return {tag['TagID']: tag['ResponseCount'] for tag in response.get_json()}
+
+def test_etag_revalidation_and_invalidation_after_override(api):
+    client = api.app.test_client()
+    first = client.get('/api/tags')
+    etag = first.headers['ETag']
+    assert client.get('/api/tags', headers={'If-None-Match': etag}).status_code == 304
+
+    tagged = {tag['TagID'] for tag in client.get('/api/responses/10/effective-tags').get_json()}
+    tag_id = min(set(tag_counts(first)) - tagged)
+    saved = client.post('/api/response/10/tags', json={'tag_id': tag_id, 'action': 'ADD'})
+    assert saved.status_code == 200
+
+    after = client.get('/api/tags', headers={'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+    assert tag_counts(after)[tag_id] == tag_counts(first)[tag_id] + 1
+
+def test_missing_database_file(api, monkeypatch, tmp_path):
+    client = api.app.test_client()
+    assert client.get('/api/tags').status_code == 200
+
+    # Mid-swap: the generation already open keeps being served
+    monkeypatch.setattr(api, 'DATABASE_PATH', str(tmp_path / 'missing.db'))
+    assert client.get('/api/tags').status_code == 200
+    assert client.get('/api/responses/10/effective-tags').status_code == 200
+
+    # Nothing opened yet: a 503 instead of an unhandled error
+    monkeypatch.setattr(api, '_db_inode', None)
+    for path in ['/api/tags', '/api/responses/10/effective-tags']:
+        response = client.get(path)
+        assert response.status_code == 503, path
+        assert 'Database not available' in response.get_json()['error']
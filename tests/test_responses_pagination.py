@@ -0,0 +1,27 @@
+def page_ids(page):
+    return [response['ResponseID'] for question in page['questions'] for response in question['responses']]
+
+def test_cursor_pages_cover_the_full_list_once(api):
+    client = api.app.test_client()
+    full = client.get('/api/responses').get_json()
+    expected = [response['ResponseID'] for question in full for response in question['responses']]
+
+    seen, path = [], '/api/responses?limit=100'
+    while path:
+        page = client.get(path).get_json()
+        assert len(page_ids(page)) <= 100
+        seen.extend(page_ids(page))
+        path = page['next_cursor'] and f"/api/responses?limit=100&cursor={page['next_cursor']}"
+
+    assert seen == expected
+
+def test_invalid_paging_arguments_are_rejected(api, monkeypatch):
+    client = api.app.test_client()
+    for query in ['cursor=abc', 'cursor=3', 'limit=abc', 'limit=0', 'limit=-5', 'question_id=abc']:
+        response = client.get(f'/api/responses?{query}')
+        assert response.status_code == 400, query
+
+    monkeypatch.setattr(api, 'MAX_RESPONSES_PAGE_SIZE', 50)
+    page = client.get('/api/responses?limit=100000').get_json()
+    assert len(page_ids(page)) == 50
+    assert page['next_cursor'] is not None
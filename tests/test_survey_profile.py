@@ -0,0 +1,41 @@
+import os
+
+import pandas as pd
+
+from conftest import BASE_DIR
+from data_loader import identify_open_ended_columns
+from survey_profile import compute_survey_profile
+
+SURVEY_FILE = os.path.join(BASE_DIR, 'data', 'Need_Assessment_Survey_FINAL_CLEAN.csv')
+
+# The questions whose answers go through text processing and tagging
+EXPECTED_OPEN_ENDED = [
+    'What skills, resources, or knowledge are a priority',
+    'When considering your response to the previous question',
+    'How do you currently meet the training needs',
+    'What are some specific actions that we (the community) could take to help RETAIN',
+    'What are some specific actions that we (the community) could take to help RECRUIT',
+    'What specific actions are needed to elevate and advance',
+    'Do you have any final comments or suggestions',
+]
+
+def test_open_ended_columns_of_the_survey():
+    df = pd.read_csv(SURVEY_FILE, encoding='utf-8')
+    open_ended_cols = identify_open_ended_columns(df, compute_survey_profile(df))
+
+    assert len(open_ended_cols) == len(EXPECTED_OPEN_ENDED)
+    for col, expected in zip(open_ended_cols, EXPECTED_OPEN_ENDED):
+        assert col.startswith(expected)
+
+def test_profile_cache_is_keyed_by_dataframe_contents(tmp_path, monkeypatch):
+    import survey_profile
+    monkeypatch.setattr(survey_profile, 'PROFILE_CACHE_DIR', str(tmp_path))
+    df = pd.read_csv(SURVEY_FILE, encoding='utf-8')
+    first_half = df.head(len(df) // 2)
+
+    full_profile = survey_profile.get_survey_profile(df)
+    half_profile = survey_profile.get_survey_profile(first_half)
+
+    assert (half_profile['FillCount'] <= full_profile['FillCount']).all()
+    assert half_profile['NonNullCount'].sum() == first_half.notna().sum().sum()
+    assert len(list(tmp_path.iterdir())) == 2
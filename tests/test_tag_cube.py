@@ -0,0 +1,61 @@
+import sqlite3
+
+import override_journal
+from override_journal import append_overrides, journal_path, replay_journal
+from tag_cube import cube_insert_sql
+
+def cube_drift(conn):
+    """Rows that differ between the maintained cube and a full recount"""
+    conn.execute("DROP TABLE IF EXISTS temp.TagCube")
+    conn.execute("CREATE TEMP TABLE TagCube AS SELECT * FROM main.TagCube WHERE 0")
+    conn.execute(cube_insert_sql().replace("INSERT INTO TagCube", "INSERT INTO temp.TagCube"))
+    return conn.execute("""
+    SELECT (SELECT COUNT(*) FROM (SELECT * FROM main.TagCube EXCEPT SELECT * FROM temp.TagCube))
+         + (SELECT COUNT(*) FROM (SELECT * FROM temp.TagCube EXCEPT SELECT * FROM main.TagCube))
+    """).fetchone()[0]
+
+def snapshot(db_path):
+    """What a separate reader sees: change version, effective tags and cube totals"""
+    reader = sqlite3.connect(db_path)
+    try:
+        return (
+            reader.execute("SELECT COALESCE(MAX(ChangeSeq), 0) FROM TagChangeLog").fetchone()[0],
+            reader.execute("SELECT COUNT(*) FROM EffectiveResponseTags").fetchone()[0],
+            reader.execute("SELECT SUM(ResponseCount) FROM TagCube WHERE QuestionID IS NULL").fetchone()[0],
+        )
+    finally:
+        reader.close()
+
+def test_replay_commits_cube_with_effective_tags(survey_db, tmp_path, monkeypatch):
+    conn = sqlite3.connect(survey_db)
+    response_id, respondent, question_id = conn.execute(
+        "SELECT ResponseID, SurveyResponseNumber, QuestionID FROM FactSurveyResponses WHERE ResponseID = 1"
+    ).fetchone()
+    new_tag = conn.execute("""
+    SELECT MIN(TagID) FROM DimTags
+    WHERE TagID NOT IN (SELECT TagID FROM EffectiveResponseTags WHERE ResponseID = 1)
+    """).fetchone()[0]
+    before = snapshot(survey_db)
+
+    # Look at the database from a second connection at the moment the cube is refreshed
+    seen_during_refresh = []
+    refresh = override_journal.refresh_tag_cube
+    def observed_refresh(refresh_conn):
+        seen_during_refresh.append(snapshot(survey_db))
+        return refresh(refresh_conn)
+    monkeypatch.setattr(override_journal, 'refresh_tag_cube', observed_refresh)
+
+    append_overrides(journal_path(str(tmp_path)), [{
+        'ResponseID': response_id, 'SurveyResponseNumber': respondent, 'QuestionID': question_id,
+        'TagID': new_tag, 'Action': 'ADD', 'AppliedBy': 'test', 'AppliedDate': '2030-01-01',
+    }])
+    assert replay_journal(conn, journal_path(str(tmp_path))) == 1
+
+    # Before the commit the other connection sees neither the tag change nor the cube change
+    assert seen_during_refresh == [before]
+    after = snapshot(survey_db)
+    assert after[0] > before[0]
+    assert after[1] == before[1] + 1
+    assert after[2] == before[2] + 1
+    assert cube_drift(conn) == 0
+    conn.close()